@@ -1,24 +1,32 @@
 # agents/multi_agent.py
-from typing import List
+from typing import List, Optional
 from langchain.agents import initialize_agent, AgentType
 from langchain.tools import Tool
 from models.llm import GroqLLM
 from utils.prompts import MULTI_AGENT_PROMPT
+from utils.timing import timing_handler
+from config import AGENT_MAX_ITERATIONS
 
+# Answer of an agent stopped at its iteration limit (early_stopping_method="force")
+AGENT_STOPPED_OUTPUT = "Agent stopped due to iteration limit or time limit."
 
-def create_multi_agent(tools: List[Tool], verbose: bool = False):
+
+def create_multi_agent(
+    tools: List[Tool], verbose: bool = False, streaming: bool = False
+):
     """
     Create a multi-agent system with the given tools.
 
     Args:
         tools: List of tools to use
         verbose: Whether to enable verbose output
+        streaming: Whether the agent LLM streams tokens to callbacks
 
     Returns:
         Initialized agent
     """
-    # Initialize LLM
-    llm = GroqLLM()
+    # Initialize LLM, reporting its calls to the request timings
+    llm = GroqLLM(streaming=streaming, callbacks=[timing_handler], tags=["agent"])
 
     # Create agent
     agent = initialize_agent(
@@ -27,6 +35,42 @@ def create_multi_agent(tools: List[Tool], verbose: bool = False):
         agent=AgentType.OPENAI_FUNCTIONS,  # Supports structured tool use
         verbose=verbose,
         agent_kwargs={"system_message": MULTI_AGENT_PROMPT},
+        max_iterations=AGENT_MAX_ITERATIONS,
+        # Counts the agent iterations of the request
+        callbacks=[timing_handler],
     )
 
     return agent
+
+
+def limit_iterations(agent, max_iterations: int):
+    """
+    Return a copy of an agent stopping after fewer iterations.
+
+    The copy shares the tools and LLM of the agent, so that a shared agent
+    can be limited for a single run.
+
+    Args:
+        agent: Initialized agent
+        max_iterations: Maximum number of iterations of the copy
+
+    Returns:
+        Agent limited to max_iterations
+    """
+    if max_iterations >= agent.max_iterations:
+        return agent
+
+    return agent.model_copy(update={"max_iterations": max_iterations})
+
+
+def stopped_early(answer: Optional[str]) -> bool:
+    """
+    Check whether an agent answer is the one of a run stopped at its limit.
+
+    Args:
+        answer: Answer of the agent
+
+    Returns:
+        True if the agent gave up before finishing
+    """
+    return answer == AGENT_STOPPED_OUTPUT
@@ -3,38 +3,44 @@ from langchain.chains import RetrievalQA
 from langchain.tools import Tool
 from models.llm import GroqLLM
 from models.vectorstore import VectorstoreManager
+from utils.metrics import TimedRetriever
 from utils.prompts import LEGAL_RAG_PROMPT
+from utils.timing import timing_handler
 
 
-def create_rag_tool(law_code_name: str, documents=None):
+def create_rag_tool(law_code_name: str, documents=None, vectorstore=None):
     """
     Create a RAG tool for the specified law code.
 
     Args:
         law_code_name: Name of the law code
         documents: Optional documents to create the vectorstore
+        vectorstore: Optional already loaded vectorstore to reuse
 
     Returns:
         Tool for RAG-based legal research
     """
-    # Initialize LLM
-    llm = GroqLLM()
+    # Initialize LLM, reporting its calls to the request timings
+    llm = GroqLLM(callbacks=[timing_handler], tags=[f"rag:{law_code_name}"])
 
     # Get vectorstore and retriever
-    vectorstore_manager = VectorstoreManager(law_code_name)
-
-    try:
-        # Try to load existing vectorstore first
-        vectorstore = vectorstore_manager.load_vectorstore()
-    except FileNotFoundError:
-        # If not found and documents are provided, create new vectorstore
-        if documents is None:
-            raise ValueError(
-                f"No existing vectorstore found for {law_code_name} and no documents provided"
-            )
-        vectorstore = vectorstore_manager.create_vectorstore(documents)
-
-    retriever = vectorstore.as_retriever()
+    if vectorstore is None:
+        vectorstore_manager = VectorstoreManager(law_code_name)
+
+        try:
+            # Try to load existing vectorstore first
+            vectorstore = vectorstore_manager.load_vectorstore()
+        except FileNotFoundError:
+            # If not found and documents are provided, create new vectorstore
+            if documents is None:
+                raise ValueError(
+                    f"No existing vectorstore found for {law_code_name} and no documents provided"
+                )
+            vectorstore = vectorstore_manager.create_vectorstore(documents)
+
+    retriever = TimedRetriever(
+        retriever=vectorstore.as_retriever(), law_code=law_code_name
+    )
 
     # Create RAG chain
     rag_chain = RetrievalQA.from_chain_type(
@@ -45,7 +51,9 @@ def create_rag_tool(law_code_name: str, documents=None):
     rag_tool = Tool(
         name=f"{law_code_name}_rag",
         func=rag_chain.run,
+        coroutine=rag_chain.arun,
         description=f"Recherche juridique basée sur le code {law_code_name} français.",
+        callbacks=[timing_handler],
     )
 
     return rag_tool
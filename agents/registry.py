@@ -0,0 +1,335 @@
+# agents/registry.py
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from langchain.tools import Tool
+from agents.rag_agent import create_rag_tool
+from data.loader import LegalDataLoader
+from models.vectorstore import VectorstoreManager
+from utils.logging import app_logger
+from utils.metrics import set_index_memory, track_stage
+from config import (
+    RAG_REGISTRY_MAX_CODES,
+    RAG_REGISTRY_MAX_MEMORY_MB,
+    AGENT_CACHE_MAX_SIZE,
+)
+
+# Approximate Python overhead of each stored chunk: Document object, metadata
+# dict and string headers
+CHUNK_OVERHEAD_BYTES = 400
+
+
+def estimate_index_bytes(vectorstore) -> int:
+    """
+    Estimate the resident memory of a FAISS vectorstore.
+
+    Args:
+        vectorstore: FAISS vectorstore
+
+    Returns:
+        Approximate size in bytes of the index vectors and of the texts,
+        metadata and ids of the docstore
+    """
+    index = getattr(vectorstore, "index", None)
+    if index is None:
+        return 0
+
+    # Flat FAISS indices store one float32 per dimension for each vector
+    nbytes = int(index.ntotal) * int(index.d) * 4
+
+    # The chunks kept in memory are often as large as their vectors
+    documents = getattr(getattr(vectorstore, "docstore", None), "_dict", None)
+    if isinstance(documents, dict):
+        for doc_id, document in documents.items():
+            # Ids are held by both the docstore and the index to id map
+            nbytes += CHUNK_OVERHEAD_BYTES + 2 * len(doc_id)
+            nbytes += len(document.page_content)
+            nbytes += sum(
+                len(str(key)) + len(str(value))
+                for key, value in document.metadata.items()
+            )
+    return nbytes
+
+
+class RAGToolRegistry:
+    """Process-wide registry keeping one warm RAG tool per law code."""
+
+    def __init__(
+        self,
+        max_codes: int = RAG_REGISTRY_MAX_CODES,
+        max_memory_mb: int = RAG_REGISTRY_MAX_MEMORY_MB,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            max_codes: Maximum number of resident law codes (0 for no limit)
+            max_memory_mb: Maximum resident index memory in MB (0 for no limit)
+        """
+        self.max_codes = max_codes
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024
+
+        # Law code -> (tool, index size in bytes), least recently used first
+        self._entries: "OrderedDict[str, Tuple[Tool, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, asyncio.Lock] = {}
+        # Coroutines loading or waiting for each law code
+        self._load_waiters: Dict[str, int] = {}
+        self._eviction_listeners: List[Callable[[str], Any]] = []
+
+    def __contains__(self, law_code: str) -> bool:
+        return law_code in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, law_code: str) -> Optional[Tool]:
+        """Return the resident tool for a law code and mark it as recently used."""
+        with self._lock:
+            entry = self._entries.get(law_code)
+            if entry is None:
+                return None
+            self._entries.move_to_end(law_code)
+            return entry[0]
+
+    def add_eviction_listener(self, listener: Callable[[str], Any]):
+        """
+        Register a callback notified with each law code dropped from the registry.
+
+        Args:
+            listener: Function called with the evicted law code
+        """
+        self._eviction_listeners.append(listener)
+
+    def _notify_evicted(self, law_codes: List[str]):
+        for law_code in law_codes:
+            set_index_memory(law_code, 0)
+            for listener in self._eviction_listeners:
+                listener(law_code)
+
+    def _store(self, law_code: str, tool: Tool, nbytes: int):
+        """Store a tool and evict the least recently used codes over the limits."""
+        evicted = []
+        with self._lock:
+            self._entries[law_code] = (tool, nbytes)
+            self._entries.move_to_end(law_code)
+
+            # Always keep the entry that was just stored
+            while len(self._entries) > 1 and self._over_limits():
+                evicted_code, _ = self._entries.popitem(last=False)
+                evicted.append(evicted_code)
+                app_logger.info(f"Evicted RAG tool for law code {evicted_code}")
+
+        self._notify_evicted(evicted)
+
+    def _over_limits(self) -> bool:
+        if self.max_codes and len(self._entries) > self.max_codes:
+            return True
+        if self.max_memory_bytes and self.memory_usage() > self.max_memory_bytes:
+            return True
+        return False
+
+    async def _load_vectorstore(self, law_code: str):
+        """Load the vectorstore of a law code, building it if no index exists."""
+        vectorstore_manager = VectorstoreManager(law_code)
+
+        try:
+            with track_stage("vectorstore_load"):
+                return await asyncio.to_thread(vectorstore_manager.load_vectorstore)
+        except FileNotFoundError:
+            # No index on disk yet: build it from the raw law code documents
+            app_logger.info(f"No index found for {law_code}, building it")
+            with track_stage("document_load"):
+                documents = await LegalDataLoader(law_code).load()
+            return await asyncio.to_thread(
+                vectorstore_manager.create_vectorstore, documents
+            )
+
+    async def get(self, law_code: str) -> Tool:
+        """
+        Get the shared RAG tool of a law code, loading it on first use.
+
+        Args:
+            law_code: Name of the law code
+
+        Returns:
+            Tool for RAG-based legal research
+        """
+        tool = self._lookup(law_code)
+        if tool is not None:
+            return tool
+
+        # Only one coroutine loads a given law code, the others wait for it
+        lock = self._load_locks.setdefault(law_code, asyncio.Lock())
+        self._load_waiters[law_code] = self._load_waiters.get(law_code, 0) + 1
+        try:
+            async with lock:
+                tool = self._lookup(law_code)
+                if tool is not None:
+                    return tool
+
+                vectorstore = await self._load_vectorstore(law_code)
+                tool = create_rag_tool(law_code, vectorstore=vectorstore)
+                nbytes = estimate_index_bytes(vectorstore)
+                self._store(law_code, tool, nbytes)
+                set_index_memory(law_code, nbytes)
+                app_logger.info(f"Loaded RAG tool for law code {law_code}")
+
+                return tool
+        finally:
+            # Drop the lock once nobody loads or waits for the law code, so that
+            # requests for unknown codes do not accumulate locks
+            self._load_waiters[law_code] -= 1
+            if not self._load_waiters[law_code]:
+                del self._load_waiters[law_code]
+                del self._load_locks[law_code]
+
+    async def preload(self, law_codes: List[str]) -> List[str]:
+        """
+        Load the RAG tools of the given law codes ahead of the first request.
+
+        Args:
+            law_codes: Law codes to load
+
+        Returns:
+            Law codes that were successfully loaded
+        """
+        loaded = []
+        for law_code in law_codes:
+            try:
+                await self.get(law_code)
+                loaded.append(law_code)
+            except Exception as e:
+                app_logger.error(f"Error preloading law code {law_code}: {str(e)}")
+
+        return loaded
+
+    def evict(self, law_code: str) -> bool:
+        """
+        Drop the resident tool of a law code.
+
+        Args:
+            law_code: Name of the law code
+
+        Returns:
+            True if a tool was evicted
+        """
+        with self._lock:
+            evicted = self._entries.pop(law_code, None) is not None
+
+        if evicted:
+            self._notify_evicted([law_code])
+        return evicted
+
+    def clear(self):
+        """Drop every resident tool."""
+        with self._lock:
+            evicted = list(self._entries)
+            self._entries.clear()
+
+        self._notify_evicted(evicted)
+
+    def memory_usage(self) -> int:
+        """Return the estimated resident index memory in bytes."""
+        return sum(nbytes for _, nbytes in self._entries.values())
+
+    def stats(self) -> Dict[str, int]:
+        """Return the estimated resident index memory per law code."""
+        with self._lock:
+            return {code: nbytes for code, (_, nbytes) in self._entries.items()}
+
+
+class AgentCache:
+    """LRU cache of multi-agents keyed by their canonical law code set and options."""
+
+    def __init__(self, max_agents: int = AGENT_CACHE_MAX_SIZE):
+        """
+        Initialize the agent cache.
+
+        Args:
+            max_agents: Maximum number of cached agents (0 for no limit)
+        """
+        self.max_agents = max_agents
+
+        # Key -> (agent, tools), least recently used first
+        self._entries: "OrderedDict[Tuple, Tuple[Any, List[Tool]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        law_codes: List[str], use_search: bool, use_rag: bool, streaming: bool = False
+    ) -> Tuple:
+        """
+        Build the order-insensitive key of an agent.
+
+        Args:
+            law_codes: Law codes whose RAG tools the agent uses
+            use_search: Whether the agent uses the search tool
+            use_rag: Whether the agent uses RAG tools
+            streaming: Whether the agent streams tokens to callbacks
+
+        Returns:
+            Hashable agent key
+        """
+        # Law codes are irrelevant without RAG tools
+        codes = tuple(sorted(set(law_codes))) if use_rag else ()
+        return (codes, use_search, use_rag, streaming)
+
+    def __contains__(self, key: Tuple) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple) -> Optional[Tuple[Any, List[Tool]]]:
+        """
+        Get a cached agent and its tools, marking it as recently used.
+
+        Args:
+            key: Agent key from make_key
+
+        Returns:
+            (agent, tools) or None if not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple, agent, tools: List[Tool]):
+        """
+        Cache an agent, evicting the least recently used ones over the limit.
+
+        Args:
+            key: Agent key from make_key
+            agent: Initialized agent
+            tools: Tools the agent was built with
+        """
+        with self._lock:
+            self._entries[key] = (agent, tools)
+            self._entries.move_to_end(key)
+            while self.max_agents and len(self._entries) > self.max_agents:
+                self._entries.popitem(last=False)
+
+    def discard_law_code(self, law_code: str) -> int:
+        """
+        Drop the agents using a law code, e.g. when its RAG tool is evicted.
+
+        Args:
+            law_code: Name of the law code
+
+        Returns:
+            Number of agents dropped
+        """
+        with self._lock:
+            keys = [key for key in self._entries if law_code in key[0]]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self):
+        """Drop every cached agent."""
+        with self._lock:
+            self._entries.clear()
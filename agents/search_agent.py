@@ -1,6 +1,8 @@
 # agents/search_agent.py
 from langchain.tools import Tool
 from langchain_community.utilities import SerpAPIWrapper
+from utils.metrics import track_external_call
+from utils.timing import timing_handler
 from config import SERPAPI_API_KEY
 
 
@@ -14,11 +16,21 @@ def create_search_tool():
     # Initialize SerpAPI wrapper
     search = SerpAPIWrapper(serpapi_api_key=SERPAPI_API_KEY)
 
+    def run(query: str) -> str:
+        with track_external_call("serpapi"):
+            return search.run(query)
+
+    async def arun(query: str) -> str:
+        with track_external_call("serpapi"):
+            return await search.arun(query)
+
     # Create search tool
     search_tool = Tool(
         name="google_search",
-        func=search.run,
+        func=run,
+        coroutine=arun,
         description="Recherche Google pour des informations juridiques externes et récentes.",
+        callbacks=[timing_handler],
     )
 
     return search_tool
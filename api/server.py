@@ -1,22 +1,70 @@
 # api/server.py
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, List, Optional
+from fastapi.responses import StreamingResponse
+from prometheus_client import make_asgi_app
+from pydantic import BaseModel, Field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 import json
 import time
-from agents.multi_agent import create_multi_agent
+from agents.multi_agent import create_multi_agent, limit_iterations, stopped_early
 from agents.search_agent import create_search_tool
-from agents.rag_agent import create_rag_tool
-from data.loader import LegalDataLoader
-from utils.cache import RedisCache
+from agents.registry import AgentCache, RAGToolRegistry
+from api.streaming import EventQueueCallbackHandler, format_sse
+from models.scheduler import get_scheduler
+from utils.admission import AdmissionController, AdmissionRejected
+from utils.cache import TieredCache
+from utils.deadline import Deadline
 from utils.logging import app_logger, RequestLogMiddleware
+from utils.metrics import InFlightMiddleware, timed, track_stage
+from utils.semantic_cache import SemanticCache
+from utils.singleflight import SingleFlight
+from utils.timing import (
+    RequestTimings,
+    current_timings,
+    start_request_timings,
+    timing_handler,
+)
+from config import (
+    RAG_PRELOAD_CODES,
+    SINGLEFLIGHT_DISTRIBUTED,
+    SEMANTIC_CACHE_ENABLED,
+    CACHE_PUBSUB_ENABLED,
+    ENABLE_METRICS,
+    QUERY_DEADLINE_MS,
+    DEADLINE_SEARCH_MIN_MS,
+    DEADLINE_AGENT_MIN_MS,
+    DEADLINE_AGENT_ITERATION_MS,
+    AGENT_MAX_ITERATIONS,
+)
+
+# Shared RAG tools, loaded once per law code
+rag_registry = RAGToolRegistry()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm up the RAG registry and listen to cache invalidations before serving requests.
+    """
+    if CACHE_PUBSUB_ENABLED:
+        cache.start_invalidation_listener()
+
+    if RAG_PRELOAD_CODES:
+        loaded = await rag_registry.preload(RAG_PRELOAD_CODES)
+        app_logger.info(f"Preloaded RAG tools for law codes: {loaded}")
+    yield
+    await cache.close()
+
 
 # Create FastAPI app
 app = FastAPI(
     title="French Legal Assistant API",
     description="API for answering legal questions in French",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -31,8 +79,26 @@ app.add_middleware(
 # Add request logging middleware
 app.add_middleware(RequestLogMiddleware)
 
-# Create Redis cache
-cache = RedisCache(prefix="legal_assistant")
+# Expose Prometheus metrics
+if ENABLE_METRICS:
+    app.add_middleware(InFlightMiddleware)
+    app.mount("/metrics", make_asgi_app())
+
+# Create Redis cache, fronted by a per-worker in-memory tier
+cache = TieredCache(prefix="legal_assistant")
+
+# Answers of similar queries, if enabled
+semantic_cache = SemanticCache() if SEMANTIC_CACHE_ENABLED else None
+if semantic_cache is not None:
+    # Flushes and invalidations made by other workers also drop similar answers
+    cache.add_invalidation_listener(semantic_cache.clear)
+
+# Coalesce concurrent identical queries, across workers if configured
+single_flight = SingleFlight(cache if SINGLEFLIGHT_DISTRIBUTED else None)
+
+
+# Limit the concurrent cache-missing queries, shedding load past the wait queue
+admission = AdmissionController()
 
 
 # Define request models
@@ -42,6 +108,8 @@ class QueryRequest(BaseModel):
     use_search: bool = True
     use_rag: bool = True
     verbose: bool = False
+    # Latency budget in milliseconds (None for the server default)
+    deadline_ms: Optional[int] = Field(default=None, gt=0)
 
 
 # Define response models
@@ -51,10 +119,361 @@ class QueryResponse(BaseModel):
     multi_agent_answer: Optional[str] = None
     processing_time: float = 0.0
     cached: bool = False
+    # Whether work was skipped to meet the deadline, and what was skipped
+    degraded: bool = False
+    degraded_reasons: List[str] = []
+    # Stage timing breakdown of the request
+    timings: Optional[Dict] = None
+
+
+# Agents built from the shared tools, dropped when one of their RAG tools is evicted
+agent_cache = AgentCache()
+rag_registry.add_eviction_listener(
+    lambda law_code: agent_cache.discard_law_code(law_code)
+)
+
+# Search tool shared by every agent
+search_tool = None
+
+
+def get_cache_key(request: QueryRequest) -> Dict:
+    """
+    Build the cache key parameters of a query.
+
+    Args:
+        request: Query request
+
+    Returns:
+        Cache key parameters
+    """
+    return {
+        "query": request.query,
+        "law_codes": sorted(request.law_codes),
+        "use_search": request.use_search,
+        "use_rag": request.use_rag,
+    }
+
+
+def get_flight_key(cache_key: Dict, request: QueryRequest) -> Dict:
+    """
+    Generate the key under which concurrent identical queries are coalesced.
+
+    Answers are scaled down to the latency budget, so queries only share a
+    computation with budgets allowing the same number of agent iterations.
+    A tight budget then never cuts short the answer of a generous one.
+
+    Args:
+        cache_key: Cache key parameters of the query
+        request: Query request
+
+    Returns:
+        Single-flight key parameters
+    """
+    budget_ms = request.deadline_ms or QUERY_DEADLINE_MS
+    if not budget_ms:
+        return cache_key
+
+    iterations = min(budget_ms // DEADLINE_AGENT_ITERATION_MS, AGENT_MAX_ITERATIONS)
+    return {**cache_key, "agent_iterations": iterations}
+
+
+async def get_cached(cache_key: Dict) -> Optional[str]:
+    """
+    Look up the cached response of a query, then of a similar query.
+
+    Args:
+        cache_key: Cache key parameters of the query
+
+    Returns:
+        Cached response JSON, or None
+    """
+    with track_stage("cache_lookup"):
+        cached_response = await cache.get(cache_key)
+        if cached_response or semantic_cache is None:
+            return cached_response
+
+        scope = {k: v for k, v in cache_key.items() if k != "query"}
+        cached_response = await semantic_cache.alookup(cache_key["query"], scope)
+        if not cached_response:
+            return None
+
+    # Answer with the query that was asked, not the similar one
+    response_data = json.loads(cached_response)
+    response_data["query"] = cache_key["query"]
+    return json.dumps(response_data)
+
+
+async def store_response(cache_key: Dict, response: "QueryResponse"):
+    """
+    Store the response of a query in the caches.
+
+    Args:
+        cache_key: Cache key parameters of the query
+        response: Query response
+    """
+    with track_stage("serialization"):
+        # Timings describe the request that computed the answer, not the next ones
+        value = json.dumps(response.dict(exclude={"timings"}))
+    await cache.set(cache_key, value)
+
+    if semantic_cache is not None:
+        scope = {k: v for k, v in cache_key.items() if k != "query"}
+        await semantic_cache.astore(cache_key["query"], scope, value)
+
+
+def get_search_tool():
+    """
+    Return the shared search tool, creating it on first use.
+
+    Returns:
+        Tool for Google search
+    """
+    global search_tool
+
+    if search_tool is None:
+        search_tool = create_search_tool()
+
+    return search_tool
+
+
+async def get_tools(request: QueryRequest) -> List:
+    """
+    Gather the tools requested by a query.
+
+    Args:
+        request: Query request
+
+    Returns:
+        List of tools
+    """
+    # Initialize tools
+    tools = []
+
+    # Add search tool if requested
+    if request.use_search:
+        tools.append(get_search_tool())
+
+    # Add the shared RAG tool of each distinct law code
+    if request.use_rag:
+        for law_code in sorted(set(request.law_codes)):
+            # Get the shared RAG tool, loading it on first use
+            try:
+                rag_tool = await rag_registry.get(law_code)
+                tools.append(rag_tool)
+            except Exception as e:
+                app_logger.error(f"Error loading law code {law_code}: {str(e)}")
+                raise HTTPException(
+                    status_code=500, detail=f"Error loading law code {law_code}"
+                )
+
+    return tools
+
+
+async def get_agent(request: QueryRequest, streaming: bool = False) -> Tuple:
+    """
+    Get the cached agent for a query, creating it from the shared tools if needed.
+
+    Args:
+        request: Query request
+        streaming: Whether the agent streams tokens to callbacks
+
+    Returns:
+        (agent, tools) tuple
+    """
+    agent_key = AgentCache.make_key(
+        request.law_codes, request.use_search, request.use_rag, streaming
+    )
+
+    cached_agent = agent_cache.get(agent_key)
+    if cached_agent is not None:
+        return cached_agent
+
+    tools = await get_tools(request)
+    agent = create_multi_agent(tools, request.verbose, streaming=streaming)
+    agent_cache.put(agent_key, agent, tools)
+
+    return agent, tools
+
+
+async def run_agent(
+    agent,
+    query: str,
+    callbacks: Optional[List] = None,
+    timeout: Optional[float] = None,
+) -> Optional[str]:
+    """
+    Run the multi-agent system, turning failures into an error answer.
+
+    Args:
+        agent: Initialized agent
+        query: User query
+        callbacks: Optional LangChain callbacks for this run
+        timeout: Optional time limit in seconds
+
+    Returns:
+        The agent answer, an error message, or None if the time limit is reached
+    """
+    try:
+        with track_stage("agent_run"):
+            return await asyncio.wait_for(
+                agent.arun(query, callbacks=callbacks), timeout
+            )
+    except asyncio.TimeoutError:
+        app_logger.warning(f"Multi-agent stopped at the deadline: {query[:50]}...")
+        return None
+    except Exception as e:
+        app_logger.error(f"Error in multi-agent: {str(e)}")
+        return f"Error: {str(e)}"
+
+
+async def stream_direct_answer(llm, query: str, handler: EventQueueCallbackHandler):
+    """
+    Stream the direct LLM answer token by token.
+
+    Args:
+        llm: LLM answering the query
+        query: User query
+        handler: Handler receiving the streamed events
+
+    Returns:
+        The full direct answer, or None on error
+    """
+    tokens = []
+    try:
+        with track_stage("direct_llm"):
+            async for token in llm.astream(query):
+                tokens.append(token)
+                handler.emit("direct_token", {"token": token})
+    except Exception as e:
+        app_logger.error(f"Error in direct answer: {str(e)}")
+        handler.emit("error", {"source": "direct", "detail": str(e)})
+        return None
+
+    handler.emit("direct_done", {})
+    return "".join(tokens)
+
+
+def fit_to_deadline(
+    request: QueryRequest, deadline: Deadline
+) -> Tuple[QueryRequest, List[str]]:
+    """
+    Drop the tools a query has no time left to use.
 
+    Args:
+        request: Query request
+        deadline: Latency budget of the query
 
-# Store loaded agents
-agent_cache = {}
+    Returns:
+        (request to answer, degradation reasons) tuple
+    """
+    remaining_ms = deadline.remaining_ms()
+    if remaining_ms < DEADLINE_AGENT_MIN_MS and (request.use_search or request.use_rag):
+        update = {"use_search": False, "use_rag": False}
+        return request.model_copy(update=update), ["agent_skipped"]
+
+    if remaining_ms < DEADLINE_SEARCH_MIN_MS and request.use_search:
+        return request.model_copy(update={"use_search": False}), ["search_skipped"]
+
+    return request, []
+
+
+def overloaded(error: AdmissionRejected) -> HTTPException:
+    """
+    Build the error returned to a query shed by admission control.
+
+    Args:
+        error: Admission rejection
+
+    Returns:
+        HTTP exception with a Retry-After header
+    """
+    return HTTPException(
+        status_code=error.status_code,
+        detail="Server overloaded, please retry later",
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+async def admitted(func: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run an expensive computation once admission control grants it a slot.
+
+    Args:
+        func: Coroutine function running the computation
+
+    Returns:
+        The result of the computation
+    """
+    async with admission.admit():
+        return await func()
+
+
+class AdmittedEvents:
+    """
+    Streamed events of an admitted query, holding its admission slot until
+    they end or are closed, even if they were never started.
+    """
+
+    def __init__(self, events: AsyncIterator[str]):
+        """
+        Wrap the events of a query that was granted an admission slot.
+
+        Args:
+            events: Events of the admitted query
+        """
+        self.events = events
+        self.released = False
+
+    def __aiter__(self) -> "AdmittedEvents":
+        return self
+
+    async def __anext__(self) -> str:
+        try:
+            return await self.events.__anext__()
+        except BaseException:
+            # Exhausted, failed or cancelled
+            await self.aclose()
+            raise
+
+    async def aclose(self):
+        """Close the events and release the admission slot, once."""
+        try:
+            await self.events.aclose()
+        finally:
+            if not self.released:
+                self.released = True
+                admission.release()
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """Streaming response closing its events once it is sent or abandoned."""
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # The body is never started if the client leaves before the first
+            # event or the response start cannot be sent
+            await self.body_iterator.aclose()
+
+
+def log_timings(request: QueryRequest, timings: RequestTimings) -> Dict:
+    """
+    Log the stage timing breakdown of a request.
+
+    Args:
+        request: Query request
+        timings: Timings collected while processing the request
+
+    Returns:
+        Timing breakdown
+    """
+    breakdown = timings.to_dict()
+    app_logger.info(
+        f"Query timings: {request.query[:50]}...",
+        extra={"timings": breakdown, "law_codes": request.law_codes},
+    )
+    return breakdown
 
 
 # Define routes
@@ -64,94 +483,259 @@ async def query(request: QueryRequest, req: Request):
     Query the legal assistant.
     """
     start_time = time.time()
+    deadline = Deadline(request.deadline_ms or QUERY_DEADLINE_MS)
+    timings = start_request_timings()
 
     # Create cache key parameters
-    cache_key = {
-        "query": request.query,
-        "law_codes": sorted(request.law_codes),
-        "use_search": request.use_search,
-        "use_rag": request.use_rag,
-    }
+    cache_key = get_cache_key(request)
 
     # Try to get from cache
-    cached_response = cache.get(cache_key)
+    cached_response = await get_cached(cache_key)
     if cached_response:
         app_logger.info(f"Cache hit for query: {request.query[:50]}...")
         response_data = json.loads(cached_response)
         response_data["cached"] = True
         response_data["processing_time"] = time.time() - start_time
+        response_data["timings"] = log_timings(request, timings)
         return QueryResponse(**response_data)
 
     app_logger.info(f"Cache miss for query: {request.query[:50]}...")
 
     try:
-        # Initialize tools
-        tools = []
-
-        # Add search tool if requested
-        if request.use_search:
-            tools.append(create_search_tool())
-
-        # Add RAG tools for each law code
-        if request.use_rag:
-            for law_code in request.law_codes:
-                # Load documents if needed
-                try:
-                    loader = LegalDataLoader(law_code)
-                    documents = await loader.load()
-
-                    # Create RAG tool
-                    rag_tool = create_rag_tool(law_code, documents)
-                    tools.append(rag_tool)
-                except Exception as e:
-                    app_logger.error(f"Error loading law code {law_code}: {str(e)}")
-                    raise HTTPException(
-                        status_code=500, detail=f"Error loading law code {law_code}"
-                    )
-
-        # Create agent
-        agent_key = (
-            f"{','.join(request.law_codes)}-{request.use_search}-{request.use_rag}"
+        # Concurrent identical queries share a single admitted computation
+        return await single_flight.do(
+            get_flight_key(cache_key, request),
+            lambda: admitted(
+                lambda: answer_query(request, cache_key, start_time, deadline)
+            ),
+            poll=lambda: get_cached_response(cache_key),
         )
-        if agent_key not in agent_cache:
-            agent_cache[agent_key] = create_multi_agent(tools, request.verbose)
 
-        agent = agent_cache[agent_key]
+    except AdmissionRejected as e:
+        raise overloaded(e)
+    except Exception as e:
+        app_logger.error(f"Error processing query: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 
-        # Get direct answer
-        direct_answer = None
+async def answer_query(
+    request: QueryRequest,
+    cache_key: Dict,
+    start_time: float,
+    deadline: Optional[Deadline] = None,
+) -> QueryResponse:
+    """
+    Answer a query with the direct LLM and the multi-agent system.
 
-        from models.llm import GroqLLM
+    Args:
+        request: Query request
+        cache_key: Cache key parameters of the query
+        start_time: Request start time
+        deadline: Optional latency budget the work is scaled down to
 
-        llm = GroqLLM()
-        direct_answer = llm(request.query)
+    Returns:
+        Query response, stored in the cache unless degraded
+    """
+    deadline = deadline or Deadline(None)
 
-        # Get multi-agent answer
-        multi_agent_answer = None
-        if tools:
-            try:
-                multi_agent_answer = agent.run(request.query)
-            except Exception as e:
-                app_logger.error(f"Error in multi-agent: {str(e)}")
-                multi_agent_answer = f"Error: {str(e)}"
-
-        # Create response
-        response = QueryResponse(
-            query=request.query,
-            direct_answer=direct_answer,
-            multi_agent_answer=multi_agent_answer,
-            processing_time=time.time() - start_time,
-            cached=False,
+    # Skip the tools there is no time left for
+    request, degraded_reasons = fit_to_deadline(request, deadline)
+
+    # Get the agent and its tools
+    agent, tools = await get_agent(request)
+
+    # Stop the agent before it runs out of time
+    remaining = deadline.remaining()
+    capped = False
+    if tools and remaining is not None:
+        max_iterations = int(remaining * 1000 // DEADLINE_AGENT_ITERATION_MS)
+        if max_iterations < AGENT_MAX_ITERATIONS:
+            agent = limit_iterations(agent, max(1, max_iterations))
+            capped = True
+
+    # Get direct answer
+    direct_answer = None
+
+    from models.llm import GroqLLM
+
+    llm = GroqLLM(callbacks=[timing_handler], tags=["direct"])
+
+    # Get multi-agent answer concurrently with the direct answer
+    multi_agent_answer = None
+    if tools:
+        direct_answer, multi_agent_answer = await asyncio.gather(
+            timed("direct_llm", llm.ainvoke(request.query)),
+            run_agent(agent, request.query, timeout=remaining),
         )
+        if multi_agent_answer is None:
+            degraded_reasons.append("agent_timeout")
+        elif capped and stopped_early(multi_agent_answer):
+            # Answers finished under the cap are complete and still cached
+            degraded_reasons.append("agent_iterations_capped")
+    else:
+        direct_answer = await timed("direct_llm", llm.ainvoke(request.query))
+
+    # Create response
+    response = QueryResponse(
+        query=request.query,
+        direct_answer=direct_answer,
+        multi_agent_answer=multi_agent_answer,
+        processing_time=time.time() - start_time,
+        cached=False,
+        degraded=bool(degraded_reasons),
+        degraded_reasons=degraded_reasons,
+    )
+
+    # Only cache complete answers
+    if response.degraded:
+        app_logger.warning(
+            f"Degraded answer ({', '.join(degraded_reasons)}) "
+            f"for query: {request.query[:50]}..."
+        )
+    else:
+        await store_response(cache_key, response)
 
-        # Cache the response
-        cache.set(cache_key, json.dumps(response.dict()))
+    timings = current_timings()
+    if timings is not None:
+        response.timings = log_timings(request, timings)
 
-        return response
+    return response
 
-    except Exception as e:
-        app_logger.error(f"Error processing query: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+
+async def get_cached_response(cache_key: Dict) -> Optional[QueryResponse]:
+    """
+    Read a response stored in the cache, e.g. by another worker.
+
+    Args:
+        cache_key: Cache key parameters of the query
+
+    Returns:
+        Cached query response, or None
+    """
+    cached_response = await get_cached(cache_key)
+    if not cached_response:
+        return None
+
+    response_data = json.loads(cached_response)
+    response_data["cached"] = True
+    return QueryResponse(**response_data)
+
+
+async def stream_query_events(
+    request: QueryRequest, cache_key: Dict, tools: List, agent, start_time: float
+) -> AsyncIterator[str]:
+    """
+    Generate the Server-Sent Events of a query.
+
+    Args:
+        request: Query request
+        cache_key: Cache key parameters of the query
+        tools: Tools available to the agent
+        agent: Streaming agent
+        start_time: Request start time
+
+    Yields:
+        SSE formatted messages
+    """
+    from models.llm import GroqLLM
+
+    queue = asyncio.Queue()
+    handler = EventQueueCallbackHandler(queue)
+
+    yield format_sse("tools_ready", {"tools": [tool.name for tool in tools]})
+
+    # Run the direct answer and the agent concurrently, both feeding the queue
+    llm = GroqLLM(callbacks=[timing_handler], tags=["direct"])
+    branches = [stream_direct_answer(llm, request.query, handler)]
+    if tools:
+        branches.append(run_agent(agent, request.query, [handler]))
+    answers = asyncio.gather(*branches)
+
+    # Forward events until both answers are complete and the queue is drained
+    try:
+        while not answers.done() or not queue.empty():
+            next_event = asyncio.ensure_future(queue.get())
+            await asyncio.wait(
+                {next_event, answers}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if next_event.done():
+                event, data = next_event.result()
+                yield format_sse(event, data)
+            else:
+                next_event.cancel()
+    finally:
+        # Stop generating answers if the client went away
+        if not answers.done():
+            answers.cancel()
+
+    direct_answer, *agent_answer = answers.result()
+    multi_agent_answer = agent_answer[0] if agent_answer else None
+    if multi_agent_answer is not None:
+        yield format_sse("agent_done", {})
+
+    response = QueryResponse(
+        query=request.query,
+        direct_answer=direct_answer,
+        multi_agent_answer=multi_agent_answer,
+        processing_time=time.time() - start_time,
+        cached=False,
+    )
+
+    # Only cache complete answers
+    if direct_answer is not None:
+        await store_response(cache_key, response)
+
+    timings = current_timings()
+    if timings is not None:
+        response.timings = log_timings(request, timings)
+
+    yield format_sse("done", response.dict())
+
+
+@app.post("/api/query/stream")
+async def query_stream(request: QueryRequest, req: Request):
+    """
+    Query the legal assistant, streaming the answers as Server-Sent Events.
+    """
+    start_time = time.time()
+    timings = start_request_timings()
+    cache_key = get_cache_key(request)
+
+    # Cached answers are sent as a single final event
+    cached_response = await get_cached(cache_key)
+    if cached_response:
+        app_logger.info(f"Cache hit for query: {request.query[:50]}...")
+        response_data = json.loads(cached_response)
+        response_data["cached"] = True
+        response_data["processing_time"] = time.time() - start_time
+        response_data["timings"] = log_timings(request, timings)
+
+        async def cached_events():
+            yield format_sse("done", response_data)
+
+        return StreamingResponse(cached_events(), media_type="text/event-stream")
+
+    app_logger.info(f"Cache miss for query: {request.query[:50]}...")
+
+    try:
+        await admission.acquire()
+    except AdmissionRejected as e:
+        raise overloaded(e)
+
+    # Load tools before streaming starts so errors keep their status code
+    try:
+        agent, tools = await get_agent(request, streaming=True)
+    except BaseException:
+        admission.release()
+        raise
+
+    return AdmittedStreamingResponse(
+        AdmittedEvents(
+            stream_query_events(request, cache_key, tools, agent, start_time)
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/api/health")
@@ -162,10 +746,52 @@ async def health_check():
     return {"status": "ok", "timestamp": time.time()}
 
 
+@app.get("/api/llm/scheduler")
+async def scheduler_stats():
+    """
+    Groq request scheduler statistics.
+    """
+    return get_scheduler().stats()
+
+
+@app.get("/api/admission")
+async def admission_stats():
+    """
+    Admission control statistics.
+    """
+    return admission.stats()
+
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """
+    Cache hit rates per tier.
+    """
+    stats = cache.stats()
+    if semantic_cache is not None:
+        stats["semantic"] = semantic_cache.stats()
+    return stats
+
+
+@app.post("/api/cache/invalidate")
+async def invalidate_cache():
+    """
+    Logically flush the cache, e.g. after an index rebuild or a model change.
+    """
+    generation = await cache.invalidate()
+    if generation is None:
+        raise HTTPException(status_code=503, detail="Cache unavailable")
+    if semantic_cache is not None:
+        semantic_cache.clear()
+    return {"status": "ok", "generation": generation}
+
+
 @app.post("/api/cache/flush")
 async def flush_cache():
     """
     Flush the cache.
     """
-    count = cache.flush()
+    count = await cache.flush()
+    if semantic_cache is not None:
+        count += semantic_cache.clear()
     return {"status": "ok", "flushed": count}
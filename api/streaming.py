@@ -0,0 +1,70 @@
+# api/streaming.py
+import asyncio
+import json
+from typing import Any, Dict
+from uuid import UUID
+from langchain.callbacks.base import AsyncCallbackHandler
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """
+    Format an event as a Server-Sent Events message.
+
+    Args:
+        event: Event name
+        data: JSON serializable event payload
+
+    Returns:
+        SSE formatted message
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class EventQueueCallbackHandler(AsyncCallbackHandler):
+    """Callback handler forwarding agent events to an asyncio queue."""
+
+    def __init__(self, queue: asyncio.Queue):
+        """
+        Initialize the handler.
+
+        Args:
+            queue: Queue consumed by the streaming response
+        """
+        self.queue = queue
+
+        # Tool run id -> tool name, to label the end of each tool run
+        self._tool_names: Dict[UUID, str] = {}
+
+    def emit(self, event: str, data: Dict[str, Any]):
+        """
+        Push an event to the queue.
+
+        Args:
+            event: Event name
+            data: Event payload
+        """
+        self.queue.put_nowait((event, data))
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.emit("agent_token", {"token": token})
+
+    async def on_tool_start(
+        self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        tool_name = serialized.get("name")
+        self._tool_names[run_id] = tool_name
+        self.emit("tool_start", {"tool": tool_name, "input": input_str})
+
+    async def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self.emit("tool_end", {"tool": self._tool_names.pop(run_id, None)})
+
+    async def on_tool_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self.emit(
+            "tool_error",
+            {"tool": self._tool_names.pop(run_id, None), "detail": str(error)},
+        )
+
+    async def on_retriever_end(self, documents, **kwargs: Any) -> None:
+        self.emit("retrieval_done", {"documents": len(documents)})
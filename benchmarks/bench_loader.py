@@ -0,0 +1,66 @@
+# benchmarks/bench_loader.py
+import asyncio
+from benchmarks.harness import benchmark, measure
+from data.loader import LegalDataLoader
+
+
+@benchmark("loader.extract_articles_from_node")
+def bench_extract_articles(ctx):
+    """Extract the documents of an already parsed code tree."""
+    loader = LegalDataLoader(ctx.law_code)
+
+    def extract():
+        for item in ctx.tree["content"]:
+            loader.extract_articles_from_node(item)
+
+    return measure(extract, ctx.rounds, items=ctx.articles, unit="articles")
+
+
+@benchmark("loader.load")
+def bench_load(ctx):
+    """Read, parse and extract a code file."""
+    loader = ctx.loader()
+    return measure(
+        loader.parse,
+        ctx.rounds,
+        items=ctx.articles,
+        unit="articles",
+    )
+
+
+@benchmark("loader.load_store")
+def bench_load_store(ctx):
+    """Read every document of a code from its article store."""
+    loader = ctx.loader()
+    loader.build_store().close()
+    return measure(
+        lambda: asyncio.run(loader.load()),
+        ctx.rounds,
+        items=ctx.articles,
+        unit="articles",
+    )
+
+
+@benchmark("store.get_article")
+def bench_get_article(ctx):
+    """Fetch single articles by number from an article store."""
+    with ctx.loader().build_store() as store:
+        nums = list(store.nums)[:100]
+        return measure(
+            lambda: [store.get(num) for num in nums],
+            ctx.rounds,
+            items=len(nums),
+            unit="articles",
+        )
+
+
+@benchmark("loader.stream")
+def bench_stream(ctx):
+    """Extract the documents of a code file while reading it."""
+    loader = ctx.loader()
+    return measure(
+        lambda: sum(1 for _ in loader.stream()),
+        ctx.rounds,
+        items=ctx.articles,
+        unit="articles",
+    )
@@ -0,0 +1,68 @@
+# benchmarks/bench_vectorstore.py
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import FAISS
+from benchmarks.harness import benchmark, measure
+from config import CHUNK_SIZE, CHUNK_OVERLAP
+
+# Neighbours retrieved per query, as by the RAG tools
+RETRIEVAL_K = 4
+
+
+@benchmark("vectorstore.split_documents")
+def bench_split_documents(ctx):
+    """Chunk the documents as create_vectorstore does."""
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
+    )
+    return measure(
+        lambda: splitter.split_documents(ctx.documents),
+        ctx.rounds,
+        items=len(ctx.documents),
+        unit="documents",
+    )
+
+
+@benchmark("embeddings.embed_documents")
+def bench_embed_documents(ctx):
+    """Embed a sample of the chunks."""
+    texts = [chunk.page_content for chunk in ctx.chunks[: ctx.embedding_sample]]
+    return measure(
+        lambda: ctx.embedding_model.embed_documents(texts),
+        ctx.rounds,
+        items=len(texts),
+        unit="chunks",
+    )
+
+
+@benchmark("vectorstore.faiss_build")
+def bench_faiss_build(ctx):
+    """Build the FAISS index and docstore from precomputed embeddings."""
+    pairs = list(zip([chunk.page_content for chunk in ctx.chunks], ctx.vectors))
+    metadatas = [chunk.metadata for chunk in ctx.chunks]
+    return measure(
+        lambda: FAISS.from_embeddings(pairs, ctx.embedding_model, metadatas),
+        ctx.rounds,
+        items=len(pairs),
+        unit="chunks",
+    )
+
+
+@benchmark("vectorstore.load_vectorstore")
+def bench_load_vectorstore(ctx):
+    """Load a saved index from disk."""
+    manager = ctx.saved_vectorstore_manager()
+    return measure(
+        manager.load_vectorstore, ctx.rounds, items=len(ctx.chunks), unit="chunks"
+    )
+
+
+@benchmark("vectorstore.similarity_search_k4")
+def bench_similarity_search(ctx):
+    """Retrieve the nearest chunks of a batch of queries."""
+    vectorstore = ctx.vectorstore
+
+    def search():
+        for query in ctx.queries:
+            vectorstore.similarity_search(query, k=RETRIEVAL_K)
+
+    return measure(search, ctx.rounds, items=len(ctx.queries), unit="queries")
@@ -0,0 +1,107 @@
+# benchmarks/compare.py
+"""
+Compare benchmark results with a baseline, failing on regressions.
+
+Example:
+    python -m benchmarks.compare benchmarks/baselines/main.json benchmarks/results.json
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10
+) -> List[Dict[str, Any]]:
+    """
+    Compare the median durations of two benchmark runs.
+
+    Args:
+        baseline: Results of the baseline run
+        current: Results of the run to check
+        threshold: Relative slowdown above which a benchmark regressed
+
+    Returns:
+        One row per benchmark with its change and status
+        (regression, improvement, ok, new or missing)
+    """
+    rows = []
+    baseline_results = baseline["benchmarks"]
+    current_results = current["benchmarks"]
+
+    for name in sorted(set(baseline_results) | set(current_results)):
+        if name not in current_results:
+            rows.append({"name": name, "status": "missing"})
+            continue
+        if name not in baseline_results:
+            rows.append({"name": name, "status": "new"})
+            continue
+
+        before = baseline_results[name]["median"]
+        after = current_results[name]["median"]
+        change = after / before - 1 if before else 0.0
+
+        if change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append(
+            {
+                "name": name,
+                "baseline": before,
+                "current": after,
+                "change": change,
+                "status": status,
+            }
+        )
+
+    return rows
+
+
+def main():
+    """
+    Print the comparison and exit with status 1 if a benchmark regressed.
+    """
+    parser = argparse.ArgumentParser(description="Compare benchmark results")
+    parser.add_argument("baseline", help="Baseline results JSON file")
+    parser.add_argument("current", help="Current results JSON file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative slowdown flagged as a regression (default 0.10)",
+    )
+
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    if baseline.get("config") != current.get("config"):
+        print("Warning: the runs used different configurations")
+    if baseline.get("environment") != current.get("environment"):
+        print("Warning: the runs used different environments")
+
+    rows = compare(baseline, current, args.threshold)
+    for row in rows:
+        if "change" in row:
+            print(
+                f"{row['name']:<40} {row['baseline'] * 1000:>10.2f} ms "
+                f"-> {row['current'] * 1000:>10.2f} ms "
+                f"{row['change']:>+8.1%}  {row['status']}"
+            )
+        else:
+            print(f"{row['name']:<40} {row['status']}")
+
+    if any(row["status"] == "regression" for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/harness.py
+import gc
+import platform
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Registered benchmarks, in registration order
+BENCHMARKS: Dict[str, Callable] = {}
+
+
+def benchmark(name: str):
+    """
+    Register a benchmark function.
+
+    The function receives the benchmark context and returns the result of
+    measure().
+
+    Args:
+        name: Unique name of the benchmark (e.g. loader.load)
+    """
+
+    def register(func: Callable) -> Callable:
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+def measure(
+    func: Callable[[], Any],
+    rounds: int = 5,
+    warmup: int = 1,
+    items: Optional[int] = None,
+    unit: str = "items",
+) -> Dict[str, Any]:
+    """
+    Time a function over several rounds.
+
+    Garbage collection is disabled while timing, so that collections
+    triggered by earlier rounds do not add noise.
+
+    Args:
+        func: Function to time
+        rounds: Number of timed rounds
+        warmup: Number of untimed rounds run first
+        items: Number of items processed per call, to report a throughput
+        unit: Name of the items (e.g. articles, chunks, queries)
+
+    Returns:
+        Median, min, mean and standard deviation in seconds, and throughput
+    """
+    for _ in range(warmup):
+        func()
+
+    durations: List[float] = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start_time = time.perf_counter()
+            func()
+            durations.append(time.perf_counter() - start_time)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    median = statistics.median(durations)
+    result = {
+        "median": median,
+        "min": min(durations),
+        "mean": statistics.fmean(durations),
+        "stdev": statistics.stdev(durations) if len(durations) > 1 else 0.0,
+        "rounds": rounds,
+    }
+    if items:
+        result["items"] = items
+        result["throughput"] = items / median if median else 0.0
+        result["unit"] = f"{unit}/s"
+
+    return result
+
+
+def environment() -> Dict[str, str]:
+    """
+    Describe the machine running the benchmarks.
+
+    Returns:
+        Python version, platform and processor
+    """
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
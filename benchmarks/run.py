@@ -0,0 +1,242 @@
+# benchmarks/run.py
+"""
+Run the micro-benchmarks of the ingestion and retrieval hot paths.
+
+Example:
+    python -m benchmarks.run --articles 20000 --save-baseline main
+    python -m benchmarks.compare benchmarks/baselines/main.json benchmarks/results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+from functools import cached_property
+from typing import Any, Dict, List
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import FAISS
+from benchmarks import bench_loader, bench_vectorstore  # noqa: F401 (registration)
+from benchmarks.harness import BENCHMARKS, environment
+from data.loader import LegalDataLoader
+from data.synthetic import generate_code
+from loadtest.questions import POPULAR_QUESTIONS
+from models.vectorstore import VectorstoreManager
+from config import CHUNK_SIZE, CHUNK_OVERLAP
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+
+class BenchmarkContext:
+    """Inputs shared by the benchmarks, built on first use."""
+
+    law_code = "benchmark_code"
+
+    def __init__(
+        self,
+        workdir: str,
+        articles: int = 5000,
+        depth: int = 4,
+        fanout: int = 5,
+        rounds: int = 5,
+        embeddings: str = "fake",
+        embedding_sample: int = 256,
+        seed: int = 0,
+    ):
+        """
+        Initialize the context.
+
+        Args:
+            workdir: Directory receiving the code file and the saved index
+            articles: Number of articles of the synthetic code
+            depth: Depth of the section tree
+            fanout: Subsections per section
+            rounds: Timed rounds per benchmark
+            embeddings: "fake" for deterministic hash embeddings, "model" for
+                the configured embedding model
+            embedding_sample: Number of chunks embedded by the embedding benchmark
+            seed: Random seed of the synthetic code
+        """
+        self.workdir = workdir
+        self.articles = articles
+        self.depth = depth
+        self.fanout = fanout
+        self.rounds = rounds
+        self.embeddings = embeddings
+        self.embedding_sample = embedding_sample
+        self.seed = seed
+
+    @cached_property
+    def tree(self) -> Dict[str, Any]:
+        return generate_code(
+            self.articles, depth=self.depth, fanout=self.fanout, seed=self.seed
+        )
+
+    @cached_property
+    def json_path(self) -> str:
+        # Legifrance files are written with indent=2
+        path = os.path.join(self.workdir, f"{self.law_code}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.tree, f, ensure_ascii=False, indent=2)
+        return path
+
+    def loader(self) -> LegalDataLoader:
+        """Return a loader reading the synthetic code file."""
+        loader = LegalDataLoader(self.law_code)
+        loader.file_path = self.json_path
+        return loader
+
+    @cached_property
+    def documents(self):
+        return asyncio.run(self.loader().load())
+
+    @cached_property
+    def chunks(self):
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
+        )
+        return splitter.split_documents(self.documents)
+
+    @cached_property
+    def embedding_model(self):
+        if self.embeddings == "model":
+            from models.embeddings import get_embedding_model
+
+            return get_embedding_model()
+
+        from langchain_community.embeddings import DeterministicFakeEmbedding
+
+        return DeterministicFakeEmbedding(size=384)
+
+    @cached_property
+    def vectors(self) -> List[List[float]]:
+        return self.embedding_model.embed_documents(
+            [chunk.page_content for chunk in self.chunks]
+        )
+
+    @cached_property
+    def vectorstore(self) -> FAISS:
+        return FAISS.from_embeddings(
+            list(zip([chunk.page_content for chunk in self.chunks], self.vectors)),
+            self.embedding_model,
+            [chunk.metadata for chunk in self.chunks],
+        )
+
+    @cached_property
+    def queries(self) -> List[str]:
+        return POPULAR_QUESTIONS
+
+    def saved_vectorstore_manager(self) -> VectorstoreManager:
+        """Return a manager of the saved index of the synthetic code."""
+        manager = VectorstoreManager(self.law_code, self.embedding_model)
+        manager.index_path = os.path.join(self.workdir, "indices", self.law_code)
+        if not os.path.exists(manager.index_path):
+            self.vectorstore.save_local(manager.index_path)
+        return manager
+
+
+def run_benchmarks(context: BenchmarkContext, only: List[str] = None) -> Dict:
+    """
+    Run the registered benchmarks.
+
+    Args:
+        context: Inputs of the benchmarks
+        only: Optional substrings selecting the benchmarks to run
+
+    Returns:
+        Environment, configuration and result of each benchmark
+    """
+    results = {}
+    for name, func in BENCHMARKS.items():
+        if only and not any(pattern in name for pattern in only):
+            continue
+        print(f"Running {name}...")
+        results[name] = func(context)
+        result = results[name]
+        throughput = (
+            f", {result['throughput']:.1f} {result['unit']}"
+            if "throughput" in result
+            else ""
+        )
+        print(f"  median {result['median'] * 1000:.2f} ms{throughput}")
+
+    return {
+        "environment": environment(),
+        "config": {
+            "articles": context.articles,
+            "depth": context.depth,
+            "fanout": context.fanout,
+            "embeddings": context.embeddings,
+            "embedding_sample": context.embedding_sample,
+            "chunk_size": CHUNK_SIZE,
+            "chunk_overlap": CHUNK_OVERLAP,
+        },
+        "benchmarks": results,
+    }
+
+
+def main():
+    """
+    Run the benchmarks and write their results.
+    """
+    parser = argparse.ArgumentParser(description="Hot path micro-benchmarks")
+    parser.add_argument(
+        "--articles", type=int, default=5000, help="Articles of the synthetic code"
+    )
+    parser.add_argument("--depth", type=int, default=4, help="Depth of the code tree")
+    parser.add_argument("--fanout", type=int, default=5, help="Subsections/section")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds")
+    parser.add_argument(
+        "--embeddings",
+        choices=["fake", "model"],
+        default="fake",
+        help="Deterministic fake embeddings or the configured embedding model",
+    )
+    parser.add_argument(
+        "--embedding-sample",
+        type=int,
+        default=256,
+        help="Chunks embedded by the embedding benchmark",
+    )
+    parser.add_argument(
+        "--only", nargs="*", default=None, help="Run the benchmarks matching these"
+    )
+    parser.add_argument(
+        "--output",
+        default=os.path.join(os.path.dirname(__file__), "results.json"),
+        help="File receiving the results",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        default=None,
+        metavar="NAME",
+        help="Also save the results as benchmarks/baselines/NAME.json",
+    )
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        context = BenchmarkContext(
+            workdir,
+            articles=args.articles,
+            depth=args.depth,
+            fanout=args.fanout,
+            rounds=args.rounds,
+            embeddings=args.embeddings,
+            embedding_sample=args.embedding_sample,
+        )
+        report = run_benchmarks(context, args.only)
+
+    paths = [args.output]
+    if args.save_baseline:
+        paths.append(os.path.join(BASELINE_DIR, f"{args.save_baseline}.json"))
+
+    for path in paths:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
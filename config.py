@@ -10,6 +10,24 @@ REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", "")
 REDIS_TTL = int(os.getenv("REDIS_TTL", 3600))  # 1 hour default TTL
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 2.0))
+REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", 1.0))
+
+# Keys deleted per UNLINK when flushing the cache
+CACHE_FLUSH_BATCH_SIZE = int(os.getenv("CACHE_FLUSH_BATCH_SIZE", 500))
+# Seconds between two reads of the cache generation counter
+CACHE_GENERATION_REFRESH = float(os.getenv("CACHE_GENERATION_REFRESH", 5.0))
+
+# In-process cache tier in front of Redis (0 entries to disable it)
+CACHE_LOCAL_MAX_ENTRIES = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", 1024))
+CACHE_LOCAL_TTL = int(os.getenv("CACHE_LOCAL_TTL", 300))
+# Invalidate every worker's local tier over Redis pub/sub
+CACHE_PUBSUB_ENABLED = os.getenv("CACHE_PUBSUB_ENABLED", "False").lower() in (
+    "true",
+    "1",
+    "t",
+)
 
 
 # API Keys
@@ -24,17 +42,100 @@ DEFAULT_MODEL = "llama3-8b-8192"
 DEFAULT_TEMPERATURE = 0.3
 DEFAULT_MAX_TOKENS = 512
 
+# Groq HTTP client pool, shared by every GroqLLM
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", 60))
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", 100))
+GROQ_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", 20))
+GROQ_KEEPALIVE_EXPIRY = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", 30))
+
+# Groq rate limit budgets of the account (0 for no client-side limit)
+GROQ_REQUESTS_PER_MINUTE = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", 0))
+GROQ_TOKENS_PER_MINUTE = int(os.getenv("GROQ_TOKENS_PER_MINUTE", 0))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", 5))
+GROQ_RETRY_BASE_DELAY = float(os.getenv("GROQ_RETRY_BASE_DELAY", 1.0))
+GROQ_RETRY_MAX_DELAY = float(os.getenv("GROQ_RETRY_MAX_DELAY", 30.0))
+
 # Embeddings Configuration
 EMBEDDING_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 32))
+EMBEDDING_NORMALIZE = os.getenv("EMBEDDING_NORMALIZE", "False").lower() in (
+    "true",
+    "1",
+    "t",
+)
+# Torch intra-op threads (0 for torch default)
+EMBEDDING_NUM_THREADS = int(os.getenv("EMBEDDING_NUM_THREADS", 0))
+
+# Request coalescing: concurrent identical queries share one computation
+SINGLEFLIGHT_DISTRIBUTED = os.getenv("SINGLEFLIGHT_DISTRIBUTED", "False").lower() in (
+    "true",
+    "1",
+    "t",
+)  # Also coalesce across workers with Redis locks
+SINGLEFLIGHT_LOCK_TTL = int(os.getenv("SINGLEFLIGHT_LOCK_TTL", 120))
+SINGLEFLIGHT_POLL_INTERVAL = float(os.getenv("SINGLEFLIGHT_POLL_INTERVAL", 0.25))
+
+# Semantic cache: reuse answers of similar queries
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "False").lower() in (
+    "true",
+    "1",
+    "t",
+)
+# Minimum cosine similarity between two queries sharing an answer
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.92))
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", 86400))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 5000))
+
+# Admission control of the expensive query path (cache hits bypass it)
+# Queries computed concurrently per worker (0 to disable admission control)
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", 16))
+# Queries waiting for a slot before new ones are rejected
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", 64))
+# Maximum time in seconds a query waits for a slot
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 10.0))
+# Status code of rejected queries (429 or 503) and their Retry-After in seconds
+ADMISSION_REJECT_STATUS = int(os.getenv("ADMISSION_REJECT_STATUS", 503))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 5))
+
+# Latency budget of a query, overridable per request (0 for no deadline)
+QUERY_DEADLINE_MS = int(os.getenv("QUERY_DEADLINE_MS", 60000))
+# Remaining budget below which the Google search is skipped
+DEADLINE_SEARCH_MIN_MS = int(os.getenv("DEADLINE_SEARCH_MIN_MS", 10000))
+# Remaining budget below which only the direct answer is computed
+DEADLINE_AGENT_MIN_MS = int(os.getenv("DEADLINE_AGENT_MIN_MS", 5000))
+# Expected duration of one agent iteration, used to cap the iterations
+DEADLINE_AGENT_ITERATION_MS = int(os.getenv("DEADLINE_AGENT_ITERATION_MS", 3000))
+# Maximum number of agent iterations
+AGENT_MAX_ITERATIONS = int(os.getenv("AGENT_MAX_ITERATIONS", 15))
 
 # Retrieval Configuration
 CHUNK_SIZE = 512
 CHUNK_OVERLAP = 50
+# Chunks embedded together when updating an index
+INDEX_STREAM_BATCH_SIZE = int(os.getenv("INDEX_STREAM_BATCH_SIZE", 256))
+# Processes loading and splitting law codes during a build (0 for one per CPU)
+INDEX_BUILD_WORKERS = int(os.getenv("INDEX_BUILD_WORKERS", 0))
+# Chunks embedded and checkpointed together during a build
+INDEX_BUILD_BATCH_SIZE = int(os.getenv("INDEX_BUILD_BATCH_SIZE", 512))
 
 # Server Configuration
 HOST = os.getenv("HOST")
 PORT = int(os.getenv("PORT"))
 
+# RAG Registry Configuration
+# Comma separated law codes loaded when the API starts
+RAG_PRELOAD_CODES = [
+    code.strip()
+    for code in os.getenv("RAG_PRELOAD_CODES", "").split(",")
+    if code.strip()
+]
+# Registry bounds (0 for no limit), the memory bound covering the index vectors
+# and the chunk texts and metadata
+RAG_REGISTRY_MAX_CODES = int(os.getenv("RAG_REGISTRY_MAX_CODES", 16))
+RAG_REGISTRY_MAX_MEMORY_MB = int(os.getenv("RAG_REGISTRY_MAX_MEMORY_MB", 0))
+# Maximum number of cached agents (one per law code set and tool options)
+AGENT_CACHE_MAX_SIZE = int(os.getenv("AGENT_CACHE_MAX_SIZE", 32))
+
 # 📚 Liste des codes à récupérer (tu peux en rajouter d'autres)
 CODES = [
     "Code civil",
@@ -104,11 +205,24 @@ CODES = [
 
 # Folder where to store files
 FOLDER_NAME = "legifrance"
+# Subfolder of the pre-parsed article stores, read instead of the JSON files
+ARTICLE_STORE_FOLDER = "store"
+ARTICLE_STORE_ENABLED = os.getenv("ARTICLE_STORE_ENABLED", "True").lower() in (
+    "true",
+    "1",
+    "t",
+)
+# Processes loading law codes in parallel in load_all (0 for one per CPU)
+LOADER_WORKERS = int(os.getenv("LOADER_WORKERS", 0))
 
 # Logging Configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_FILE = os.getenv("LOG_FILE", "")  # Empty for stdout
+# Format and write log records on a background thread
+LOG_QUEUE_ENABLED = os.getenv("LOG_QUEUE_ENABLED", "True").lower() in ("true", "1", "t")
+# Fraction of successful requests logged by the request log middleware
+REQUEST_LOG_SAMPLE_RATE = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", 1.0))
 
 # Monitoring
 ENABLE_METRICS = os.getenv("ENABLE_METRICS", "True").lower() in ("true", "1", "t")
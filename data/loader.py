@@ -1,9 +1,19 @@
 # data/loader.py
+import asyncio
 import json
+import multiprocessing
 import os
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Tuple
 from langchain.schema import Document
-from config import FOLDER_NAME
+from config import (
+    ARTICLE_STORE_ENABLED,
+    ARTICLE_STORE_FOLDER,
+    FOLDER_NAME,
+    LOADER_WORKERS,
+)
+from data.store import PATH_SEPARATOR, ArticleStore
+from data.streaming import ijson, make_document, stream_articles
 
 
 class LegalDataLoader:
@@ -20,36 +30,70 @@ class LegalDataLoader:
         self.base_path = os.path.join(os.path.dirname(__file__), FOLDER_NAME)
         self.file_path = os.path.join(self.base_path, f"{self.law_code_name}.json")
 
-    def extract_articles_from_node(self, node, path=None):
-        path = path or []
-        documents = []
+    def iter_articles_from_node(self, node, path: str = "") -> Iterator[Document]:
+        """
+        Iterate over the article documents of a section and its subsections.
 
-        # Get current path
-        title = node.get("section_data", {}).get("title")
-        if title:
-            path = path + [title]
-
-        # Extract articles
-        for article in node.get("articles", []):
-            if article.get("content"):
-                metadata = {
-                    "pathTitle": " > ".join(path),
-                    "num": article.get("num"),
-                    "etat": article.get("etat"),
-                }
-                documents.append(
-                    Document(page_content=article["content"], metadata=metadata)
-                )
+        The tree is walked with an explicit stack, so deep codes cannot hit the
+        recursion limit.
 
-        # Recurse into subsections
-        for subsection in node.get("subsections", []):
-            documents.extend(self.extract_articles_from_node(subsection, path))
+        Args:
+            node: Section of the law code
+            path: pathTitle of the parent section
 
-        return documents
+        Returns:
+            Iterator over the documents, parents before their subsections
+        """
+        stack = [(node, path)]
+        while stack:
+            node, path = stack.pop()
 
-    async def load(self) -> List[Document]:
+            # Get current path
+            title = node.get("section_data", {}).get("title")
+            if title:
+                path = path + PATH_SEPARATOR + title if path else title
+
+            # Extract articles
+            for article in node.get("articles", []):
+                if article.get("content"):
+                    yield make_document(article, path)
+
+            # Visit the subsections in order
+            for subsection in reversed(node.get("subsections", [])):
+                stack.append((subsection, path))
+
+    def extract_articles_from_node(self, node, path=None) -> List[Document]:
         """
-        Load documents from the JSON file for the specified law code.
+        Extract the article documents of a section and its subsections.
+
+        Args:
+            node: Section of the law code
+            path: Titles of the parent sections
+
+        Returns:
+            List of Document objects
+        """
+        return list(self.iter_articles_from_node(node, PATH_SEPARATOR.join(path or [])))
+
+    @property
+    def store_prefix(self) -> str:
+        """Path of the article store files of the law code, without extension."""
+        return os.path.join(
+            os.path.dirname(self.file_path), ARTICLE_STORE_FOLDER, self.law_code_name
+        )
+
+    def open_store(self) -> Optional[ArticleStore]:
+        """
+        Open the article store of the law code if it is up to date.
+
+        Returns:
+            The opened store, or None if it must be built from the JSON file
+        """
+        return ArticleStore.open_if_fresh(self.store_prefix, self.file_path)
+
+    def parse(self) -> List[Document]:
+        """
+        Parse the JSON file of the law code.
 
         Returns:
             List of Document objects
@@ -66,20 +110,99 @@ class LegalDataLoader:
         # Adapt this part based on the actual structure of your JSON files
         for item in data.get("content", []):
             # Extract article ID and content
-            documents.extend(self.extract_articles_from_node(item))
+            documents.extend(self.iter_articles_from_node(item))
 
         return documents
 
+    def stream(self) -> Iterator[Document]:
+        """
+        Iterate over the documents of the law code while reading its JSON file,
+        keeping memory bounded on huge codes. The whole file is parsed at once
+        when ijson is not installed.
+
+        Returns:
+            Iterator over Document objects, in file order
+        """
+        if ijson is None:
+            yield from self.parse()
+            return
+
+        if not os.path.exists(self.file_path):
+            raise FileNotFoundError(f"Law code file not found: {self.file_path}")
+
+        with open(self.file_path, "rb") as f:
+            yield from stream_articles(f)
+
+    def build_store(self) -> ArticleStore:
+        """
+        Convert the JSON file of the law code into its article store.
+
+        Returns:
+            The opened store
+        """
+        return ArticleStore.build(self.parse(), self.store_prefix, self.file_path)
+
+    def lazy_load(self) -> Iterator[Document]:
+        """
+        Iterate over the documents of the law code, reading the article
+        store one article at a time when it is available.
+
+        Returns:
+            Iterator over Document objects
+        """
+        store = self.open_store() if ARTICLE_STORE_ENABLED else None
+        if store is None:
+            yield from self.parse()
+            return
+
+        with store:
+            yield from store.documents()
+
+    async def load(self) -> List[Document]:
+        """
+        Load documents for the specified law code, from its article store
+        when it is available and from the JSON file otherwise.
+
+        Returns:
+            List of Document objects
+        """
+        return list(self.lazy_load())
+
+    def get_article(self, num: str) -> List[Document]:
+        """
+        Fetch the versions of a single article without loading the law code.
+
+        Args:
+            num: Article number (e.g. L110-1)
+
+        Returns:
+            Documents of the article, empty if the number is unknown
+        """
+        store = self.open_store()
+        # Stores without articles are falsy, but do not need to be rebuilt
+        if store is None:
+            store = self.build_store()
+        with store:
+            return store.get(num)
+
     @staticmethod
-    async def load_all(law_codes: List[str] = None) -> Dict[str, List[Document]]:
+    async def iter_load_all(
+        law_codes: List[str] = None, workers: Optional[int] = None
+    ) -> AsyncIterator[Tuple[str, List[Document]]]:
         """
-        Load documents from all available law codes or from a specified list.
+        Load law codes, yielding each one as soon as it is loaded.
+
+        With several workers, the files are parsed in a process pool so the
+        codes load in parallel instead of one after another.
 
         Args:
             law_codes: Optional list of law code names to load
+            workers: Number of worker processes (None for LOADER_WORKERS,
+                0 for one per CPU, 1 to load in this process)
 
         Returns:
-            Dictionary mapping law code names to lists of documents
+            Async iterator over (law code name, documents) pairs, in
+            completion order. Missing law codes are skipped.
         """
         base_path = os.path.join(os.path.dirname(__file__), "legifrance")
 
@@ -91,15 +214,62 @@ class LegalDataLoader:
                 if f.endswith(".json")
             ]
 
+        if workers is None:
+            workers = LOADER_WORKERS
+        workers = min(workers or os.cpu_count() or 1, len(law_codes))
+
+        if workers <= 1:
+            for law_code in law_codes:
+                loader = LegalDataLoader(law_code)
+                try:
+                    documents = await loader.load()
+                except FileNotFoundError:
+                    print(f"Warning: Law code file not found for {law_code}")
+                    continue
+                yield law_code, documents
+            return
+
+        loop = asyncio.get_running_loop()
+        # Spawned workers do not inherit the threads and locks of this process
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = [
+                loop.run_in_executor(
+                    executor,
+                    _load_law_code,
+                    law_code,
+                    LegalDataLoader(law_code).file_path,
+                )
+                for law_code in law_codes
+            ]
+            for future in asyncio.as_completed(futures):
+                law_code, documents = await future
+                if documents is None:
+                    print(f"Warning: Law code file not found for {law_code}")
+                    continue
+                yield law_code, documents
+
+    @staticmethod
+    async def load_all(
+        law_codes: List[str] = None, workers: Optional[int] = None
+    ) -> Dict[str, List[Document]]:
+        """
+        Load documents from all available law codes or from a specified list.
+
+        Args:
+            law_codes: Optional list of law code names to load
+            workers: Number of worker processes (None for LOADER_WORKERS,
+                0 for one per CPU, 1 to load in this process)
+
+        Returns:
+            Dictionary mapping law code names to lists of documents
+        """
         result = {}
-        for law_code in law_codes:
-            loader = LegalDataLoader(law_code)
-            try:
-                documents = await loader.load()
-                result[law_code] = documents
-            except FileNotFoundError:
-                print(f"Warning: Law code file not found for {law_code}")
-                continue
+        async for law_code, documents in LegalDataLoader.iter_load_all(
+            law_codes, workers
+        ):
+            result[law_code] = documents
 
         return result
 
@@ -118,3 +288,24 @@ class LegalDataLoader:
         return [
             os.path.splitext(f)[0] for f in os.listdir(base_path) if f.endswith(".json")
         ]
+
+
+def _load_law_code(
+    law_code: str, file_path: str
+) -> Tuple[str, Optional[List[Document]]]:
+    """
+    Load a law code in a worker process.
+
+    Args:
+        law_code: Name of the law code
+        file_path: JSON file of the law code
+
+    Returns:
+        The law code name and its documents, None if the file is missing
+    """
+    loader = LegalDataLoader(law_code)
+    loader.file_path = file_path
+    try:
+        return law_code, list(loader.lazy_load())
+    except FileNotFoundError:
+        return law_code, None
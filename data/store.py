@@ -0,0 +1,253 @@
+# data/store.py
+"""
+Compact on-disk article store of a law code.
+
+A store is made of two files next to each other:
+    <code>.jsonl: one compact JSON array [num, etat, path, content] per
+        article, in document order, path being a position in the path table
+    <code>.index.json: path table, line offsets, article numbers and
+        section ranges
+
+The articles file is memory-mapped, so opening a store only reads the index
+and single articles or sections are decoded on demand.
+"""
+
+import json
+import mmap
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from langchain.schema import Document
+
+try:
+    from orjson import loads as _loads
+except ImportError:  # orjson is optional
+    _loads = json.loads
+
+# Version of the store format, stores of another version are rebuilt
+STORE_VERSION = 1
+
+# Separator of the section titles in pathTitle
+PATH_SEPARATOR = " > "
+
+
+def store_paths(prefix: str) -> tuple:
+    """Return the articles and index file paths of a store."""
+    return f"{prefix}.jsonl", f"{prefix}.index.json"
+
+
+def source_signature(source_path: str) -> Optional[Dict[str, int]]:
+    """Return the size and modification time of a source file, or None."""
+    try:
+        stat = os.stat(source_path)
+    except OSError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class ArticleStore:
+    """Read-only, memory-mapped article store of a law code."""
+
+    def __init__(self, prefix: str):
+        """
+        Open an existing store.
+
+        Args:
+            prefix: Path of the store files without their extension
+
+        Raises:
+            FileNotFoundError: If the store does not exist
+            ValueError: If the store was written by another format version
+        """
+        self.prefix = prefix
+        self.articles_path, self.index_path = store_paths(prefix)
+
+        with open(self.index_path, "rb") as f:
+            index = _loads(f.read())
+        if index.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported article store version in {prefix}")
+
+        self.source = index.get("source")
+        # pathTitle of the sections holding articles
+        self.paths: List[str] = index["paths"]
+        # Start of every record, followed by the end of the last one
+        self.offsets: List[int] = index["offsets"]
+        self.nums: Dict[str, List[int]] = index["nums"]
+        # Section path to [start, end) record ranges of its whole subtree
+        self.sections: Dict[str, List[List[int]]] = index["sections"]
+
+        self._file = open(self.articles_path, "rb")
+        self._mmap = None
+        if self.offsets[-1]:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def open_if_fresh(
+        cls, prefix: str, source_path: Optional[str] = None
+    ) -> Optional["ArticleStore"]:
+        """
+        Open a store if it exists and matches its source file.
+
+        Args:
+            prefix: Path of the store files without their extension
+            source_path: JSON file the store was built from (None to skip the
+                check). A missing source file does not invalidate the store.
+
+        Returns:
+            The opened store, or None if it is missing, outdated or unreadable
+        """
+        try:
+            store = cls(prefix)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        if source_path is not None:
+            signature = source_signature(source_path)
+            if signature is not None and signature != store.source:
+                store.close()
+                return None
+        return store
+
+    @classmethod
+    def build(
+        cls,
+        documents: Iterable[Document],
+        prefix: str,
+        source_path: Optional[str] = None,
+    ) -> "ArticleStore":
+        """
+        Write the article documents of a law code to a store.
+
+        Args:
+            documents: Article documents, in document order
+            prefix: Path of the store files without their extension
+            source_path: JSON file the documents were extracted from
+
+        Returns:
+            The opened store
+        """
+        articles_path, index_path = store_paths(prefix)
+        os.makedirs(os.path.dirname(os.path.abspath(prefix)), exist_ok=True)
+
+        path_ids: Dict[str, int] = {}
+        offsets = [0]
+        nums: Dict[str, List[int]] = {}
+        sections: Dict[str, List[List[int]]] = {}
+
+        tmp_articles = f"{articles_path}.tmp"
+        with open(tmp_articles, "wb") as f:
+            for i, doc in enumerate(documents):
+                num = doc.metadata.get("num")
+                path = doc.metadata.get("pathTitle", "")
+                path_id = path_ids.setdefault(path, len(path_ids))
+
+                record = [num, doc.metadata.get("etat"), path_id, doc.page_content]
+                line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+                line = line.encode("utf-8") + b"\n"
+                f.write(line)
+                offsets.append(offsets[-1] + len(line))
+
+                if num is not None:
+                    nums.setdefault(num, []).append(i)
+                cls._add_to_sections(sections, path, i)
+
+        index = {
+            "version": STORE_VERSION,
+            "source": source_signature(source_path) if source_path else None,
+            "paths": list(path_ids),
+            "offsets": offsets,
+            "nums": nums,
+            "sections": sections,
+        }
+        tmp_index = f"{index_path}.tmp"
+        with open(tmp_index, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+
+        # The index is replaced last, so readers never see a partial store
+        os.replace(tmp_articles, articles_path)
+        os.replace(tmp_index, index_path)
+        return cls(prefix)
+
+    @staticmethod
+    def _add_to_sections(sections: Dict[str, List[List[int]]], path: str, i: int):
+        """Add record i to the ranges of its section and of all its parents."""
+        if not path:
+            return
+        parts = path.split(PATH_SEPARATOR)
+        for depth in range(1, len(parts) + 1):
+            ranges = sections.setdefault(PATH_SEPARATOR.join(parts[:depth]), [])
+            if ranges and ranges[-1][1] == i:
+                ranges[-1][1] = i + 1
+            else:
+                ranges.append([i, i + 1])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def _to_document(self, record: List[Any]) -> Document:
+        num, etat, path_id, content = record
+        return Document(
+            page_content=content,
+            metadata={"pathTitle": self.paths[path_id], "num": num, "etat": etat},
+        )
+
+    def document(self, i: int) -> Document:
+        """
+        Return the document of a single article.
+
+        Args:
+            i: Position of the article in the code
+
+        Returns:
+            Document with the same metadata as LegalDataLoader documents
+        """
+        if not 0 <= i < len(self):
+            raise IndexError(f"Article {i} out of range")
+        return self._to_document(
+            _loads(self._mmap[self.offsets[i] : self.offsets[i + 1]])
+        )
+
+    def documents(self) -> Iterator[Document]:
+        """Iterate over the documents of every article, in document order."""
+        offsets = self.offsets
+        # Records are decoded one at a time, straight from the mapped file
+        for i in range(len(self)):
+            yield self._to_document(_loads(self._mmap[offsets[i] : offsets[i + 1]]))
+
+    def get(self, num: str) -> List[Document]:
+        """
+        Return the versions of an article.
+
+        Args:
+            num: Article number (e.g. L110-1)
+
+        Returns:
+            Documents of the article, empty if the number is unknown
+        """
+        return [self.document(i) for i in self.nums.get(num, [])]
+
+    def section(self, path: str) -> Iterator[Document]:
+        """
+        Iterate over the articles of a section and its subsections.
+
+        Args:
+            path: Full section path, as in the pathTitle metadata
+
+        Returns:
+            Iterator over the documents of the section
+        """
+        for start, end in self.sections.get(path, []):
+            for i in range(start, end):
+                yield self.document(i)
+
+    def close(self):
+        """Unmap and close the articles file."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self) -> "ArticleStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,169 @@
+# data/streaming.py
+"""
+Incremental extraction of the articles of a Legifrance JSON file.
+
+The file is read as a stream of ijson parser events, so articles are
+produced while the file is being read and memory does not grow with the
+size of the code.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from langchain.schema import Document
+from data.store import PATH_SEPARATOR
+
+try:
+    import ijson
+except ImportError:  # ijson is optional, the loader parses whole files without it
+    ijson = None
+
+# Article fields copied to the documents
+ARTICLE_FIELDS = ("num", "etat", "content")
+
+
+def make_document(article: Dict[str, Any], path: str) -> Document:
+    """Build the document of an article found under the given section path."""
+    return Document(
+        page_content=article["content"],
+        metadata={
+            "pathTitle": path,
+            "num": article.get("num"),
+            "etat": article.get("etat"),
+        },
+    )
+
+
+class _Section:
+    """Section being parsed."""
+
+    __slots__ = ("prefix", "parent", "title", "ready", "pending", "_path")
+
+    def __init__(self, prefix: str, parent: Optional["_Section"]):
+        self.prefix = prefix
+        self.parent = parent
+        self.title = None
+        # Whether the title is known, so the paths below it are final
+        self.ready = False
+        # Articles parsed under this section before its title was known
+        self.pending: List[Tuple[Dict[str, Any], "_Section"]] = []
+        self._path = None
+
+    def path(self) -> str:
+        """Return the pathTitle of the section, once it and its parents are ready."""
+        if self._path is None:
+            parent_path = self.parent.path() if self.parent else ""
+            if self.title and parent_path:
+                self._path = parent_path + PATH_SEPARATOR + self.title
+            else:
+                self._path = self.title or parent_path
+        return self._path
+
+
+def iter_articles_from_events(
+    events: Iterable[Tuple[str, str, Any]],
+) -> Iterator[Document]:
+    """
+    Extract the article documents of a law code from ijson parser events.
+
+    Articles are produced as soon as the titles of their sections are known,
+    which is immediately when section_data comes first in each section, as in
+    the Legifrance exports. Otherwise they are held until the title is found.
+
+    Args:
+        events: (prefix, event, value) tuples of ijson.parse
+
+    Returns:
+        Iterator over the article documents, in file order
+    """
+    stack: List[_Section] = []
+    article: Optional[Dict[str, Any]] = None
+    article_prefix = ""
+    # Prefixes of the title and section_data of the innermost section
+    title_prefix = data_prefix = None
+    # Prefix of the fields of the article being parsed
+    fields_prefix = ""
+
+    def top_changed():
+        nonlocal title_prefix, data_prefix
+        if stack:
+            data_prefix = stack[-1].prefix + ".section_data"
+            title_prefix = data_prefix + ".title"
+        else:
+            data_prefix = title_prefix = None
+
+    def blocker() -> Optional[_Section]:
+        # Outermost section whose title is not known yet
+        for section in stack:
+            if not section.ready:
+                return section
+        return None
+
+    def set_ready(section: _Section) -> Iterator[Document]:
+        if section.ready:
+            return
+        section.ready = True
+        outer = blocker()
+        if outer is not None:
+            outer.pending.extend(section.pending)
+        else:
+            for held, owner in section.pending:
+                yield make_document(held, owner.path())
+        section.pending = []
+
+    for prefix, event, value in events:
+        if article is not None:
+            if event == "end_map" and prefix == article_prefix:
+                if article.get("content"):
+                    section = stack[-1]
+                    outer = blocker()
+                    if outer is None:
+                        yield make_document(article, section.path())
+                    else:
+                        outer.pending.append((article, section))
+                article = None
+            elif prefix.startswith(fields_prefix):
+                field = prefix[len(fields_prefix) :]
+                if field in ARTICLE_FIELDS and event not in (
+                    "start_map",
+                    "start_array",
+                ):
+                    article[field] = value
+            continue
+
+        if event == "start_map":
+            parent = stack[-1] if stack else None
+            if parent is None and prefix == "content.item":
+                stack.append(_Section(prefix, None))
+                top_changed()
+            elif parent is not None and prefix == parent.prefix + ".subsections.item":
+                stack.append(_Section(prefix, parent))
+                top_changed()
+            elif parent is not None and prefix == parent.prefix + ".articles.item":
+                article = {}
+                article_prefix = prefix
+                fields_prefix = prefix + "."
+        elif not stack:
+            continue
+        elif prefix == title_prefix and event == "string":
+            stack[-1].title = value
+            yield from set_ready(stack[-1])
+        elif event == "end_map" and prefix == data_prefix:
+            yield from set_ready(stack[-1])
+        elif event == "end_map" and prefix == stack[-1].prefix:
+            yield from set_ready(stack[-1])
+            stack.pop()
+            top_changed()
+
+
+def stream_articles(file) -> Iterator[Document]:
+    """
+    Extract the article documents of a law code file while reading it.
+
+    Args:
+        file: Law code JSON file opened in binary mode
+
+    Returns:
+        Iterator over the article documents, in file order
+    """
+    if ijson is None:
+        raise ImportError("ijson is required to stream law code files")
+    return iter_articles_from_events(ijson.parse(file))
@@ -0,0 +1,266 @@
+# data/synthetic.py
+"""
+Generate synthetic law codes shaped like the Legifrance exports.
+
+Example:
+    python -m data.synthetic --name code_synthetique --articles 100000 --depth 5
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+from typing import Any, Dict, List
+from config import FOLDER_NAME
+
+# Titles of the section levels, from the top of the tree
+LEVEL_TITLES = ["Livre", "Titre", "Chapitre", "Section", "Sous-section", "Paragraphe"]
+
+SUBJECTS = [
+    "Dispositions générales",
+    "Des obligations",
+    "Des contrats spéciaux",
+    "De la responsabilité",
+    "Des sûretés",
+    "De la prescription",
+    "Des personnes",
+    "Des biens",
+    "Des successions",
+    "Des procédures",
+    "Des sanctions",
+    "Dispositions transitoires",
+    "Des impositions",
+    "Du recouvrement",
+    "Du contentieux",
+]
+
+SENTENCES = [
+    "Les dispositions du présent article s'appliquent sous réserve des "
+    "stipulations contraires.",
+    "Le délai court à compter du jour où le titulaire du droit a connu ou "
+    "aurait dû connaître les faits lui permettant de l'exercer.",
+    "Toute clause contraire est réputée non écrite.",
+    "Un décret en Conseil d'État précise les conditions d'application du "
+    "présent article.",
+    "La juridiction compétente peut, à la demande de l'une des parties, "
+    "ordonner toute mesure utile.",
+    "Le manquement à cette obligation est puni d'une amende de 15 000 euros.",
+    "Les parties peuvent convenir d'un délai plus long, dans la limite de dix ans.",
+    "L'action est ouverte à toute personne justifiant d'un intérêt légitime.",
+    "Ces dispositions ne sont pas applicables aux contrats conclus avant "
+    "l'entrée en vigueur de la présente loi.",
+    "Le montant de l'imposition est déterminé selon le barème fixé au I.",
+    "La décision est notifiée à l'intéressé par lettre recommandée avec "
+    "demande d'avis de réception.",
+    "Le bénéfice de ces dispositions est subordonné au respect des conditions "
+    "prévues au deuxième alinéa.",
+]
+
+# Article states and their share of the articles that are not in force
+INACTIVE_STATES = ["ABROGE", "MODIFIE", "VIGUEUR_DIFF"]
+
+
+class SyntheticCodeGenerator:
+    """Generator of a synthetic law code with a configurable shape."""
+
+    def __init__(
+        self,
+        articles: int = 10000,
+        depth: int = 4,
+        fanout: int = 6,
+        mean_words: int = 120,
+        length_sigma: float = 0.8,
+        max_words: int = 5000,
+        inactive_ratio: float = 0.1,
+        seed: int = 0,
+    ):
+        """
+        Initialize the generator.
+
+        Args:
+            articles: Number of articles
+            depth: Number of section levels
+            fanout: Maximum number of subsections per section
+            mean_words: Mean number of words of an article
+            length_sigma: Spread of the log-normal article length distribution
+                (0 for articles of exactly mean_words words)
+            max_words: Maximum number of words of an article
+            inactive_ratio: Share of articles that are not in force
+            seed: Random seed
+        """
+        if articles < 0 or depth < 1 or fanout < 1:
+            raise ValueError("articles must be >= 0, depth and fanout >= 1")
+
+        self.articles = articles
+        self.depth = depth
+        self.fanout = fanout
+        self.mean_words = mean_words
+        self.length_sigma = length_sigma
+        self.max_words = max_words
+        self.inactive_ratio = inactive_ratio
+        self.rng = random.Random(seed)
+
+        # Log-normal location giving the requested mean
+        self._mu = math.log(max(1, mean_words)) - length_sigma**2 / 2
+        self._words = [sentence.split() for sentence in SENTENCES]
+        self._article_count = 0
+
+    def article_length(self) -> int:
+        """Draw the number of words of an article."""
+        words = round(self.rng.lognormvariate(self._mu, self.length_sigma))
+        return max(1, min(self.max_words, words))
+
+    def article_content(self, words: int) -> str:
+        """Build an article text of about the given number of words."""
+        content: List[str] = []
+        while len(content) < words:
+            content.extend(self.rng.choice(self._words))
+        return " ".join(content[:words])
+
+    def article(self, section_num: str) -> Dict[str, Any]:
+        """Build the next article of a section."""
+        self._article_count += 1
+        etat = "VIGUEUR"
+        if self.rng.random() < self.inactive_ratio:
+            etat = self.rng.choice(INACTIVE_STATES)
+
+        return {
+            "num": f"L{section_num}-{self._article_count}",
+            "etat": etat,
+            "content": self.article_content(self.article_length()),
+        }
+
+    def section(self, level: int, number: str, articles: int) -> Dict[str, Any]:
+        """
+        Build a section and its subsections, holding the given number of articles.
+
+        Articles are placed in the deepest sections and spread unevenly
+        between siblings, as in real codes.
+        """
+        title = LEVEL_TITLES[min(level, len(LEVEL_TITLES) - 1)]
+        node = {
+            "section_data": {
+                "title": f"{title} {number} : {self.rng.choice(SUBJECTS)}"
+            },
+            "articles": [],
+            "subsections": [],
+        }
+
+        if level == self.depth - 1:
+            node["articles"] = [self.article(number) for _ in range(articles)]
+            return node
+
+        children = self.rng.randint(max(1, self.fanout // 2), self.fanout)
+        for i, share in enumerate(self.split(articles, children)):
+            node["subsections"].append(
+                self.section(level + 1, f"{number}{i + 1}", share)
+            )
+
+        return node
+
+    def split(self, total: int, parts: int) -> List[int]:
+        """Split a number of articles into uneven shares."""
+        weights = [self.rng.random() + 0.2 for _ in range(parts)]
+        scale = total / sum(weights)
+        shares = [int(weight * scale) for weight in weights]
+        for i in range(total - sum(shares)):
+            shares[i % parts] += 1
+        return shares
+
+    def generate(self) -> Dict[str, Any]:
+        """
+        Generate the law code.
+
+        Returns:
+            Law code data with the content read by LegalDataLoader
+        """
+        self._article_count = 0
+        top_sections = self.rng.randint(max(1, self.fanout // 2), self.fanout)
+        return {
+            "content": [
+                self.section(0, str(i + 1), share)
+                for i, share in enumerate(self.split(self.articles, top_sections))
+            ]
+        }
+
+
+def generate_code(articles: int = 10000, **kwargs) -> Dict[str, Any]:
+    """
+    Generate a synthetic law code.
+
+    Args:
+        articles: Number of articles
+        **kwargs: Other options of SyntheticCodeGenerator
+
+    Returns:
+        Law code data with the content read by LegalDataLoader
+    """
+    return SyntheticCodeGenerator(articles, **kwargs).generate()
+
+
+def write_code(data: Dict[str, Any], path: str):
+    """
+    Write a law code as the extractor does.
+
+    Args:
+        data: Law code data
+        path: Destination JSON file
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    """
+    Generate a synthetic law code file.
+    """
+    parser = argparse.ArgumentParser(description="Generate a synthetic law code")
+    parser.add_argument(
+        "--name", default="code_synthetique", help="Law code name (file name)"
+    )
+    parser.add_argument("--articles", type=int, default=10000, help="Articles")
+    parser.add_argument("--depth", type=int, default=4, help="Section levels")
+    parser.add_argument("--fanout", type=int, default=6, help="Max subsections")
+    parser.add_argument(
+        "--mean-words", type=int, default=120, help="Mean words per article"
+    )
+    parser.add_argument(
+        "--length-sigma",
+        type=float,
+        default=0.8,
+        help="Spread of the log-normal article length (0 for fixed lengths)",
+    )
+    parser.add_argument(
+        "--max-words", type=int, default=5000, help="Max words per article"
+    )
+    parser.add_argument(
+        "--inactive-ratio", type=float, default=0.1, help="Share of inactive articles"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument(
+        "--output-dir",
+        default=os.path.join(os.path.dirname(__file__), FOLDER_NAME),
+        help="Directory receiving the file (the loader's directory by default)",
+    )
+
+    args = parser.parse_args()
+
+    data = generate_code(
+        args.articles,
+        depth=args.depth,
+        fanout=args.fanout,
+        mean_words=args.mean_words,
+        length_sigma=args.length_sigma,
+        max_words=args.max_words,
+        inactive_ratio=args.inactive_ratio,
+        seed=args.seed,
+    )
+    path = os.path.join(args.output_dir, f"{args.name}.json")
+    write_code(data, path)
+    print(f"Wrote {args.articles} articles to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# loadtest/driver.py
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional
+import httpx
+from loadtest.questions import QuestionMix
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Return a percentile using the nearest-rank method.
+
+    Args:
+        values: Observed values
+        pct: Percentile between 0 and 100
+
+    Returns:
+        The percentile, or 0.0 without values
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(results: List[Dict[str, Any]], duration: float) -> Dict[str, Any]:
+    """
+    Summarize the results of a load test.
+
+    Args:
+        results: Result of each request (status, latency, cached, degraded)
+        duration: Wall clock duration of the test in seconds
+
+    Returns:
+        Throughput, latency percentiles, error rate and cache hit rate
+    """
+    successes = [r for r in results if r["status"] == 200]
+    latencies = [r["latency"] for r in successes]
+    statuses: Dict[str, int] = {}
+    for result in results:
+        statuses[str(result["status"])] = statuses.get(str(result["status"]), 0) + 1
+
+    return {
+        "requests": len(results),
+        "duration_seconds": round(duration, 3),
+        "throughput_rps": round(len(successes) / duration, 3) if duration else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p95": round(percentile(latencies, 95) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1),
+            "max": round(max(latencies, default=0.0) * 1000, 1),
+        },
+        "error_rate": (round(1 - len(successes) / len(results), 4) if results else 0.0),
+        "cache_hit_rate": (
+            round(sum(r["cached"] for r in successes) / len(successes), 4)
+            if successes
+            else 0.0
+        ),
+        "degraded_rate": (
+            round(sum(r["degraded"] for r in successes) / len(successes), 4)
+            if successes
+            else 0.0
+        ),
+        "status_codes": statuses,
+    }
+
+
+async def send_query(client: httpx.AsyncClient, payload: Dict) -> Dict[str, Any]:
+    """
+    Send a query and measure its latency.
+
+    Args:
+        client: HTTP client of the API under test
+        payload: Query request body
+
+    Returns:
+        Status code, latency in seconds, and cache and degradation flags
+    """
+    start_time = time.perf_counter()
+    try:
+        response = await client.post("/api/query", json=payload)
+        status = response.status_code
+        data = response.json() if status == 200 else {}
+    except httpx.HTTPError as e:
+        status, data = type(e).__name__, {}
+
+    return {
+        "status": status,
+        "latency": time.perf_counter() - start_time,
+        "cached": bool(data.get("cached")),
+        "degraded": bool(data.get("degraded")),
+    }
+
+
+async def run_load(
+    base_url: str,
+    qps: float,
+    duration: float,
+    questions: QuestionMix,
+    law_codes: Optional[List[str]] = None,
+    use_search: bool = True,
+    poisson: bool = False,
+    timeout: float = 120.0,
+    seed: Optional[int] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> Dict[str, Any]:
+    """
+    Send queries at a target rate and summarize the results.
+
+    Requests are sent on schedule whether or not earlier ones completed
+    (open loop), so a slow server builds up a backlog as real traffic would.
+
+    Args:
+        base_url: URL of the API under test
+        qps: Target queries per second
+        duration: Duration of the test in seconds
+        questions: Generator of the queries
+        law_codes: Law codes searched with RAG (None or empty disables RAG)
+        use_search: Whether queries use the Google search tool
+        poisson: Whether arrivals follow a Poisson process instead of a fixed rate
+        timeout: Client timeout of each request in seconds
+        seed: Seed of the Poisson arrivals
+        transport: Optional transport, e.g. to call an ASGI app in-process
+
+    Returns:
+        Summary of the load test
+    """
+    rng = random.Random(seed)
+    loop = asyncio.get_running_loop()
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=timeout, limits=limits, transport=transport
+    ) as client:
+        tasks = []
+        start_time = loop.time()
+        next_send = start_time
+        while next_send < start_time + duration:
+            delay = next_send - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            payload = {
+                "query": questions.next(),
+                "law_codes": law_codes or [],
+                "use_search": use_search,
+                "use_rag": bool(law_codes),
+            }
+            tasks.append(asyncio.ensure_future(send_query(client, payload)))
+            next_send += rng.expovariate(qps) if poisson else 1 / qps
+
+        results = await asyncio.gather(*tasks)
+        elapsed = loop.time() - start_time
+
+    return summarize(results, elapsed)
@@ -0,0 +1,158 @@
+# loadtest/fake_groq.py
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from collections import deque
+from typing import Deque
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Canned answer repeated to reach the requested completion length
+ANSWER_WORDS = (
+    "Selon les dispositions applicables du code, la réponse dépend des "
+    "circonstances de l'espèce et de la jurisprudence constante de la Cour "
+    "de cassation, qui rappelle que les conditions légales doivent être réunies."
+).split()
+
+
+def estimate_prompt_tokens(messages) -> int:
+    """Estimate the prompt tokens of chat messages (about 4 characters per token)."""
+    return max(1, sum(len(str(m.get("content") or "")) for m in messages) // 4)
+
+
+def create_fake_groq_app(
+    latency: float = 0.2,
+    tokens_per_second: float = 500.0,
+    completion_tokens: int = 120,
+    requests_per_minute: int = 0,
+    error_rate: float = 0.0,
+    seed: int = 0,
+) -> FastAPI:
+    """
+    Create a stand-in for the Groq chat completions API.
+
+    Args:
+        latency: Time to first token in seconds
+        tokens_per_second: Generation speed of the completion tokens
+        completion_tokens: Number of tokens of every completion
+        requests_per_minute: Requests allowed per minute before answering 429
+            (0 for no limit)
+        error_rate: Probability of answering 429 regardless of the limit
+        seed: Seed of the random 429 answers
+
+    Returns:
+        FastAPI application serving /openai/v1/chat/completions
+    """
+    app = FastAPI(title="Fake Groq API")
+    rng = random.Random(seed)
+    recent: Deque[float] = deque()
+    stats = {"requests": 0, "completed": 0, "rate_limited": 0, "tokens": 0}
+
+    words = [ANSWER_WORDS[i % len(ANSWER_WORDS)] for i in range(completion_tokens)]
+
+    def rate_limited(retry_after: float) -> JSONResponse:
+        stats["rate_limited"] += 1
+        return JSONResponse(
+            status_code=429,
+            content={
+                "error": {
+                    "message": "Rate limit reached, please try again later.",
+                    "type": "requests",
+                    "code": "rate_limit_exceeded",
+                }
+            },
+            headers={
+                "retry-after": str(math.ceil(retry_after)),
+                "x-ratelimit-limit-requests": str(requests_per_minute),
+                "x-ratelimit-remaining-requests": "0",
+            },
+        )
+
+    def check_rate_limit():
+        """Return a 429 response if the request is over the limit, else None."""
+        now = time.monotonic()
+        while recent and recent[0] <= now - 60:
+            recent.popleft()
+
+        if requests_per_minute and len(recent) >= requests_per_minute:
+            return rate_limited(recent[0] + 60 - now)
+        if error_rate and rng.random() < error_rate:
+            return rate_limited(1)
+
+        recent.append(now)
+        return None
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+
+        limited = check_rate_limit()
+        if limited is not None:
+            return limited
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = body.get("model", "fake-model")
+        usage = {
+            "prompt_tokens": estimate_prompt_tokens(body.get("messages", [])),
+            "completion_tokens": completion_tokens,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + completion_tokens
+
+        await asyncio.sleep(latency)
+
+        if body.get("stream"):
+
+            async def chunks():
+                for i, word in enumerate(words):
+                    await asyncio.sleep(1 / tokens_per_second)
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [
+                            {
+                                "index": 0,
+                                "delta": {"content": word if i == 0 else f" {word}"},
+                                "finish_reason": None,
+                            }
+                        ],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+
+                stats["completed"] += 1
+                stats["tokens"] += usage["total_tokens"]
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(chunks(), media_type="text/event-stream")
+
+        await asyncio.sleep(completion_tokens / tokens_per_second)
+        stats["completed"] += 1
+        stats["tokens"] += usage["total_tokens"]
+
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": " ".join(words)},
+                    "finish_reason": "stop",
+                    "logprobs": None,
+                }
+            ],
+            "usage": usage,
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
@@ -0,0 +1,48 @@
+# loadtest/fake_serpapi.py
+import asyncio
+from fastapi import FastAPI, Request
+
+
+def create_fake_serpapi_app(latency: float = 0.5, results: int = 5) -> FastAPI:
+    """
+    Create a stand-in for the SerpAPI Google search endpoint.
+
+    Args:
+        latency: Response time in seconds
+        results: Number of organic results per search
+
+    Returns:
+        FastAPI application serving /search
+    """
+    app = FastAPI(title="Fake SerpAPI")
+    stats = {"searches": 0}
+
+    @app.get("/search")
+    @app.get("/search.json")
+    async def search(request: Request):
+        query = request.query_params.get("q", "")
+        stats["searches"] += 1
+        await asyncio.sleep(latency)
+
+        return {
+            "search_metadata": {"status": "Success"},
+            "search_parameters": {"q": query, "engine": "google"},
+            "organic_results": [
+                {
+                    "position": i + 1,
+                    "title": f"{query} - Résultat {i + 1}",
+                    "link": f"https://www.legifrance.gouv.fr/resultat/{i + 1}",
+                    "snippet": (
+                        f"Article de référence concernant « {query} » : "
+                        "conditions, effets et jurisprudence récente."
+                    ),
+                }
+                for i in range(results)
+            ],
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
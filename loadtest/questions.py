@@ -0,0 +1,83 @@
+# loadtest/questions.py
+import random
+from typing import Optional
+
+# Frequently asked questions, repeated across users
+POPULAR_QUESTIONS = [
+    "Quelles sont les conditions de validité d'un contrat ?",
+    "Quel est le délai de prescription de droit commun en matière civile ?",
+    "Comment se déroule une procédure de divorce par consentement mutuel ?",
+    "Quelles sont les obligations du bailleur envers son locataire ?",
+    "Quelle est la peine encourue pour un vol simple ?",
+    "Qu'est-ce que la légitime défense en droit pénal ?",
+    "Combien de temps dure la période d'essai d'un CDI ?",
+    "Quelles sont les règles du licenciement pour motif économique ?",
+    "Comment fonctionne la succession en l'absence de testament ?",
+    "Quels sont les droits du salarié en cas d'accident du travail ?",
+    "Quelle est la différence entre un délit et un crime ?",
+    "Comment contester une amende pour excès de vitesse ?",
+    "Quelles sont les conditions de la responsabilité du fait des choses ?",
+    "Un mineur peut-il conclure un contrat de vente ?",
+    "Quelles sont les règles de la garde alternée des enfants ?",
+    "Quel est le régime matrimonial par défaut en France ?",
+    "Comment rompre un contrat de travail d'un commun accord ?",
+    "Quelles sont les sanctions de l'abus de biens sociaux ?",
+    "Quel est le préavis de départ d'un locataire en zone tendue ?",
+    "Qu'est-ce qu'un vice caché et comment agir ?",
+]
+
+SUBJECTS = [
+    "un contrat de bail",
+    "une vente immobilière",
+    "un contrat de travail à durée déterminée",
+    "une donation entre époux",
+    "une clause de non-concurrence",
+    "un prêt entre particuliers",
+    "une garde à vue",
+    "un permis de construire",
+    "une servitude de passage",
+    "une rupture conventionnelle",
+]
+
+TEMPLATES = [
+    "Que prévoit l'article {article} du code civil pour {subject} ?",
+    "Quels recours existent contre {subject} conclu(e) en {year} ?",
+    "Quelle jurisprudence s'applique à {subject} depuis {year} ?",
+    "Comment l'article L{article} du code du travail s'applique-t-il à {subject} ?",
+    "Quelles sont les conséquences pénales d'une fraude liée à {subject} en {year} ?",
+]
+
+
+class QuestionMix:
+    """Generator of French legal questions mixing repeated and unique ones."""
+
+    def __init__(self, repeat_ratio: float = 0.6, seed: Optional[int] = None):
+        """
+        Initialize the question generator.
+
+        Args:
+            repeat_ratio: Probability of asking one of the popular questions
+            seed: Seed making the sequence of questions reproducible
+        """
+        self.repeat_ratio = repeat_ratio
+        self.rng = random.Random(seed)
+        self._count = 0
+
+    def next(self) -> str:
+        """
+        Return the next question.
+
+        Returns:
+            A popular question or a question not asked before
+        """
+        self._count += 1
+        if self.rng.random() < self.repeat_ratio:
+            return self.rng.choice(POPULAR_QUESTIONS)
+
+        question = self.rng.choice(TEMPLATES).format(
+            article=self.rng.randint(1, 2500),
+            subject=self.rng.choice(SUBJECTS),
+            year=self.rng.randint(1990, 2025),
+        )
+        # The request number keeps unique questions unique
+        return f"{question} (dossier {self._count})"
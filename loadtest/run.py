@@ -0,0 +1,244 @@
+# loadtest/run.py
+"""
+Load test the API against local stand-ins of Groq, SerpAPI and Redis.
+
+Example:
+    python -m loadtest.run --qps 20 --duration 60 --redis memory
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional
+import httpx
+import uvicorn
+from loadtest.driver import run_load
+from loadtest.fake_groq import create_fake_groq_app
+from loadtest.fake_serpapi import create_fake_serpapi_app
+from loadtest.questions import QuestionMix
+
+
+def start_server(
+    app,
+    host: str,
+    port: int,
+    setup: Optional[Callable[[], Awaitable[None]]] = None,
+    timeout: float = 30.0,
+) -> uvicorn.Server:
+    """
+    Serve an ASGI application on a background thread with its own event loop.
+
+    Args:
+        app: ASGI application
+        host: Host to bind to
+        port: Port to bind to
+        setup: Optional coroutine function run on the server loop before serving
+        timeout: Maximum time in seconds to wait for the server to start
+
+    Returns:
+        The running server (set should_exit to stop it)
+    """
+    server = uvicorn.Server(
+        uvicorn.Config(app, host=host, port=port, log_level="warning")
+    )
+
+    async def serve():
+        if setup is not None:
+            await setup()
+        await server.serve()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+
+    deadline = time.monotonic() + timeout
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"Server on port {port} did not start")
+        time.sleep(0.05)
+
+    return server
+
+
+def redirect_serpapi(url: str):
+    """
+    Send the SerpAPI client requests to another backend.
+
+    Args:
+        url: Base URL of the backend (e.g. the fake SerpAPI server)
+    """
+    import serpapi
+
+    serpapi.SerpApiClient.BACKEND = url
+
+
+def use_memory_redis(cache):
+    """
+    Replace the Redis connection of a cache with an in-memory substitute.
+
+    Must be called on the event loop that will use the cache.
+
+    Args:
+        cache: AsyncRedisCache to redirect
+    """
+    # Only needed for load tests without a local Redis
+    from fakeredis import aioredis as fake_aioredis
+
+    cache.redis = fake_aioredis.FakeRedis(decode_responses=True)
+
+
+def fetch_json(url: str) -> Dict:
+    """Fetch a JSON document, returning the error instead on failure."""
+    try:
+        return httpx.get(url, timeout=10).json()
+    except httpx.HTTPError as e:
+        return {"error": str(e)}
+
+
+def main():
+    """
+    Run a load test and print its report.
+    """
+    parser = argparse.ArgumentParser(description="Load test the legal assistant API")
+    parser.add_argument("--qps", type=float, default=10.0, help="Target queries/s")
+    parser.add_argument(
+        "--duration", type=float, default=30.0, help="Test duration in seconds"
+    )
+    parser.add_argument(
+        "--repeat-ratio",
+        type=float,
+        default=0.6,
+        help="Fraction of queries repeating a popular question",
+    )
+    parser.add_argument(
+        "--law-codes",
+        nargs="*",
+        default=[],
+        help="Law codes searched with RAG (indices must be built; none disables RAG)",
+    )
+    parser.add_argument(
+        "--no-search", action="store_true", help="Disable the Google search tool"
+    )
+    parser.add_argument(
+        "--poisson",
+        action="store_true",
+        help="Poisson arrivals instead of a fixed rate",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument(
+        "--app-url",
+        default=None,
+        help="URL of an already running API (configured to use the stand-ins) "
+        "instead of serving it in-process",
+    )
+    parser.add_argument(
+        "--redis",
+        choices=["local", "memory"],
+        default="local",
+        help="Use the configured Redis or an in-memory substitute (needs fakeredis)",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Host of the servers")
+    parser.add_argument("--app-port", type=int, default=8800)
+    parser.add_argument("--groq-port", type=int, default=8801)
+    parser.add_argument("--serpapi-port", type=int, default=8802)
+    parser.add_argument(
+        "--groq-latency", type=float, default=0.3, help="Groq time to first token"
+    )
+    parser.add_argument(
+        "--groq-tokens-per-second", type=float, default=500.0, help="Groq token rate"
+    )
+    parser.add_argument(
+        "--groq-completion-tokens", type=int, default=150, help="Tokens per answer"
+    )
+    parser.add_argument(
+        "--groq-rpm", type=int, default=0, help="Groq requests/minute before 429s"
+    )
+    parser.add_argument(
+        "--groq-error-rate", type=float, default=0.0, help="Random 429 probability"
+    )
+    parser.add_argument(
+        "--serpapi-latency", type=float, default=0.8, help="SerpAPI response time"
+    )
+    parser.add_argument("--output", default=None, help="Write the report to a file")
+
+    args = parser.parse_args()
+
+    groq_url = f"http://{args.host}:{args.groq_port}"
+    serpapi_url = f"http://{args.host}:{args.serpapi_port}"
+
+    stand_ins = [
+        start_server(
+            create_fake_groq_app(
+                latency=args.groq_latency,
+                tokens_per_second=args.groq_tokens_per_second,
+                completion_tokens=args.groq_completion_tokens,
+                requests_per_minute=args.groq_rpm,
+                error_rate=args.groq_error_rate,
+                seed=args.seed,
+            ),
+            args.host,
+            args.groq_port,
+        ),
+        start_server(
+            create_fake_serpapi_app(latency=args.serpapi_latency),
+            args.host,
+            args.serpapi_port,
+        ),
+    ]
+
+    app_url = args.app_url
+    if app_url is None:
+        # Configure the API before it is imported
+        os.environ["GROQ_BASE_URL"] = groq_url
+        os.environ.setdefault("GROQ_API_KEY", "loadtest")
+        os.environ.setdefault("SERPAPI_API_KEY", "loadtest")
+        os.environ.setdefault("PORT", str(args.app_port))
+
+        from api.server import app, cache
+
+        if not args.no_search:
+            redirect_serpapi(serpapi_url)
+
+        async def setup():
+            if args.redis == "memory":
+                use_memory_redis(cache)
+            else:
+                # Start from a cold cache
+                await cache.flush()
+
+        stand_ins.append(start_server(app, args.host, args.app_port, setup))
+        app_url = f"http://{args.host}:{args.app_port}"
+
+    print(
+        f"Sending {args.qps} queries/s for {args.duration}s to {app_url} "
+        f"(Groq stand-in {groq_url}, SerpAPI stand-in {serpapi_url})"
+    )
+    report = asyncio.run(
+        run_load(
+            app_url,
+            args.qps,
+            args.duration,
+            QuestionMix(args.repeat_ratio, seed=args.seed),
+            law_codes=args.law_codes,
+            use_search=not args.no_search,
+            poisson=args.poisson,
+            seed=args.seed,
+        )
+    )
+    report["cache"] = fetch_json(f"{app_url}/api/cache/stats")
+    report["groq"] = fetch_json(f"{groq_url}/stats")
+    report["serpapi"] = fetch_json(f"{serpapi_url}/stats")
+
+    for server in stand_ins:
+        server.should_exit = True
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,37 +2,80 @@
 import argparse
 import asyncio
 import uvicorn
+from prometheus_client import start_http_server
 from api.server import app
 from ui.app import launch_ui
 from data.loader import LegalDataLoader
+from models.index_builder import IndexBuilder
 from models.vectorstore import VectorstoreManager
+from config import ENABLE_METRICS, METRICS_PORT
 
 
-async def build_indices(law_codes=None):
+async def build_indices(law_codes=None, workers=None):
     """
     Build indices for the specified law codes or all available ones.
 
     Args:
         law_codes: Optional list of law code names
+        workers: Processes loading and splitting law codes (None for
+            INDEX_BUILD_WORKERS)
     """
     # If no law codes specified, get all available ones
     if law_codes is None or len(law_codes) == 0:
         law_codes = LegalDataLoader.list_available_law_codes()
         print(f"Building indices for all available law codes: {law_codes}")
 
+    # Interrupted builds resume from their checkpoints
+    builder = IndexBuilder(workers=workers)
+    results = await asyncio.to_thread(builder.build, law_codes)
+
     for law_code in law_codes:
-        print(f"Building index for {law_code}...")
+        if law_code not in results:
+            print(f"Error: no index built for {law_code}")
+            continue
+        stats = results[law_code]
+        print(
+            f"Index built for {law_code} with {stats['chunks']} chunks "
+            f"in {stats['seconds']}s ({stats['chunks_per_second']} chunks/s)."
+        )
 
+
+def update_indices(law_codes=None):
+    """
+    Update the indices of the specified law codes or all available ones,
+    embedding only the articles that changed since the last build or update.
+
+    Args:
+        law_codes: Optional list of law code names
+    """
+    if law_codes is None or len(law_codes) == 0:
+        law_codes = LegalDataLoader.list_available_law_codes()
+
+    for law_code in law_codes:
         try:
-            # Load documents
             loader = LegalDataLoader(law_code)
-            documents = await loader.load()
+            stats = VectorstoreManager(law_code).update_vectorstore(loader.stream())
+            print(f"Index updated for {law_code}: {stats}")
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Error: {str(e)}")
+            continue
+
 
-            # Create vectorstore
-            vectorstore_manager = VectorstoreManager(law_code)
-            vectorstore = vectorstore_manager.create_vectorstore(documents)
+def build_stores(law_codes=None):
+    """
+    Convert the JSON files of the specified law codes or all available ones
+    into article stores.
 
-            print(f"Index built for {law_code} with {len(documents)} documents.")
+    Args:
+        law_codes: Optional list of law code names
+    """
+    if law_codes is None or len(law_codes) == 0:
+        law_codes = LegalDataLoader.list_available_law_codes()
+
+    for law_code in law_codes:
+        try:
+            with LegalDataLoader(law_code).build_store() as store:
+                print(f"Article store built for {law_code} with {len(store)} articles.")
         except FileNotFoundError as e:
             print(f"Error: {str(e)}")
             continue
@@ -45,15 +88,28 @@ def main():
     parser = argparse.ArgumentParser(description="French Legal Assistant")
     parser.add_argument(
         "--mode",
-        choices=["api", "ui", "build-indices", "list-codes"],
+        choices=[
+            "api",
+            "ui",
+            "build-indices",
+            "update-indices",
+            "build-stores",
+            "list-codes",
+        ],
         default="ui",
-        help="Run mode (api, ui, build-indices, or list-codes)",
+        help="Run mode (api, ui, build-indices, update-indices, build-stores, or list-codes)",
     )
     parser.add_argument(
         "--law-codes",
         nargs="+",
         default=[],
-        help="Law codes to build indices for (if empty, all available codes will be used)",
+        help="Law codes to build indices or stores for (if empty, all available codes will be used)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes loading law codes when building indices (0 for one per CPU)",
     )
     parser.add_argument(
         "--host", default="0.0.0.0", help="Host to bind the API server to"
@@ -70,8 +126,15 @@ def main():
         for code in codes:
             print(f"- {code}")
     elif args.mode == "build-indices":
-        asyncio.run(build_indices(args.law_codes))
+        asyncio.run(build_indices(args.law_codes, args.workers))
+    elif args.mode == "update-indices":
+        update_indices(args.law_codes)
+    elif args.mode == "build-stores":
+        build_stores(args.law_codes)
     elif args.mode == "api":
+        # Metrics are also served at /metrics on the API port
+        if ENABLE_METRICS and METRICS_PORT:
+            start_http_server(METRICS_PORT)
         uvicorn.run(app, host=args.host, port=args.port)
     elif args.mode == "ui":
         launch_ui()
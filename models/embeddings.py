@@ -1,12 +1,64 @@
 # models/embeddings.py
+import threading
+from typing import List
 import torch
+from langchain.embeddings.base import Embeddings
 from langchain_huggingface import HuggingFaceEmbeddings
-from config import EMBEDDING_MODEL
+from config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_NORMALIZE,
+    EMBEDDING_NUM_THREADS,
+)
 
 
-def get_embedding_model():
+class EmbeddingEngine(Embeddings):
+    """Thread-safe wrapper sharing one embedding model between callers."""
+
+    def __init__(self, model: Embeddings):
+        """
+        Initialize with the underlying embedding model.
+
+        Args:
+            model: Embedding model to share
+        """
+        self.model = model
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a list of documents.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List of embeddings
+        """
+        with self._lock:
+            return self.model.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a single query.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding
+        """
+        with self._lock:
+            return self.model.embed_query(text)
+
+
+_embedding_engine = None
+_embedding_engine_lock = threading.Lock()
+
+
+def create_embedding_model():
     """
-    Create and return the embedding model.
+    Create a new embedding model.
 
     Returns:
         HuggingFaceEmbeddings model
@@ -14,10 +66,35 @@ def get_embedding_model():
     # Determine the device (GPU if available, otherwise CPU)
     device = "cuda" if torch.cuda.is_available() else "cpu"
 
+    # Limit the torch intra-op thread pool if requested
+    if EMBEDDING_NUM_THREADS > 0:
+        torch.set_num_threads(EMBEDDING_NUM_THREADS)
+
     # Initialize the embedding model
     embedding_model = HuggingFaceEmbeddings(
         model_name=EMBEDDING_MODEL,
         model_kwargs={"device": device},
+        encode_kwargs={
+            "batch_size": EMBEDDING_BATCH_SIZE,
+            "normalize_embeddings": EMBEDDING_NORMALIZE,
+        },
     )
 
     return embedding_model
+
+
+def get_embedding_model() -> EmbeddingEngine:
+    """
+    Return the process-wide embedding model, creating it on first use.
+
+    Returns:
+        Shared EmbeddingEngine
+    """
+    global _embedding_engine
+
+    if _embedding_engine is None:
+        with _embedding_engine_lock:
+            if _embedding_engine is None:
+                _embedding_engine = EmbeddingEngine(create_embedding_model())
+
+    return _embedding_engine
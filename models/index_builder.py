@@ -0,0 +1,390 @@
+# models/index_builder.py
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import shutil
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from langchain.embeddings.base import Embeddings
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import FAISS
+from data.loader import LegalDataLoader
+from models.embeddings import get_embedding_model
+from models.vectorstore import (
+    VectorstoreManager,
+    count_chunks,
+    read_manifest,
+    split_with_ids,
+    write_manifest,
+)
+from utils.logging import app_logger
+from config import (
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    INDEX_BUILD_BATCH_SIZE,
+    INDEX_BUILD_WORKERS,
+)
+
+# Text, metadata and id of a chunk
+Chunk = Tuple[str, Dict[str, Any], str]
+
+
+def split_to_file(
+    law_code: str, file_path: str, chunks_path: str
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Stream and split a law code into a chunks file, in a worker process.
+
+    Articles are split while the JSON file is parsed and their chunks are
+    written as they come, so memory does not grow with the size of the code.
+
+    Args:
+        law_code: Name of the law code
+        file_path: JSON file of the law code
+        chunks_path: File the chunks are written to, one JSON array per line
+
+    Returns:
+        The law code name and the path, number and fingerprint of its chunks,
+        None if the file is missing
+    """
+    if not os.path.exists(file_path):
+        return law_code, None
+
+    loader = LegalDataLoader(law_code)
+    loader.file_path = file_path
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
+    )
+
+    digest = hashlib.sha256()
+    count = 0
+    os.makedirs(os.path.dirname(chunks_path), exist_ok=True)
+    with open(f"{chunks_path}.tmp", "wb") as f:
+        for chunk_id, chunk in split_with_ids(loader.stream(), splitter):
+            record = [chunk.page_content, chunk.metadata, chunk_id]
+            line = json.dumps(record, ensure_ascii=False, sort_keys=True)
+            line = line.encode("utf-8") + b"\n"
+            f.write(line)
+            # The chunks file identifies the chunks, ids and metadata included
+            digest.update(line)
+            count += 1
+    os.replace(f"{chunks_path}.tmp", chunks_path)
+
+    return law_code, {
+        "path": chunks_path,
+        "chunks": count,
+        "fingerprint": digest.hexdigest(),
+    }
+
+
+def read_chunks(chunks_path: str) -> Iterator[Chunk]:
+    """Iterate over the chunks of a chunks file written by split_to_file."""
+    with open(chunks_path, "r", encoding="utf-8") as f:
+        for line in f:
+            text, metadata, chunk_id = json.loads(line)
+            yield text, metadata, chunk_id
+
+
+def log_progress(law_code: str, done: int, total: int, seconds: float):
+    """Log the embedding progress of a law code."""
+    rate = done / seconds if seconds > 0 else 0.0
+    app_logger.info(
+        f"Index {law_code}: {done}/{total} chunks embedded ({rate:.1f} chunks/s)"
+    )
+
+
+class IndexCheckpoint:
+    """Embedded batches of a law code saved while its index is built."""
+
+    def __init__(self, directory: str, fingerprint: str, chunks: int, batch_size: int):
+        """
+        Open the checkpoint of a law code, discarding it if it was made for
+        other chunks or another batch size.
+
+        Args:
+            directory: Folder of the checkpoint
+            fingerprint: Hash of the chunks being embedded
+            chunks: Number of chunks being embedded
+            batch_size: Number of chunks per batch
+        """
+        self.directory = directory
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.meta = {
+            "fingerprint": fingerprint,
+            "chunks": chunks,
+            "batch_size": batch_size,
+        }
+
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                if json.load(f) != self.meta:
+                    self.clear()
+        except (OSError, ValueError):
+            self.clear()
+
+        os.makedirs(directory, exist_ok=True)
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+
+    def _batch_path(self, batch: int) -> str:
+        return os.path.join(self.directory, f"batch_{batch:06d}.npy")
+
+    def load(self, batch: int) -> Optional[np.ndarray]:
+        """Return the saved embeddings of a batch, or None."""
+        try:
+            return np.load(self._batch_path(batch))
+        except (OSError, ValueError):
+            return None
+
+    def save(self, batch: int, embeddings: np.ndarray):
+        """Save the embeddings of a batch."""
+        # np.save adds the .npy extension to names without it
+        tmp_path = self._batch_path(batch)[: -len(".npy")] + ".tmp.npy"
+        np.save(tmp_path, embeddings)
+        os.replace(tmp_path, self._batch_path(batch))
+
+    def clear(self):
+        """Delete the checkpoint."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class IndexBuilder:
+    """
+    Build the FAISS indices of several law codes.
+
+    Law codes are streamed and split in parallel worker processes into
+    chunks files, while the main process reads the chunks of each finished
+    law code back in batches and embeds them with a single shared embedding
+    model. Neither side holds a whole law code in memory, besides the index
+    being built. Embedded batches are checkpointed, so an interrupted build
+    resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        batch_size: int = INDEX_BUILD_BATCH_SIZE,
+        embedding_model: Optional[Embeddings] = None,
+        checkpoint_dir: Optional[str] = None,
+        progress: Callable[[str, int, int, float], None] = log_progress,
+    ):
+        """
+        Initialize the builder.
+
+        Args:
+            workers: Processes streaming and splitting law codes (None for
+                INDEX_BUILD_WORKERS, 0 for one per CPU, 1 for this process)
+            batch_size: Number of chunks embedded together
+            embedding_model: Embedding model (None for the shared model)
+            checkpoint_dir: Folder of the checkpoints (None for a folder next
+                to the indices)
+            progress: Called with the law code, embedded and total chunks and
+                elapsed seconds after each batch
+        """
+        self.workers = INDEX_BUILD_WORKERS if workers is None else workers
+        self.batch_size = batch_size
+        self.embedding_model = embedding_model or get_embedding_model()
+        self.checkpoint_dir = checkpoint_dir
+        self.progress = progress
+
+    def index_path(self, law_code: str) -> str:
+        """Return the path where the index of a law code is saved."""
+        return VectorstoreManager(law_code, self.embedding_model).index_path
+
+    def _checkpoint_path(self, law_code: str) -> str:
+        checkpoint_dir = self.checkpoint_dir or os.path.join(
+            os.path.dirname(self.index_path(law_code)), ".checkpoints"
+        )
+        return os.path.join(checkpoint_dir, law_code)
+
+    def is_built(self, law_code: str, fingerprint: str) -> bool:
+        """
+        Check whether the saved index of a law code was built from the same chunks.
+
+        Args:
+            law_code: Name of the law code
+            fingerprint: Hash of the chunks of the law code
+
+        Returns:
+            True if the index exists and its manifest has the same fingerprint
+        """
+        index_path = self.index_path(law_code)
+        manifest = read_manifest(index_path)
+        return (
+            manifest is not None
+            and manifest.get("fingerprint") == fingerprint
+            and os.path.exists(os.path.join(index_path, "index.faiss"))
+        )
+
+    def _chunks_path(self, law_code: str) -> str:
+        return f"{self._checkpoint_path(law_code)}.chunks.jsonl"
+
+    def split_all(self, law_codes: List[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Stream and split law codes to chunks files, yielding each law code as
+        soon as it is split.
+
+        At most one split law code per worker waits to be embedded, so the
+        workers never run far ahead of the embedding.
+
+        Args:
+            law_codes: Names of the law codes
+
+        Returns:
+            Iterator over (law code name, split_to_file result) pairs, in
+            completion order
+        """
+        workers = min(self.workers or os.cpu_count() or 1, len(law_codes))
+        tasks = iter(
+            [
+                (code, LegalDataLoader(code).file_path, self._chunks_path(code))
+                for code in law_codes
+            ]
+        )
+
+        if workers <= 1:
+            for task in tasks:
+                law_code, split = split_to_file(*task)
+                if split is None:
+                    app_logger.warning(f"Law code file not found for {law_code}")
+                    continue
+                yield law_code, split
+            return
+
+        # Spawned workers do not inherit the threads and locks of this process
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            pending = set()
+            while True:
+                for task in islice(tasks, workers - len(pending)):
+                    pending.add(executor.submit(split_to_file, *task))
+                if not pending:
+                    return
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    law_code, split = future.result()
+                    if split is None:
+                        app_logger.warning(f"Law code file not found for {law_code}")
+                        continue
+                    yield law_code, split
+
+    def embed(self, law_code: str, split: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Embed the chunks of a law code batch by batch and save its index.
+
+        Args:
+            law_code: Name of the law code
+            split: Chunks file of the law code, as returned by split_to_file
+
+        Returns:
+            Number of chunks, resumed chunks, duration and throughput
+        """
+        try:
+            return self._embed(law_code, split)
+        finally:
+            os.remove(split["path"])
+
+    def _embed(self, law_code: str, split: Dict[str, Any]) -> Dict[str, Any]:
+        total = split["chunks"]
+        if not total:
+            raise ValueError(f"No documents to index for {law_code}")
+
+        start_time = time.perf_counter()
+        checkpoint = IndexCheckpoint(
+            self._checkpoint_path(law_code),
+            split["fingerprint"],
+            total,
+            self.batch_size,
+        )
+
+        chunks = read_chunks(split["path"])
+        vectorstore = None
+        articles: Counter = Counter()
+        done = resumed = 0
+        for batch in range(math.ceil(total / self.batch_size)):
+            texts, metadatas, ids = zip(*islice(chunks, self.batch_size))
+
+            vectors = checkpoint.load(batch)
+            if vectors is None:
+                vectors = np.asarray(
+                    self.embedding_model.embed_documents(list(texts)),
+                    dtype=np.float32,
+                )
+                checkpoint.save(batch, vectors)
+            else:
+                resumed += len(vectors)
+
+            text_embeddings = zip(texts, vectors.tolist())
+            if vectorstore is None:
+                vectorstore = FAISS.from_embeddings(
+                    text_embeddings,
+                    self.embedding_model,
+                    metadatas=list(metadatas),
+                    ids=list(ids),
+                )
+            else:
+                vectorstore.add_embeddings(
+                    text_embeddings, metadatas=list(metadatas), ids=list(ids)
+                )
+            articles.update(count_chunks(ids))
+
+            done += len(texts)
+            self.progress(law_code, done, total, time.perf_counter() - start_time)
+
+        index_path = self.index_path(law_code)
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        vectorstore.save_local(index_path)
+        # Later updates only embed the articles that changed, and later builds
+        # skip the index as long as the chunks are the same
+        write_manifest(index_path, dict(articles), split["fingerprint"])
+        checkpoint.clear()
+
+        seconds = time.perf_counter() - start_time
+        embedded = total - resumed
+        return {
+            "chunks": total,
+            "resumed_chunks": resumed,
+            "seconds": round(seconds, 3),
+            "chunks_per_second": round(embedded / seconds, 1) if seconds > 0 else 0,
+        }
+
+    def build(self, law_codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Build the indices of law codes.
+
+        Args:
+            law_codes: Names of the law codes
+
+        Returns:
+            Build statistics of each indexed law code
+        """
+        results = {}
+        for law_code, split in self.split_all(law_codes):
+            # Indices finished before an interruption are not embedded again
+            if self.is_built(law_code, split["fingerprint"]):
+                os.remove(split["path"])
+                results[law_code] = {
+                    "chunks": split["chunks"],
+                    "resumed_chunks": split["chunks"],
+                    "seconds": 0.0,
+                    "chunks_per_second": 0,
+                }
+                app_logger.info(f"Index of {law_code} is up to date")
+                continue
+
+            try:
+                results[law_code] = self.embed(law_code, split)
+            except ValueError as e:
+                app_logger.warning(str(e))
+                continue
+
+            app_logger.info(f"Index built for {law_code}: {results[law_code]}")
+        return results
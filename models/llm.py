@@ -1,15 +1,118 @@
 # models/llm.py
+import asyncio
+import threading
+import weakref
 from langchain.llms.base import LLM
-from typing import Optional, List, Mapping, Any
-from groq import Groq
+from langchain.callbacks.manager import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain.schema.output import Generation, GenerationChunk, LLMResult
+from typing import Optional, List, Mapping, Any, Iterator, AsyncIterator, Dict
+import httpx
+from groq import Groq, AsyncGroq, DefaultHttpxClient, DefaultAsyncHttpxClient
 import os
 from config import (
     GROQ_API_KEY,
     DEFAULT_MODEL,
     DEFAULT_TEMPERATURE,
     DEFAULT_MAX_TOKENS,
+    GROQ_TIMEOUT,
+    GROQ_MAX_CONNECTIONS,
+    GROQ_MAX_KEEPALIVE_CONNECTIONS,
+    GROQ_KEEPALIVE_EXPIRY,
 )
 from pydantic import Field
+from models.scheduler import estimate_tokens, get_scheduler
+
+# Pooled Groq clients shared by every GroqLLM, keyed by API key
+_clients: Dict[Optional[str], Groq] = {}
+# Async clients of one event loop, keyed by API key
+LoopClients = Dict[Optional[str], AsyncGroq]
+# Async clients are bound to the event loop their connections were opened on
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LoopClients] = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+
+def _pool_limits() -> httpx.Limits:
+    """Return the connection pool limits of the Groq HTTP clients."""
+    return httpx.Limits(
+        max_connections=GROQ_MAX_CONNECTIONS,
+        max_keepalive_connections=GROQ_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=GROQ_KEEPALIVE_EXPIRY,
+    )
+
+
+def get_groq_client(api_key: Optional[str] = None) -> Groq:
+    """
+    Return the shared, pooled Groq client for an API key.
+
+    Args:
+        api_key: Groq API key (None for the configured key)
+
+    Returns:
+        Groq client reusing keep-alive connections
+    """
+    api_key = api_key or GROQ_API_KEY
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            # Retries are handled by the request scheduler
+            client = Groq(
+                api_key=api_key,
+                timeout=GROQ_TIMEOUT,
+                max_retries=0,
+                http_client=DefaultHttpxClient(
+                    limits=_pool_limits(), timeout=GROQ_TIMEOUT
+                ),
+            )
+            _clients[api_key] = client
+
+    return client
+
+
+def get_async_groq_client(api_key: Optional[str] = None) -> AsyncGroq:
+    """
+    Return the shared, pooled async Groq client of the running event loop.
+
+    Args:
+        api_key: Groq API key (None for the configured key)
+
+    Returns:
+        AsyncGroq client reusing keep-alive connections
+    """
+    api_key = api_key or GROQ_API_KEY
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        loop_clients = _async_clients.setdefault(loop, {})
+        client = loop_clients.get(api_key)
+        if client is None:
+            client = AsyncGroq(
+                api_key=api_key,
+                timeout=GROQ_TIMEOUT,
+                max_retries=0,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=_pool_limits(), timeout=GROQ_TIMEOUT
+                ),
+            )
+            loop_clients[api_key] = client
+
+    return client
+
+
+# Token counts reported by the Groq API for a completion
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "total_tokens")
+
+
+def _add_usage(token_usage: Dict[str, int], completion) -> None:
+    """Add the token usage of a completion to a running total."""
+    usage = getattr(completion, "usage", None)
+    for field in USAGE_FIELDS:
+        value = getattr(usage, field, None)
+        if isinstance(value, int):
+            token_usage[field] = token_usage.get(field, 0) + value
 
 
 class GroqLLM(LLM):
@@ -19,27 +122,234 @@ class GroqLLM(LLM):
     temperature: float = Field(default=DEFAULT_TEMPERATURE)
     max_tokens: int = Field(default=DEFAULT_MAX_TOKENS)
     api_key: Optional[str] = Field(default=None)
+    streaming: bool = Field(default=False)
+
+    @property
+    def client(self) -> Groq:
+        """Return the pooled Groq client."""
+        return get_groq_client(self.api_key)
 
-    def _call(self, prompt: str, stop: Optional[List[str]] = None, **kwargs) -> str:
+    @property
+    def async_client(self) -> AsyncGroq:
+        """Return the pooled async Groq client of the running event loop."""
+        return get_async_groq_client(self.api_key)
+
+    def _completion_params(self, prompt: str) -> Dict[str, Any]:
+        """Return the chat completion parameters for a prompt."""
+        return {
+            "messages": [{"role": "user", "content": prompt}],
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
+
+    def _create_completion(self, prompt: str, **kwargs):
+        """Create a chat completion through the rate limit aware scheduler."""
+        params = {**self._completion_params(prompt), **kwargs}
+        return get_scheduler().call(
+            lambda: self.client.chat.completions.create(**params),
+            estimate_tokens(prompt, self.max_tokens),
+            stream=params.get("stream", False),
+        )
+
+    async def _acreate_completion(self, prompt: str, **kwargs):
+        """Asynchronously create a chat completion through the scheduler."""
+        params = {**self._completion_params(prompt), **kwargs}
+        return await get_scheduler().acall(
+            lambda: self.async_client.chat.completions.create(**params),
+            estimate_tokens(prompt, self.max_tokens),
+            stream=params.get("stream", False),
+        )
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs,
+    ) -> str:
         """
         Call the Groq API with the given prompt.
 
         Args:
             prompt: The prompt to send to the API
             stop: Optional list of stop sequences
+            run_manager: Optional callback manager notified of streamed tokens
 
         Returns:
             The response from the API
         """
-        client = Groq(api_key=self.api_key or GROQ_API_KEY)
-        chat_completion = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
-            model=self.model,
-            temperature=self.temperature,
-            max_tokens=self.max_tokens,
-        )
+        # Stream the completion so that callbacks receive tokens as they arrive
+        if self.streaming:
+            chunks = self._stream(prompt, stop=stop, run_manager=run_manager, **kwargs)
+            return "".join(chunk.text for chunk in chunks)
+
+        chat_completion = self._create_completion(prompt)
+        return chat_completion.choices[0].message.content
+
+    async def _acall(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs,
+    ) -> str:
+        """
+        Asynchronously call the Groq API with the given prompt.
+
+        Args:
+            prompt: The prompt to send to the API
+            stop: Optional list of stop sequences
+            run_manager: Optional callback manager notified of streamed tokens
+
+        Returns:
+            The response from the API
+        """
+        if self.streaming:
+            chunks = []
+            async for chunk in self._astream(
+                prompt, stop=stop, run_manager=run_manager, **kwargs
+            ):
+                chunks.append(chunk.text)
+            return "".join(chunks)
+
+        chat_completion = await self._acreate_completion(prompt)
         return chat_completion.choices[0].message.content
 
+    def _llm_result(self, texts: List[str], token_usage: Dict[str, int]) -> LLMResult:
+        """Build the result of a generation, reporting its token usage."""
+        return LLMResult(
+            generations=[[Generation(text=text)] for text in texts],
+            llm_output={"token_usage": token_usage, "model_name": self.model},
+        )
+
+    def _generate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs,
+    ) -> LLMResult:
+        """
+        Generate completions, reporting the token usage to callbacks.
+
+        Args:
+            prompts: The prompts to send to the API
+            stop: Optional list of stop sequences
+            run_manager: Optional callback manager notified of streamed tokens
+
+        Returns:
+            The generations and their token usage
+        """
+        texts = []
+        token_usage: Dict[str, int] = {}
+        for prompt in prompts:
+            # Streamed completions do not report their usage
+            if self.streaming:
+                texts.append(
+                    self._call(prompt, stop=stop, run_manager=run_manager, **kwargs)
+                )
+                continue
+
+            chat_completion = self._create_completion(prompt)
+            _add_usage(token_usage, chat_completion)
+            texts.append(chat_completion.choices[0].message.content)
+
+        return self._llm_result(texts, token_usage)
+
+    async def _agenerate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs,
+    ) -> LLMResult:
+        """
+        Asynchronously generate completions, reporting the token usage to callbacks.
+
+        Args:
+            prompts: The prompts to send to the API
+            stop: Optional list of stop sequences
+            run_manager: Optional callback manager notified of streamed tokens
+
+        Returns:
+            The generations and their token usage
+        """
+        texts = []
+        token_usage: Dict[str, int] = {}
+        for prompt in prompts:
+            if self.streaming:
+                texts.append(
+                    await self._acall(
+                        prompt, stop=stop, run_manager=run_manager, **kwargs
+                    )
+                )
+                continue
+
+            chat_completion = await self._acreate_completion(prompt)
+            _add_usage(token_usage, chat_completion)
+            texts.append(chat_completion.choices[0].message.content)
+
+        return self._llm_result(texts, token_usage)
+
+    def _stream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs,
+    ) -> Iterator[GenerationChunk]:
+        """
+        Stream the Groq API completion for the given prompt.
+
+        Args:
+            prompt: The prompt to send to the API
+            stop: Optional list of stop sequences
+            run_manager: Optional callback manager notified of streamed tokens
+
+        Yields:
+            Generation chunks as they are received
+        """
+        stream = self._create_completion(prompt, stream=True)
+        for chunk in stream:
+            token = chunk.choices[0].delta.content if chunk.choices else None
+            if not token:
+                continue
+
+            generation_chunk = GenerationChunk(text=token)
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=generation_chunk)
+            yield generation_chunk
+
+    async def _astream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs,
+    ) -> AsyncIterator[GenerationChunk]:
+        """
+        Asynchronously stream the Groq API completion for the given prompt.
+
+        Args:
+            prompt: The prompt to send to the API
+            stop: Optional list of stop sequences
+            run_manager: Optional callback manager notified of streamed tokens
+
+        Yields:
+            Generation chunks as they are received
+        """
+        stream = await self._acreate_completion(prompt, stream=True)
+        async for chunk in stream:
+            token = chunk.choices[0].delta.content if chunk.choices else None
+            if not token:
+                continue
+
+            generation_chunk = GenerationChunk(text=token)
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=generation_chunk)
+            yield generation_chunk
+
     @property
     def _llm_type(self) -> str:
         """Return the type of LLM."""
@@ -0,0 +1,400 @@
+# models/scheduler.py
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from groq import APIConnectionError, APIStatusError, InternalServerError, RateLimitError
+from utils.logging import app_logger
+from utils.metrics import atrack_stream, track_external_call, track_stream
+from config import (
+    GROQ_REQUESTS_PER_MINUTE,
+    GROQ_TOKENS_PER_MINUTE,
+    GROQ_MAX_RETRIES,
+    GROQ_RETRY_BASE_DELAY,
+    GROQ_RETRY_MAX_DELAY,
+)
+
+# Errors worth retrying: rate limits, server errors and connection failures
+RETRYABLE_ERRORS = (RateLimitError, InternalServerError, APIConnectionError)
+
+
+class TokenBucket:
+    """Token bucket whose level can go negative to reserve future capacity."""
+
+    def __init__(self, per_minute: int):
+        """
+        Initialize a full bucket.
+
+        Args:
+            per_minute: Capacity refilled every minute
+        """
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Reserve capacity, returning how long to wait before using it.
+
+        Args:
+            amount: Capacity to reserve
+            now: Current monotonic time
+
+        Returns:
+            Delay in seconds before the reservation is available
+        """
+        self._refill(now)
+        self.level -= amount
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def refund(self, amount: float, now: float):
+        """
+        Give back capacity that was reserved but not used.
+
+        Args:
+            amount: Capacity to return (negative to take more)
+            now: Current monotonic time
+        """
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+    def block(self, seconds: float, now: float):
+        """
+        Make the bucket empty for at least the given duration.
+
+        Args:
+            seconds: Duration during which no capacity is available
+            now: Current monotonic time
+        """
+        self._refill(now)
+        self.level = min(self.level, -seconds * self.rate)
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """
+    Read the retry-after header of a Groq API error.
+
+    Args:
+        error: Error raised by the Groq client
+
+    Returns:
+        Delay in seconds requested by the server, or None
+    """
+    if not isinstance(error, APIStatusError):
+        return None
+
+    value = error.response.headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class GroqRequestScheduler:
+    """Client-side scheduler keeping Groq calls within request and token budgets."""
+
+    def __init__(
+        self,
+        requests_per_minute: int = GROQ_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = GROQ_TOKENS_PER_MINUTE,
+        max_retries: int = GROQ_MAX_RETRIES,
+        base_delay: float = GROQ_RETRY_BASE_DELAY,
+        max_delay: float = GROQ_RETRY_MAX_DELAY,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            requests_per_minute: Request budget per minute (0 for no limit)
+            tokens_per_minute: Token budget per minute (0 for no limit)
+            max_retries: Maximum number of retries of a failed call
+            base_delay: Base delay in seconds of the exponential backoff
+            max_delay: Maximum delay in seconds between two attempts
+        """
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self._queue_depth = 0
+        self._stats = {
+            "requests": 0,
+            "delayed_requests": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "rate_limited": 0,
+            "retries": 0,
+            "errors": 0,
+        }
+
+    def reserve(self, tokens: int) -> float:
+        """
+        Reserve a request slot and a token budget for one call.
+
+        Reservations are granted in arrival order, so callers are served FIFO.
+
+        Args:
+            tokens: Estimated number of tokens of the call
+
+        Returns:
+            Delay in seconds before the call may start
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay = 0.0
+            if self.requests:
+                delay = max(delay, self.requests.reserve(1, now))
+            if self.tokens:
+                delay = max(delay, self.tokens.reserve(tokens, now))
+
+            self._stats["requests"] += 1
+            if delay > 0:
+                self._stats["delayed_requests"] += 1
+                self._stats["total_wait_seconds"] += delay
+                self._stats["max_wait_seconds"] = max(
+                    self._stats["max_wait_seconds"], delay
+                )
+
+            return delay
+
+    def release(self, estimated_tokens: int, used_tokens: Optional[int]):
+        """
+        Adjust the token budget once the real usage of a call is known.
+
+        Args:
+            estimated_tokens: Tokens reserved for the call
+            used_tokens: Tokens actually used (None to keep the estimate)
+        """
+        if not self.tokens or used_tokens is None:
+            return
+
+        with self._lock:
+            self.tokens.refund(estimated_tokens - used_tokens, time.monotonic())
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        """
+        Compute the delay before retrying a failed call.
+
+        A retry-after header is honored and also pauses every queued call.
+
+        Args:
+            attempt: Number of the failed attempt (starting at 0)
+            error: Error raised by the call
+
+        Returns:
+            Delay in seconds before the next attempt
+        """
+        retry_after = get_retry_after(error)
+        with self._lock:
+            self._stats["retries"] += 1
+            if isinstance(error, RateLimitError):
+                self._stats["rate_limited"] += 1
+
+            if retry_after is not None:
+                now = time.monotonic()
+                if self.requests:
+                    self.requests.block(retry_after, now)
+                if self.tokens:
+                    self.tokens.block(retry_after, now)
+                # Small jitter so that waiting callers do not retry in lockstep
+                return retry_after + random.uniform(0, min(1.0, retry_after * 0.1))
+
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def _record_error(self):
+        with self._lock:
+            self._stats["errors"] += 1
+
+    def _enter_queue(self):
+        with self._lock:
+            self._queue_depth += 1
+
+    def _leave_queue(self):
+        with self._lock:
+            self._queue_depth -= 1
+
+    def _wait(self, delay: float):
+        if delay <= 0:
+            return
+        self._enter_queue()
+        try:
+            time.sleep(delay)
+        finally:
+            self._leave_queue()
+
+    async def _await(self, delay: float):
+        if delay <= 0:
+            return
+        self._enter_queue()
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self._leave_queue()
+
+    def call(self, func: Callable[[], Any], tokens: int, stream: bool = False) -> Any:
+        """
+        Run a Groq call within the budgets, retrying retryable failures.
+
+        Args:
+            func: Function performing the call
+            tokens: Estimated number of tokens of the call
+            stream: Whether the call returns a streamed completion, whose call
+                metrics are then recorded once the stream ends
+
+        Returns:
+            The result of the call
+        """
+        attempt = 0
+        while True:
+            self._wait(self.reserve(tokens))
+            start_time = time.perf_counter()
+            try:
+                with track_external_call("groq", start_time, opens_stream=stream):
+                    result = func()
+            except RETRYABLE_ERRORS as e:
+                self.release(tokens, 0)
+                if attempt >= self.max_retries:
+                    self._record_error()
+                    raise
+                delay = self.backoff(attempt, e)
+                app_logger.warning(f"Groq call failed ({e}), retrying in {delay:.2f}s")
+                self._wait(delay)
+                attempt += 1
+                continue
+            except Exception:
+                self.release(tokens, 0)
+                self._record_error()
+                raise
+
+            self.release(tokens, get_used_tokens(result))
+            if stream:
+                # The call lasts until its stream is exhausted
+                return track_stream(result, "groq", start_time)
+            return result
+
+    async def acall(
+        self, func: Callable[[], Awaitable[Any]], tokens: int, stream: bool = False
+    ) -> Any:
+        """
+        Asynchronously run a Groq call within the budgets, retrying retryable failures.
+
+        Args:
+            func: Coroutine function performing the call
+            tokens: Estimated number of tokens of the call
+            stream: Whether the call returns a streamed completion, whose call
+                metrics are then recorded once the stream ends
+
+        Returns:
+            The result of the call
+        """
+        attempt = 0
+        while True:
+            delay = self.reserve(tokens)
+            try:
+                await self._await(delay)
+            except asyncio.CancelledError:
+                self.release(tokens, 0)
+                raise
+
+            start_time = time.perf_counter()
+            try:
+                with track_external_call("groq", start_time, opens_stream=stream):
+                    result = await func()
+            except RETRYABLE_ERRORS as e:
+                self.release(tokens, 0)
+                if attempt >= self.max_retries:
+                    self._record_error()
+                    raise
+                delay = self.backoff(attempt, e)
+                app_logger.warning(f"Groq call failed ({e}), retrying in {delay:.2f}s")
+                await self._await(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                self.release(tokens, 0)
+                self._record_error()
+                raise
+
+            self.release(tokens, get_used_tokens(result))
+            if stream:
+                # The call lasts until its stream is exhausted
+                return atrack_stream(result, "groq", start_time)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the scheduler statistics.
+
+        Returns:
+            Queue depth, wait times and retry counters
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["queue_depth"] = self._queue_depth
+            stats["average_wait_seconds"] = (
+                stats["total_wait_seconds"] / stats["delayed_requests"]
+                if stats["delayed_requests"]
+                else 0.0
+            )
+            return stats
+
+
+def get_used_tokens(result: Any) -> Optional[int]:
+    """
+    Read the total token usage of a chat completion.
+
+    Args:
+        result: Chat completion returned by the Groq client
+
+    Returns:
+        Total tokens used, or None if unknown (e.g. streamed completions)
+    """
+    total_tokens = getattr(getattr(result, "usage", None), "total_tokens", None)
+    return total_tokens if isinstance(total_tokens, int) else None
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """
+    Estimate the tokens a completion will consume.
+
+    Args:
+        prompt: Prompt sent to the model
+        max_tokens: Maximum completion tokens
+
+    Returns:
+        Estimated prompt plus completion tokens
+    """
+    # Roughly four characters per token for Latin scripts
+    return len(prompt) // 4 + max_tokens
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> GroqRequestScheduler:
+    """
+    Return the process-wide Groq request scheduler.
+
+    Returns:
+        Shared GroqRequestScheduler
+    """
+    global _scheduler
+
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = GroqRequestScheduler()
+
+    return _scheduler
@@ -1,28 +1,144 @@
 # models/vectorstore.py
+import hashlib
+import json
 import os
-from typing import List
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from langchain.embeddings.base import Embeddings
 from langchain.schema import Document
 from langchain_community.vectorstores import FAISS
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from models.embeddings import get_embedding_model
-from config import CHUNK_SIZE, CHUNK_OVERLAP
+from config import CHUNK_SIZE, CHUNK_OVERLAP, INDEX_STREAM_BATCH_SIZE
+
+# Version of the manifest format, indices with another version are rebuilt
+MANIFEST_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+
+
+def article_hash(document: Document) -> str:
+    """
+    Hash an article by number, state, section path and content.
+
+    Args:
+        document: Article document
+
+    Returns:
+        Hex digest identifying this version of the article
+    """
+    metadata = document.metadata
+    key = [
+        metadata.get("num"),
+        metadata.get("etat"),
+        metadata.get("pathTitle"),
+        document.page_content,
+    ]
+    return hashlib.sha256(json.dumps(key, ensure_ascii=False).encode()).hexdigest()
+
+
+def split_with_ids(
+    documents: Iterable[Document], splitter: RecursiveCharacterTextSplitter
+) -> Iterable[Tuple[str, Document]]:
+    """
+    Split articles into chunks identified by the article hash and position.
+
+    Identical articles are only split once.
+
+    Args:
+        documents: Article documents
+        splitter: Text splitter
+
+    Returns:
+        Iterable of (chunk id, chunk) pairs
+    """
+    seen = set()
+    for document in documents:
+        digest = article_hash(document)
+        if digest in seen:
+            continue
+        seen.add(digest)
+        for i, chunk in enumerate(splitter.split_documents([document])):
+            yield f"{digest}:{i}", chunk
+
+
+def chunk_ids(articles: Dict[str, int]) -> List[str]:
+    """Return the chunk ids of articles given their number of chunks."""
+    return [f"{digest}:{i}" for digest, count in articles.items() for i in range(count)]
+
+
+def count_chunks(ids: Iterable[str]) -> Dict[str, int]:
+    """Return the number of chunks of each article, from the chunk ids."""
+    return dict(Counter(chunk_id.rsplit(":", 1)[0] for chunk_id in ids))
+
+
+def read_manifest(index_path: str) -> Optional[Dict]:
+    """
+    Read the manifest of an index, if it matches the current splitting.
+
+    Args:
+        index_path: Folder of the index
+
+    Returns:
+        Manifest with the number of chunks of each article hash, or None
+    """
+    try:
+        with open(os.path.join(index_path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    expected = {
+        "version": MANIFEST_VERSION,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+    }
+    if any(manifest.get(key) != value for key, value in expected.items()):
+        return None
+    return manifest
+
+
+def write_manifest(
+    index_path: str, articles: Dict[str, int], fingerprint: Optional[str] = None
+):
+    """
+    Write the manifest of an index.
+
+    Args:
+        index_path: Folder of the index
+        articles: Number of chunks of each article hash
+        fingerprint: Hash of the chunks the index was built from, if it was
+            built from scratch by the index builder
+    """
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "articles": articles,
+    }
+    if fingerprint is not None:
+        manifest["fingerprint"] = fingerprint
+    path = os.path.join(index_path, MANIFEST_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(f"{path}.tmp", path)
 
 
 class VectorstoreManager:
     """Manager for creating and loading FAISS vectorstores."""
 
-    def __init__(self, law_code_name: str):
+    def __init__(self, law_code_name: str, embedding_model: Embeddings = None):
         """
         Initialize with the name of the law code.
 
         Args:
             law_code_name: Name of the law code
+            embedding_model: Embedding model (None for the shared model)
         """
         self.law_code_name = law_code_name
         self.index_path = os.path.join(
             os.path.dirname(__file__), "..", "data", "indices", law_code_name
         )
-        self.embedding_model = get_embedding_model()
+        self.embedding_model = embedding_model or get_embedding_model()
 
     def create_vectorstore(self, documents: List[Document]) -> FAISS:
         """
@@ -49,6 +165,94 @@ class VectorstoreManager:
 
         return vectorstore
 
+    def update_vectorstore(
+        self, documents: Iterable[Document], batch_size: int = INDEX_STREAM_BATCH_SIZE
+    ) -> Dict[str, int]:
+        """
+        Update the vectorstore with a new version of the law code, embedding
+        only the new or changed articles and deleting the removed ones.
+
+        Articles are compared by the hashes stored in the manifest of the
+        index. Indices without a usable manifest are rebuilt from scratch.
+
+        Args:
+            documents: Iterable of Document objects of the whole law code
+            batch_size: Number of chunks embedded together
+
+        Returns:
+            Number of added, removed and unchanged articles and of embedded
+            and deleted chunks
+        """
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
+        )
+
+        vectorstore = None
+        old_articles: Dict[str, int] = {}
+        manifest = read_manifest(self.index_path)
+        if manifest is not None:
+            try:
+                vectorstore = self.load_vectorstore()
+            except FileNotFoundError:
+                pass
+
+        if vectorstore is not None:
+            # The index may have been rebuilt since the manifest was written
+            stored_ids = set(vectorstore.index_to_docstore_id.values())
+            if set(chunk_ids(manifest["articles"])) <= stored_ids:
+                old_articles = manifest["articles"]
+            else:
+                vectorstore = None
+
+        # Only the chunks of new or changed articles are kept in memory
+        articles: Dict[str, int] = {}
+        new_chunks: List[Tuple[str, Document]] = []
+        for chunk_id, chunk in split_with_ids(documents, splitter):
+            digest = chunk_id.rsplit(":", 1)[0]
+            articles[digest] = articles.get(digest, 0) + 1
+            if digest not in old_articles:
+                new_chunks.append((chunk_id, chunk))
+
+        removed = {
+            digest: count
+            for digest, count in old_articles.items()
+            if digest not in articles
+        }
+        if removed:
+            vectorstore.delete(chunk_ids(removed))
+
+        for start in range(0, len(new_chunks), batch_size):
+            batch = new_chunks[start : start + batch_size]
+            texts = [chunk.page_content for _, chunk in batch]
+            text_embeddings = zip(texts, self.embedding_model.embed_documents(texts))
+            metadatas = [chunk.metadata for _, chunk in batch]
+            ids = [chunk_id for chunk_id, _ in batch]
+            if vectorstore is None:
+                vectorstore = FAISS.from_embeddings(
+                    text_embeddings, self.embedding_model, metadatas=metadatas, ids=ids
+                )
+            else:
+                vectorstore.add_embeddings(
+                    text_embeddings, metadatas=metadatas, ids=ids
+                )
+
+        if vectorstore is None:
+            raise ValueError(f"No documents to index for {self.law_code_name}")
+
+        # Save vectorstore, then the manifest describing it
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        vectorstore.save_local(self.index_path)
+        write_manifest(self.index_path, articles)
+
+        added = sum(1 for digest in articles if digest not in old_articles)
+        return {
+            "added_articles": added,
+            "removed_articles": len(removed),
+            "unchanged_articles": len(articles) - added,
+            "embedded_chunks": len(new_chunks),
+            "deleted_chunks": sum(removed.values()),
+        }
+
     def load_vectorstore(self) -> FAISS:
         """
         Load an existing vectorstore.
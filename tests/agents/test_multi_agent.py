@@ -54,3 +54,47 @@ def test_create_multi_agent_default_verbose(
     # Assert
     args, kwargs = mock_initialize_agent.call_args
     assert kwargs["verbose"] == False
+
+
+def test_limit_iterations(sample_tools):
+    """Test that a limited copy shares the tools of the agent"""
+    from langchain.agents import AgentType, initialize_agent
+    from langchain_core.language_models import FakeListLLM
+    from agents.multi_agent import limit_iterations
+
+    agent = initialize_agent(
+        sample_tools,
+        FakeListLLM(responses=["Final Answer: ok"]),
+        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        max_iterations=15,
+    )
+
+    limited = limit_iterations(agent, 2)
+
+    assert limited.max_iterations == 2
+    assert limited.tools is agent.tools
+    assert agent.max_iterations == 15
+    # No copy is needed when the agent already stops earlier
+    assert limit_iterations(agent, 20) is agent
+
+
+def test_stopped_early(sample_tools):
+    """Test that only runs stopped at the iteration limit are detected"""
+    from langchain.agents import AgentType, initialize_agent
+    from langchain_core.language_models import FakeListLLM
+    from agents.multi_agent import stopped_early
+
+    def make_agent(responses):
+        return initialize_agent(
+            sample_tools,
+            FakeListLLM(responses=responses),
+            agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+            max_iterations=1,
+        )
+
+    looping = make_agent(["Action: tool1\nAction Input: again"] * 2)
+    finished = make_agent(["Final Answer: ok"])
+
+    assert stopped_early(looping.run("question"))
+    assert not stopped_early(finished.run("question"))
+    assert not stopped_early(None)
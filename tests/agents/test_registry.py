@@ -0,0 +1,233 @@
+# tests/agents/test_registry.py
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from agents.registry import AgentCache, RAGToolRegistry, estimate_index_bytes
+
+
+def make_vectorstore(ntotal=10, d=4):
+    vectorstore = MagicMock()
+    vectorstore.index.ntotal = ntotal
+    vectorstore.index.d = d
+    return vectorstore
+
+
+@pytest.fixture
+def mock_vectorstore_manager():
+    with patch("agents.registry.VectorstoreManager") as mock:
+        mock.return_value.load_vectorstore.side_effect = lambda: make_vectorstore()
+        yield mock
+
+
+@pytest.fixture
+def mock_create_rag_tool():
+    with patch("agents.registry.create_rag_tool") as mock:
+        mock.side_effect = lambda law_code, vectorstore=None: MagicMock(
+            name=f"{law_code}_rag"
+        )
+        yield mock
+
+
+@pytest.fixture
+def mock_legal_data_loader():
+    with patch("agents.registry.LegalDataLoader") as mock:
+        mock.return_value.load = AsyncMock(return_value=["doc1", "doc2"])
+        yield mock
+
+
+def test_estimate_index_bytes():
+    assert estimate_index_bytes(make_vectorstore(ntotal=100, d=384)) == 153600
+    assert estimate_index_bytes(object()) == 0
+
+
+def test_estimate_index_bytes_counts_docstore():
+    """Test that the chunk texts, metadata and ids are part of the estimate"""
+    from langchain_community.embeddings import DeterministicFakeEmbedding
+    from langchain_community.vectorstores import FAISS
+    from agents.registry import CHUNK_OVERHEAD_BYTES
+
+    vectorstore = FAISS.from_texts(
+        ["x" * 1000, "y" * 3000],
+        DeterministicFakeEmbedding(size=4),
+        metadatas=[{"num": "L1"}, {"num": "L2"}],
+        ids=["a", "b"],
+    )
+
+    vectors = 2 * 4 * 4
+    chunks = 2 * CHUNK_OVERHEAD_BYTES + 2 * 2 + 4000 + 2 * len("numL1")
+    assert estimate_index_bytes(vectorstore) == vectors + chunks
+
+
+@pytest.mark.asyncio
+async def test_get_loads_once_and_shares_tool(
+    mock_vectorstore_manager, mock_create_rag_tool
+):
+    registry = RAGToolRegistry(max_codes=0, max_memory_mb=0)
+
+    first = await registry.get("civil")
+    second = await registry.get("civil")
+
+    assert first is second
+    assert "civil" in registry
+    mock_vectorstore_manager.assert_called_once_with("civil")
+    mock_create_rag_tool.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_concurrent_requests_load_once(
+    mock_vectorstore_manager, mock_create_rag_tool
+):
+    registry = RAGToolRegistry(max_codes=0, max_memory_mb=0)
+
+    tools = await asyncio.gather(*[registry.get("civil") for _ in range(5)])
+
+    assert all(tool is tools[0] for tool in tools)
+    mock_vectorstore_manager.return_value.load_vectorstore.assert_called_once()
+    # The load lock is dropped once every waiter is done
+    assert registry._load_locks == {}
+
+
+@pytest.mark.asyncio
+async def test_get_failed_loads_do_not_keep_locks(
+    mock_vectorstore_manager, mock_create_rag_tool
+):
+    registry = RAGToolRegistry(max_codes=0, max_memory_mb=0)
+
+    with patch.object(
+        registry, "_load_vectorstore", new_callable=AsyncMock
+    ) as mock_load:
+        mock_load.side_effect = FileNotFoundError("unknown code")
+        for i in range(3):
+            with pytest.raises(FileNotFoundError):
+                await registry.get(f"unknown_{i}")
+
+    assert registry._load_locks == {}
+    assert registry._load_waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_get_builds_index_when_missing(
+    mock_vectorstore_manager, mock_create_rag_tool, mock_legal_data_loader
+):
+    manager = mock_vectorstore_manager.return_value
+    manager.load_vectorstore.side_effect = FileNotFoundError
+    manager.create_vectorstore.return_value = make_vectorstore()
+
+    registry = RAGToolRegistry(max_codes=0, max_memory_mb=0)
+    await registry.get("penal")
+
+    mock_legal_data_loader.assert_called_once_with("penal")
+    manager.create_vectorstore.assert_called_once_with(["doc1", "doc2"])
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_by_count(mock_vectorstore_manager, mock_create_rag_tool):
+    registry = RAGToolRegistry(max_codes=2, max_memory_mb=0)
+
+    await registry.get("civil")
+    await registry.get("penal")
+    await registry.get("civil")  # civil becomes the most recently used
+    await registry.get("travail")
+
+    assert len(registry) == 2
+    assert "civil" in registry
+    assert "travail" in registry
+    assert "penal" not in registry
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_by_memory(mock_vectorstore_manager, mock_create_rag_tool):
+    # Each index is 1 MB: 65536 vectors of 4 float32 dimensions
+    mock_vectorstore_manager.return_value.load_vectorstore.side_effect = (
+        lambda: make_vectorstore(ntotal=65536, d=4)
+    )
+    registry = RAGToolRegistry(max_codes=0, max_memory_mb=2)
+
+    await registry.get("civil")
+    await registry.get("penal")
+    await registry.get("travail")
+
+    assert len(registry) == 2
+    assert "civil" not in registry
+    assert registry.memory_usage() == 2 * 1024 * 1024
+
+
+@pytest.mark.asyncio
+async def test_preload_skips_failing_codes(
+    mock_vectorstore_manager, mock_create_rag_tool
+):
+    registry = RAGToolRegistry(max_codes=0, max_memory_mb=0)
+
+    with patch.object(
+        registry, "_load_vectorstore", new_callable=AsyncMock
+    ) as mock_load:
+        mock_load.side_effect = [make_vectorstore(), Exception("boom")]
+        loaded = await registry.preload(["civil", "broken"])
+
+    assert loaded == ["civil"]
+    assert "broken" not in registry
+
+
+@pytest.mark.asyncio
+async def test_evict_and_clear(mock_vectorstore_manager, mock_create_rag_tool):
+    registry = RAGToolRegistry(max_codes=0, max_memory_mb=0)
+    await registry.get("civil")
+    await registry.get("penal")
+
+    assert registry.evict("civil") is True
+    assert registry.evict("civil") is False
+    assert list(registry.stats()) == ["penal"]
+
+    registry.clear()
+    assert len(registry) == 0
+
+
+@pytest.mark.asyncio
+async def test_eviction_listeners_notified(
+    mock_vectorstore_manager, mock_create_rag_tool
+):
+    registry = RAGToolRegistry(max_codes=1, max_memory_mb=0)
+    listener = MagicMock()
+    registry.add_eviction_listener(listener)
+
+    await registry.get("civil")
+    await registry.get("penal")
+    registry.evict("penal")
+
+    assert [call.args[0] for call in listener.call_args_list] == ["civil", "penal"]
+
+
+def test_agent_cache_key_is_order_insensitive():
+    key = AgentCache.make_key(["civil", "penal"], True, True)
+
+    assert AgentCache.make_key(["penal", "civil", "civil"], True, True) == key
+    assert AgentCache.make_key(["civil"], True, True) != key
+    assert AgentCache.make_key(["civil", "penal"], True, True, streaming=True) != key
+    # Law codes do not matter without RAG tools
+    assert AgentCache.make_key(["civil"], True, False) == AgentCache.make_key(
+        ["penal"], True, False
+    )
+
+
+def test_agent_cache_lru_bound():
+    cache = AgentCache(max_agents=2)
+    keys = [AgentCache.make_key([code], False, True) for code in ("a", "b", "c")]
+
+    cache.put(keys[0], "agent_a", [])
+    cache.put(keys[1], "agent_b", [])
+    cache.get(keys[0])
+    cache.put(keys[2], "agent_c", [])
+
+    assert len(cache) == 2
+    assert keys[0] in cache and keys[2] in cache
+    assert keys[1] not in cache
+
+
+def test_agent_cache_discard_law_code():
+    cache = AgentCache(max_agents=0)
+    cache.put(AgentCache.make_key(["civil", "penal"], True, True), "agent_1", [])
+    cache.put(AgentCache.make_key(["civil"], False, True), "agent_2", [])
+    cache.put(AgentCache.make_key(["penal"], False, True), "agent_3", [])
+
+    assert cache.discard_law_code("civil") == 2
+    assert len(cache) == 1
@@ -1,19 +1,33 @@
 import pytest
+import httpx
 from fastapi.testclient import TestClient
 from unittest.mock import MagicMock, patch, AsyncMock
+import asyncio
 import json
 import time
+import uuid
 
 # Import the FastAPI app from api.server
-from api.server import app, cache, QueryRequest, QueryResponse
+from api.server import app, admission, cache, QueryRequest, QueryResponse
+from agents.registry import AgentCache
+from utils.admission import AdmissionController
 
 # Create a test client
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def reset_agent_cache():
+    """Start every test without cached agents or search tool."""
+    with patch("api.server.agent_cache", AgentCache()), patch(
+        "api.server.search_tool", None
+    ):
+        yield
+
+
 @pytest.fixture
 def mock_redis_cache():
-    with patch("api.server.RedisCache") as mock_cache:
+    with patch("api.server.TieredCache") as mock_cache:
         mock_cache_instance = MagicMock()
         mock_cache.return_value = mock_cache_instance
         yield mock_cache_instance
@@ -28,37 +42,27 @@ def mock_create_search_tool():
 
 
 @pytest.fixture
-def mock_create_rag_tool():
-    with patch("api.server.create_rag_tool") as mock_tool:
-        mock_tool_instance = MagicMock()
-        mock_tool.return_value = mock_tool_instance
-        yield mock_tool
+def mock_rag_registry():
+    with patch("api.server.rag_registry.get", new_callable=AsyncMock) as mock_get_tool:
+        mock_get_tool.return_value = MagicMock()
+        yield mock_get_tool
 
 
 @pytest.fixture
 def mock_create_multi_agent():
     with patch("api.server.create_multi_agent") as mock_agent:
         mock_agent_instance = MagicMock()
-        mock_agent_instance.run.return_value = "Multi-agent response"
+        mock_agent_instance.arun = AsyncMock(return_value="Multi-agent response")
         mock_agent.return_value = mock_agent_instance
         yield mock_agent
 
 
-@pytest.fixture
-def mock_legal_data_loader():
-    with patch("api.server.LegalDataLoader") as mock_loader:
-        mock_loader_instance = MagicMock()
-        mock_loader_instance.load = AsyncMock(return_value=["document1", "document2"])
-        mock_loader.return_value = mock_loader_instance
-        yield mock_loader
-
-
 @pytest.fixture
 def mock_groq_llm():
     # Patch the module-level import that happens inside the function
     with patch("models.llm.GroqLLM") as mock_llm:
         mock_llm_instance = MagicMock()
-        mock_llm_instance.return_value = "Direct LLM response"
+        mock_llm_instance.ainvoke = AsyncMock(return_value="Direct LLM response")
         mock_llm.return_value = mock_llm_instance
         yield mock_llm_instance
 
@@ -125,6 +129,8 @@ def test_query_cached_response(mock_time):
         assert response_data["multi_agent_answer"] == "Cached multi-agent answer"
         assert response_data["cached"] == True
         assert response_data["processing_time"] == 5.0  # From mock_time
+        # Only the cache lookup of this request is reported
+        assert set(response_data["timings"]["stages"]) == {"cache_lookup"}
 
         # Check cache key
         cache_key = {
@@ -136,13 +142,80 @@ def test_query_cached_response(mock_time):
         mock_get.assert_called_once_with(cache_key)
 
 
+def test_query_semantic_cache_hit(mock_time):
+    # Arrange
+    query_request = {
+        "query": "droits du salarié licencié",
+        "law_codes": ["civil"],
+        "use_search": False,
+        "use_rag": True,
+    }
+
+    cached_response = {
+        "query": "Quels sont mes droits en cas de licenciement ?",
+        "direct_answer": "Cached direct answer",
+        "multi_agent_answer": "Cached multi-agent answer",
+        "processing_time": 2.5,
+        "cached": False,
+    }
+
+    semantic_cache = MagicMock()
+    semantic_cache.alookup = AsyncMock(return_value=json.dumps(cached_response))
+
+    with patch("api.server.semantic_cache", semantic_cache), patch.object(
+        cache, "get", return_value=None
+    ):
+        # Act
+        response = client.post("/api/query", json=query_request)
+
+    # Assert
+    assert response.status_code == 200
+    response_data = response.json()
+    assert response_data["query"] == query_request["query"]
+    assert response_data["direct_answer"] == "Cached direct answer"
+    assert response_data["cached"] == True
+    semantic_cache.alookup.assert_awaited_once_with(
+        query_request["query"],
+        {"law_codes": ["civil"], "use_search": False, "use_rag": True},
+    )
+
+
+def test_invalidate_cache():
+    # Arrange
+    with patch.object(cache, "invalidate", return_value=3) as mock_invalidate:
+        # Act
+        response = client.post("/api/cache/invalidate")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok", "generation": 3}
+    mock_invalidate.assert_called_once()
+
+
+def test_invalidate_cache_unavailable():
+    with patch.object(cache, "invalidate", return_value=None):
+        response = client.post("/api/cache/invalidate")
+
+    assert response.status_code == 503
+
+
+def test_cache_stats():
+    # Act
+    response = client.get("/api/cache/stats")
+
+    # Assert
+    assert response.status_code == 200
+    stats = response.json()
+    assert set(stats) == {"local", "redis"}
+    assert "hit_rate" in stats["local"]
+
+
 @pytest.mark.asyncio
 async def test_query_new_response(
     mock_time,
     mock_create_search_tool,
-    mock_create_rag_tool,
+    mock_rag_registry,
     mock_create_multi_agent,
-    mock_legal_data_loader,
 ):
     # Arrange
     query_request = {
@@ -156,7 +229,7 @@ async def test_query_new_response(
     # Mock GroqLLM since it's imported inside the function
     with patch("models.llm.GroqLLM") as mock_llm_class:
         mock_llm_instance = MagicMock()
-        mock_llm_instance.return_value = "Direct LLM response"
+        mock_llm_instance.ainvoke = AsyncMock(return_value="Direct LLM response")
         mock_llm_class.return_value = mock_llm_instance
 
         with patch.object(cache, "get", return_value=None) as mock_get, patch.object(
@@ -177,19 +250,22 @@ async def test_query_new_response(
 
             # Verify tools and agent were created correctly
             mock_create_search_tool.assert_called_once()
-            mock_create_rag_tool.assert_called_once_with(
-                "penal", ["document1", "document2"]
-            )
+            mock_rag_registry.assert_called_once_with("penal")
             mock_create_multi_agent.assert_called_once()
 
             # Verify cache operations
             mock_get.assert_called_once()
             mock_set.assert_called_once()
 
+            # Verify the stage timings are reported but not cached
+            stages = response_data["timings"]["stages"]
+            assert {"cache_lookup", "direct_llm", "agent_run"} <= set(stages)
+            assert "timings" not in json.loads(mock_set.call_args[0][1])
+
 
 @pytest.mark.asyncio
 async def test_query_with_rag_only(
-    mock_time, mock_create_rag_tool, mock_create_multi_agent, mock_legal_data_loader
+    mock_time, mock_rag_registry, mock_create_multi_agent
 ):
     # Arrange
     query_request = {
@@ -202,7 +278,7 @@ async def test_query_with_rag_only(
     # Mock GroqLLM since it's imported inside the function
     with patch("models.llm.GroqLLM") as mock_llm_class:
         mock_llm_instance = MagicMock()
-        mock_llm_instance.return_value = "Direct LLM response"
+        mock_llm_instance.ainvoke = AsyncMock(return_value="Direct LLM response")
         mock_llm_class.return_value = mock_llm_instance
 
         with patch.object(cache, "get", return_value=None) as mock_get, patch.object(
@@ -236,7 +312,7 @@ async def test_query_with_search_only(
     # Mock GroqLLM since it's imported inside the function
     with patch("models.llm.GroqLLM") as mock_llm_class:
         mock_llm_instance = MagicMock()
-        mock_llm_instance.return_value = "Direct LLM response"
+        mock_llm_instance.ainvoke = AsyncMock(return_value="Direct LLM response")
         mock_llm_class.return_value = mock_llm_instance
 
         with patch.object(cache, "get", return_value=None) as mock_get, patch.object(
@@ -249,14 +325,14 @@ async def test_query_with_search_only(
             # Assert
             assert response.status_code == 200
 
-            # Verify create_rag_tool was not called
-            from api.server import create_rag_tool
+            # Verify no RAG tool was requested
+            from api.server import rag_registry
 
-            assert not hasattr(create_rag_tool, "call_args")
+            assert not hasattr(rag_registry.get, "call_args")
 
 
 @pytest.mark.asyncio
-async def test_query_error_loading_law_code(mock_time, mock_legal_data_loader):
+async def test_query_error_loading_law_code(mock_time, mock_rag_registry):
     # Arrange
     query_request = {
         "query": "What is the civil code?",
@@ -265,10 +341,8 @@ async def test_query_error_loading_law_code(mock_time, mock_legal_data_loader):
         "use_rag": True,
     }
 
-    # Make the legal data loader raise an exception
-    mock_legal_data_loader.return_value.load.side_effect = Exception(
-        "Failed to load documents"
-    )
+    # Make the RAG registry raise an exception
+    mock_rag_registry.side_effect = Exception("Failed to load documents")
 
     with patch.object(cache, "get", return_value=None) as mock_get:
         # Act
@@ -280,9 +354,7 @@ async def test_query_error_loading_law_code(mock_time, mock_legal_data_loader):
 
 
 @pytest.mark.asyncio
-async def test_query_error_in_multi_agent(
-    mock_time, mock_create_rag_tool, mock_legal_data_loader
-):
+async def test_query_error_in_multi_agent(mock_time, mock_rag_registry):
     # Arrange
     query_request = {
         "query": "What is the civil code?",
@@ -292,17 +364,19 @@ async def test_query_error_in_multi_agent(
     }
 
     # Clear or mock agent_cache to ensure our agent is used
-    with patch("api.server.agent_cache", {}):
+    with patch("api.server.agent_cache", AgentCache()):
         # Create a mock agent that raises an exception when run is called
         mock_agent = MagicMock()
-        mock_agent.run.side_effect = Exception("Agent error")
+        mock_agent.arun = AsyncMock(side_effect=Exception("Agent error"))
 
         # Patch create_multi_agent to return our mock agent
         with patch("api.server.create_multi_agent", return_value=mock_agent):
             # Mock GroqLLM since it's imported inside the function
             with patch("models.llm.GroqLLM") as mock_llm_class:
                 mock_llm_instance = MagicMock()
-                mock_llm_instance.return_value = "Direct LLM response"
+                mock_llm_instance.ainvoke = AsyncMock(
+                    return_value="Direct LLM response"
+                )
                 mock_llm_class.return_value = mock_llm_instance
 
                 with patch.object(
@@ -316,3 +390,489 @@ async def test_query_error_in_multi_agent(
                     assert response.status_code == 200
                     response_data = response.json()
                     assert "Error: Agent error" in response_data["multi_agent_answer"]
+
+
+@pytest.mark.asyncio
+async def test_query_runs_direct_and_agent_concurrently(mock_time, mock_rag_registry):
+    # Arrange
+    query_request = {
+        "query": "What is the civil code?",
+        "law_codes": ["civil"],
+        "use_search": False,
+        "use_rag": True,
+    }
+
+    # Both branches must reach the barrier at the same time to proceed
+    barrier = asyncio.Barrier(2)
+
+    async def direct_llm(query):
+        await asyncio.wait_for(barrier.wait(), timeout=5)
+        return "Direct LLM response"
+
+    async def run_agent(query, callbacks=None):
+        await asyncio.wait_for(barrier.wait(), timeout=5)
+        return "Multi-agent response"
+
+    mock_agent = MagicMock()
+    mock_agent.arun = AsyncMock(side_effect=run_agent)
+
+    with patch("api.server.agent_cache", AgentCache()), patch(
+        "api.server.create_multi_agent", return_value=mock_agent
+    ), patch("models.llm.GroqLLM") as mock_llm_class:
+        mock_llm_class.return_value.ainvoke = AsyncMock(side_effect=direct_llm)
+
+        with patch.object(cache, "get", return_value=None), patch.object(cache, "set"):
+            # Act
+            response = client.post("/api/query", json=query_request)
+
+    # Assert
+    assert response.status_code == 200
+    response_data = response.json()
+    assert response_data["direct_answer"] == "Direct LLM response"
+    assert response_data["multi_agent_answer"] == "Multi-agent response"
+
+
+def parse_sse(body):
+    """Parse a Server-Sent Events body into (event, data) tuples."""
+    events = []
+    for message in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in message.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_query_stream_cached_response():
+    # Arrange
+    query_request = {"query": "What is the civil code?", "law_codes": ["civil"]}
+    cached_response = {
+        "query": "What is the civil code?",
+        "direct_answer": "Cached direct answer",
+        "multi_agent_answer": "Cached multi-agent answer",
+        "processing_time": 2.5,
+        "cached": False,
+    }
+
+    with patch.object(cache, "get", return_value=json.dumps(cached_response)):
+        # Act
+        response = client.post("/api/query/stream", json=query_request)
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    assert [event for event, _ in events] == ["done"]
+    assert events[0][1]["cached"] is True
+    assert events[0][1]["direct_answer"] == "Cached direct answer"
+
+
+def test_query_stream_new_response(mock_rag_registry):
+    # Arrange
+    query_request = {
+        "query": "What is the civil code?",
+        "law_codes": ["civil"],
+        "use_search": False,
+        "use_rag": True,
+    }
+    rag_tool = MagicMock()
+    rag_tool.name = "civil_rag"
+    mock_rag_registry.return_value = rag_tool
+
+    async def run_agent(query, callbacks=None):
+        handler = callbacks[0]
+        run_id = uuid.uuid4()
+        await handler.on_tool_start({"name": "civil_rag"}, query, run_id=run_id)
+        await handler.on_retriever_end(["doc1", "doc2"], run_id=uuid.uuid4())
+        await handler.on_tool_end("observation", run_id=run_id)
+        await handler.on_llm_new_token("Multi-agent ")
+        await handler.on_llm_new_token("response")
+        return "Multi-agent response"
+
+    async def direct_stream(query):
+        for token in ["Direct ", "answer"]:
+            yield token
+
+    mock_agent = MagicMock()
+    mock_agent.arun = AsyncMock(side_effect=run_agent)
+
+    with patch("api.server.agent_cache", AgentCache()), patch(
+        "api.server.create_multi_agent", return_value=mock_agent
+    ) as mock_create_agent, patch("models.llm.GroqLLM") as mock_llm_class:
+        mock_llm_class.return_value.astream = direct_stream
+
+        with patch.object(cache, "get", return_value=None), patch.object(
+            cache, "set"
+        ) as mock_set:
+            # Act
+            response = client.post("/api/query/stream", json=query_request)
+
+    # Assert
+    assert response.status_code == 200
+    events = parse_sse(response.text)
+    names = [event for event, _ in events]
+
+    assert names[0] == "tools_ready"
+    assert events[0][1] == {"tools": ["civil_rag"]}
+    assert names[-1] == "done"
+    assert {"tool_start", "retrieval_done", "tool_end", "direct_done"} <= set(names)
+
+    direct_tokens = [data["token"] for event, data in events if event == "direct_token"]
+    agent_tokens = [data["token"] for event, data in events if event == "agent_token"]
+    assert "".join(direct_tokens) == "Direct answer"
+    assert "".join(agent_tokens) == "Multi-agent response"
+
+    tool_end = next(data for event, data in events if event == "tool_end")
+    assert tool_end == {"tool": "civil_rag"}
+
+    done = events[-1][1]
+    assert done["direct_answer"] == "Direct answer"
+    assert done["multi_agent_answer"] == "Multi-agent response"
+    assert done["cached"] is False
+
+    mock_create_agent.assert_called_once_with([rag_tool], False, streaming=True)
+    mock_set.assert_called_once()
+    # The admission slot is released once the stream ends
+    assert admission.stats()["active"] == 0
+
+
+def test_query_stream_error_loading_law_code(mock_rag_registry):
+    # Arrange
+    query_request = {"query": "What is the civil code?", "law_codes": ["civil"]}
+    mock_rag_registry.side_effect = Exception("Failed to load documents")
+
+    with patch.object(cache, "get", return_value=None), patch(
+        "api.server.create_search_tool"
+    ):
+        # Act
+        response = client.post("/api/query/stream", json=query_request)
+
+    # Assert
+    assert response.status_code == 500
+    assert "Error loading law code civil" in response.json()["detail"]
+    assert admission.stats()["active"] == 0
+
+
+async def start_unsent_stream():
+    """Return a streaming response to a cache miss, its body not started yet."""
+    from api.server import query_stream
+
+    agent = MagicMock()
+    with patch("api.server.get_cached", AsyncMock(return_value=None)), patch(
+        "api.server.get_agent", AsyncMock(return_value=(agent, []))
+    ):
+        response = await query_stream(QueryRequest(query="Never sent?"), MagicMock())
+
+    assert admission.stats()["active"] == 1
+    return response
+
+
+@pytest.mark.asyncio
+async def test_query_stream_releases_slot_of_unstarted_body():
+    """Test that closing a body that was never iterated releases its slot"""
+    response = await start_unsent_stream()
+
+    await response.body_iterator.aclose()
+    await response.body_iterator.aclose()
+
+    assert admission.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_query_stream_releases_slot_when_send_fails():
+    """Test that a client gone before the first event does not leak the slot"""
+    from starlette.requests import ClientDisconnect
+
+    response = await start_unsent_stream()
+    send = AsyncMock(side_effect=OSError("Connection reset"))
+
+    with pytest.raises(ClientDisconnect):
+        await response({"type": "http", "asgi": {"spec_version": "2.4"}}, None, send)
+
+    assert admission.stats()["active"] == 0
+
+
+def test_agent_reused_across_law_code_order(
+    mock_time, mock_rag_registry, mock_create_multi_agent
+):
+    # Arrange
+    mock_time.time.side_effect = [100.0, 105.0, 200.0, 205.0]
+    with patch("models.llm.GroqLLM") as mock_llm_class:
+        mock_llm_class.return_value.ainvoke = AsyncMock(return_value="Direct")
+
+        with patch.object(cache, "get", return_value=None), patch.object(cache, "set"):
+            # Act
+            for law_codes in (["civil", "penal"], ["penal", "civil", "civil"]):
+                response = client.post(
+                    "/api/query",
+                    json={
+                        "query": f"Question about {law_codes}",
+                        "law_codes": law_codes,
+                        "use_search": False,
+                    },
+                )
+                assert response.status_code == 200
+
+    # Assert
+    mock_create_multi_agent.assert_called_once()
+    assert [call.args[0] for call in mock_rag_registry.call_args_list] == [
+        "civil",
+        "penal",
+    ]
+
+
+def test_metrics_endpoint():
+    # Act
+    response = client.get("/metrics/")
+
+    # Assert
+    assert response.status_code == 200
+    assert "legal_assistant_in_flight_requests" in response.text
+    assert "legal_assistant_stage_duration_seconds" in response.text
+
+
+def test_scheduler_stats():
+    # Arrange
+    stats = {"queue_depth": 2, "requests": 10, "average_wait_seconds": 0.5}
+    with patch("api.server.get_scheduler") as mock_get_scheduler:
+        mock_get_scheduler.return_value.stats.return_value = stats
+
+        # Act
+        response = client.get("/api/llm/scheduler")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == stats
+
+
+@pytest.mark.asyncio
+async def test_query_coalesces_identical_concurrent_requests(mock_rag_registry):
+    # Arrange
+    query_request = {
+        "query": "What is the civil code?",
+        "law_codes": ["civil"],
+        "use_search": False,
+        "use_rag": True,
+    }
+    release = asyncio.Event()
+
+    async def direct_llm(query):
+        await release.wait()
+        return "Direct LLM response"
+
+    mock_agent = MagicMock()
+    mock_agent.arun = AsyncMock(return_value="Multi-agent response")
+
+    transport = httpx.ASGITransport(app=app)
+    with patch("api.server.agent_cache", AgentCache()), patch(
+        "api.server.create_multi_agent", return_value=mock_agent
+    ), patch("models.llm.GroqLLM") as mock_llm_class:
+        mock_llm_class.return_value.ainvoke = AsyncMock(side_effect=direct_llm)
+
+        with patch.object(cache, "get", return_value=None), patch.object(
+            cache, "set"
+        ) as mock_set:
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as async_client:
+                # Act
+                requests = [
+                    asyncio.ensure_future(
+                        async_client.post("/api/query", json=query_request)
+                    )
+                    for _ in range(3)
+                ]
+                await asyncio.sleep(0.1)
+                release.set()
+                responses = await asyncio.gather(*requests)
+
+    # Assert
+    assert all(response.status_code == 200 for response in responses)
+    assert all(
+        response.json()["direct_answer"] == "Direct LLM response"
+        for response in responses
+    )
+    mock_llm_class.return_value.ainvoke.assert_awaited_once()
+    mock_agent.arun.assert_awaited_once()
+    mock_set.assert_called_once()
+
+
+def test_flight_key_depends_on_deadline():
+    """Test that only queries with equivalent budgets share a computation"""
+    from api.server import get_cache_key, get_flight_key
+
+    def flight_key(deadline_ms):
+        request = QueryRequest(query="Q?", deadline_ms=deadline_ms)
+        return get_flight_key(get_cache_key(request), request)
+
+    assert flight_key(8000) != flight_key(60000)
+    assert flight_key(8000) == flight_key(8500)
+    # Budgets allowing every agent iteration are equivalent
+    assert flight_key(None) == flight_key(60000) == flight_key(120000)
+
+
+def test_query_shed_when_overloaded(mock_rag_registry):
+    """Test that cache misses are rejected when admission control is saturated"""
+    query_request = {"query": "Overloaded?", "law_codes": ["civil"]}
+    saturated = AdmissionController(
+        max_concurrent=1, max_queue=0, reject_status=503, retry_after=3
+    )
+    saturated._active = 1
+
+    with patch("api.server.admission", saturated), patch.object(
+        cache, "get", return_value=None
+    ):
+        response = client.post("/api/query", json=query_request)
+        stream_response = client.post("/api/query/stream", json=query_request)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert stream_response.status_code == 503
+    assert saturated.stats()["rejected"] == 2
+
+
+def test_cached_query_bypasses_admission(mock_time):
+    """Test that cache hits are served while admission control is saturated"""
+    cached_response = {"query": "Cached?", "direct_answer": "Cached answer"}
+    saturated = AdmissionController(max_concurrent=1, max_queue=0)
+    saturated._active = 1
+
+    with patch("api.server.admission", saturated), patch.object(
+        cache, "get", return_value=json.dumps(cached_response)
+    ):
+        response = client.post("/api/query", json={"query": "Cached?"})
+
+    assert response.status_code == 200
+    assert response.json()["direct_answer"] == "Cached answer"
+    assert saturated.stats()["rejected"] == 0
+
+
+@pytest.mark.parametrize(
+    "deadline_ms, expected_reasons",
+    [
+        (8000, ["search_skipped"]),
+        (4000, ["agent_skipped"]),
+    ],
+)
+def test_query_degraded_by_deadline(
+    mock_time,
+    mock_create_search_tool,
+    mock_rag_registry,
+    mock_create_multi_agent,
+    deadline_ms,
+    expected_reasons,
+):
+    """Test that short budgets skip work and the degraded answer is not cached"""
+    query_request = {
+        "query": "Quick question?",
+        "law_codes": ["civil"],
+        "deadline_ms": deadline_ms,
+    }
+
+    with patch("models.llm.GroqLLM") as mock_llm_class, patch(
+        "api.server.limit_iterations", side_effect=lambda agent, n: agent
+    ) as mock_limit:
+        mock_llm_class.return_value.ainvoke = AsyncMock(return_value="Direct answer")
+
+        with patch.object(cache, "get", return_value=None), patch.object(
+            cache, "set"
+        ) as mock_set:
+            response = client.post("/api/query", json=query_request)
+
+    assert response.status_code == 200
+    response_data = response.json()
+    assert response_data["direct_answer"] == "Direct answer"
+    assert response_data["degraded"] is True
+    assert response_data["degraded_reasons"] == expected_reasons
+    mock_create_search_tool.assert_not_called()
+    mock_set.assert_not_called()
+
+    if "agent_skipped" in expected_reasons:
+        assert response_data["multi_agent_answer"] is None
+        mock_rag_registry.assert_not_called()
+    else:
+        assert response_data["multi_agent_answer"] == "Multi-agent response"
+        assert mock_limit.call_args[0][1] == 2
+
+
+@pytest.mark.parametrize(
+    "agent_answer, expected_reasons",
+    [
+        ("Multi-agent response", []),
+        (
+            "Agent stopped due to iteration limit or time limit.",
+            ["agent_iterations_capped"],
+        ),
+    ],
+)
+def test_query_agent_iterations_capped(
+    mock_time,
+    mock_create_search_tool,
+    mock_rag_registry,
+    mock_create_multi_agent,
+    agent_answer,
+    expected_reasons,
+):
+    """Test that a capped agent only degrades the answer when it hit the cap"""
+    query_request = {
+        "query": "Capped question?",
+        "law_codes": ["civil"],
+        "deadline_ms": 20000,
+    }
+    mock_create_multi_agent.return_value.arun = AsyncMock(return_value=agent_answer)
+
+    with patch("models.llm.GroqLLM") as mock_llm_class, patch(
+        "api.server.limit_iterations", side_effect=lambda agent, n: agent
+    ) as mock_limit:
+        mock_llm_class.return_value.ainvoke = AsyncMock(return_value="Direct answer")
+
+        with patch.object(cache, "get", return_value=None), patch.object(
+            cache, "set"
+        ) as mock_set:
+            response = client.post("/api/query", json=query_request)
+
+    response_data = response.json()
+    assert mock_limit.call_args[0][1] == 6
+    assert response_data["degraded_reasons"] == expected_reasons
+    # Answers completed under the cap are still cached
+    assert mock_set.called == (not expected_reasons)
+
+
+def test_query_agent_stopped_at_deadline(mock_time, mock_rag_registry):
+    """Test that an agent running past the deadline falls back to the direct answer"""
+    query_request = {"query": "Slow question?", "law_codes": ["civil"]}
+
+    async def slow_agent(*args, **kwargs):
+        await asyncio.sleep(1)
+
+    mock_agent = MagicMock()
+    mock_agent.arun = AsyncMock(side_effect=slow_agent)
+
+    with patch("models.llm.GroqLLM") as mock_llm_class, patch(
+        "api.server.create_multi_agent", return_value=mock_agent
+    ), patch("api.server.QUERY_DEADLINE_MS", 50), patch(
+        "api.server.DEADLINE_SEARCH_MIN_MS", 0
+    ), patch(
+        "api.server.DEADLINE_AGENT_MIN_MS", 0
+    ), patch(
+        "api.server.limit_iterations", side_effect=lambda agent, n: agent
+    ):
+        mock_llm_class.return_value.ainvoke = AsyncMock(return_value="Direct answer")
+
+        with patch.object(cache, "get", return_value=None), patch.object(
+            cache, "set"
+        ) as mock_set:
+            response = client.post(
+                "/api/query", json={**query_request, "use_search": False}
+            )
+
+    response_data = response.json()
+    assert response_data["direct_answer"] == "Direct answer"
+    assert response_data["multi_agent_answer"] is None
+    assert "agent_timeout" in response_data["degraded_reasons"]
+    mock_set.assert_not_called()
+
+
+def test_query_rejects_invalid_deadline():
+    """Test that the budget must be positive"""
+    response = client.post("/api/query", json={"query": "Q", "deadline_ms": 0})
+
+    assert response.status_code == 422
@@ -0,0 +1,26 @@
+# tests/benchmarks/test_compare.py
+from benchmarks.compare import compare
+
+
+def results(**medians):
+    return {"benchmarks": {name: {"median": m} for name, m in medians.items()}}
+
+
+def test_compare_flags_regressions():
+    """Test that slowdowns past the threshold are regressions"""
+    rows = compare(
+        results(load=1.0, split=1.0, search=1.0, old=1.0),
+        results(load=1.2, split=0.5, search=1.05, new=1.0),
+        threshold=0.10,
+    )
+
+    statuses = {row["name"]: row["status"] for row in rows}
+    assert statuses == {
+        "load": "regression",
+        "split": "improvement",
+        "search": "ok",
+        "old": "missing",
+        "new": "new",
+    }
+    load = next(row for row in rows if row["name"] == "load")
+    assert round(load["change"], 2) == 0.2
@@ -0,0 +1,40 @@
+# tests/benchmarks/test_run.py
+from benchmarks.harness import measure
+from benchmarks.run import BenchmarkContext, run_benchmarks
+
+
+def test_measure():
+    """Test that measure reports durations and throughput"""
+    calls = []
+
+    result = measure(lambda: calls.append(1), rounds=3, warmup=2, items=10)
+
+    assert len(calls) == 5
+    assert result["rounds"] == 3
+    assert result["min"] <= result["median"]
+    assert result["unit"] == "items/s"
+    assert result["throughput"] > 0
+
+
+def test_run_benchmarks(tmp_path):
+    """Test that every benchmark runs on a small synthetic code"""
+    context = BenchmarkContext(
+        str(tmp_path), articles=50, depth=2, fanout=2, rounds=1, embedding_sample=8
+    )
+
+    report = run_benchmarks(context)
+
+    assert len(context.documents) == 50
+    assert set(report["benchmarks"]) == {
+        "loader.extract_articles_from_node",
+        "loader.load",
+        "loader.load_store",
+        "loader.stream",
+        "store.get_article",
+        "vectorstore.split_documents",
+        "embeddings.embed_documents",
+        "vectorstore.faiss_build",
+        "vectorstore.load_vectorstore",
+        "vectorstore.similarity_search_k4",
+    }
+    assert report["config"]["articles"] == 50
@@ -108,7 +108,7 @@ async def test_load_all_law_codes(mock_folder_name, sample_law_code_data):
     with patch("builtins.open", side_effect=side_effect), patch(
         "os.path.exists", return_value=True
     ):
-        result = await LegalDataLoader.load_all(law_codes)
+        result = await LegalDataLoader.load_all(law_codes, workers=1)
 
     # Check results
     assert len(result) == 2
@@ -193,3 +193,64 @@ def test_extract_articles_from_node():
     assert documents[0].metadata["num"] == "1"
     assert documents[1].metadata["num"] == "2"
     assert documents[2].metadata["num"] == "3"
+
+
+@pytest.mark.asyncio
+async def test_load_from_article_store(tmp_path, sample_law_code_data):
+    """Test that the article store is read instead of the JSON file once built"""
+    path = tmp_path / "code_civil.json"
+    path.write_text(json.dumps(sample_law_code_data), encoding="utf-8")
+    loader = LegalDataLoader("code_civil")
+    loader.file_path = str(path)
+
+    assert loader.open_store() is None
+    expected = await loader.load()
+    loader.build_store().close()
+
+    with patch.object(loader, "parse") as parse:
+        documents = await loader.load()
+    parse.assert_not_called()
+    assert documents == expected
+    assert [doc.page_content for doc in loader.get_article("3")] == [
+        "Article 3 content"
+    ]
+
+    # Editing the JSON file makes the store outdated
+    sample_law_code_data["content"][0]["articles"].pop()
+    path.write_text(json.dumps(sample_law_code_data), encoding="utf-8")
+    assert loader.open_store() is None
+    assert len(await loader.load()) == 2
+
+
+def test_get_article_reuses_empty_store(tmp_path):
+    """Test that a store without articles is not rebuilt on every lookup"""
+    path = tmp_path / "code_vide.json"
+    path.write_text(json.dumps({"content": []}), encoding="utf-8")
+    loader = LegalDataLoader("code_vide")
+    loader.file_path = str(path)
+    loader.build_store().close()
+
+    with patch.object(loader, "build_store") as build_store:
+        assert loader.get_article("1") == []
+    build_store.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_load_all_in_worker_processes(tmp_path):
+    """Test that law codes are loaded by a process pool as they complete"""
+    from data.synthetic import generate_code, write_code
+
+    for i, law_code in enumerate(["code_a", "code_b", "code_c"]):
+        write_code(
+            generate_code(20 * (i + 1), seed=i), str(tmp_path / f"{law_code}.json")
+        )
+
+    with patch("data.loader.FOLDER_NAME", str(tmp_path)):
+        loaded = [
+            (law_code, len(documents))
+            async for law_code, documents in LegalDataLoader.iter_load_all(
+                ["code_a", "code_b", "code_c", "missing"], workers=2
+            )
+        ]
+
+    assert sorted(loaded) == [("code_a", 20), ("code_b", 40), ("code_c", 60)]
@@ -0,0 +1,103 @@
+# tests/data/test_store.py
+import json
+import os
+import pytest
+from langchain.schema import Document
+from data.store import ArticleStore
+
+
+def article(num, path, content=None, etat="VIGUEUR"):
+    return Document(
+        page_content=content or f"Article {num} content",
+        metadata={"pathTitle": path, "num": num, "etat": etat},
+    )
+
+
+@pytest.fixture
+def documents():
+    return [
+        article("1", "TITRE I"),
+        article("2", "TITRE I > CHAPITRE I", "Contenu accentué é"),
+        article("3", "TITRE I > CHAPITRE I"),
+        article("4", "TITRE I > CHAPITRE II"),
+        article("2", "TITRE II", etat="ABROGE"),
+    ]
+
+
+def test_build_and_read(tmp_path, documents):
+    """Test that the store returns the documents it was built from"""
+    with ArticleStore.build(documents, str(tmp_path / "store" / "code")) as store:
+        assert len(store) == 5
+        assert list(store.documents()) == documents
+        assert store.document(1).page_content == "Contenu accentué é"
+        with pytest.raises(IndexError):
+            store.document(5)
+
+
+def test_get_by_num(tmp_path, documents):
+    """Test fetching every version of an article by number"""
+    with ArticleStore.build(documents, str(tmp_path / "code")) as store:
+        assert [doc.metadata["etat"] for doc in store.get("2")] == [
+            "VIGUEUR",
+            "ABROGE",
+        ]
+        assert store.get("99") == []
+
+
+def test_section_includes_subsections(tmp_path, documents):
+    """Test that a section returns the articles of its whole subtree"""
+    with ArticleStore.build(documents, str(tmp_path / "code")) as store:
+        assert [d.metadata["num"] for d in store.section("TITRE I")] == [
+            "1",
+            "2",
+            "3",
+            "4",
+        ]
+        assert [d.metadata["num"] for d in store.section("TITRE I > CHAPITRE I")] == [
+            "2",
+            "3",
+        ]
+        assert list(store.section("TITRE III")) == []
+
+
+def test_empty_store(tmp_path):
+    with ArticleStore.build([], str(tmp_path / "code")) as store:
+        assert len(store) == 0
+        assert list(store.documents()) == []
+
+
+def test_open_if_fresh(tmp_path, documents):
+    """Test that stores are only opened while they match their source file"""
+    source = tmp_path / "code.json"
+    source.write_text("{}")
+    prefix = str(tmp_path / "code")
+
+    assert ArticleStore.open_if_fresh(prefix, str(source)) is None
+
+    ArticleStore.build(documents, prefix, str(source)).close()
+    store = ArticleStore.open_if_fresh(prefix, str(source))
+    assert store is not None
+    store.close()
+
+    source.write_text('{"content": []}')
+    assert ArticleStore.open_if_fresh(prefix, str(source)) is None
+
+    # Stores deployed without their source file are still used
+    os.remove(source)
+    store = ArticleStore.open_if_fresh(prefix, str(source))
+    assert store is not None
+    store.close()
+
+
+def test_other_version_is_rejected(tmp_path, documents):
+    prefix = str(tmp_path / "code")
+    ArticleStore.build(documents, prefix).close()
+
+    index_path = f"{prefix}.index.json"
+    with open(index_path) as f:
+        index = json.load(f)
+    index["version"] = 0
+    with open(index_path, "w") as f:
+        json.dump(index, f)
+
+    assert ArticleStore.open_if_fresh(prefix) is None
@@ -0,0 +1,112 @@
+# tests/data/test_streaming.py
+import io
+import json
+import pytest
+from data.loader import LegalDataLoader
+from data.synthetic import generate_code, write_code
+
+ijson = pytest.importorskip("ijson")
+
+from data.streaming import iter_articles_from_events, stream_articles
+
+
+def stream(data):
+    return list(stream_articles(io.BytesIO(json.dumps(data).encode("utf-8"))))
+
+
+def test_stream_matches_parse(tmp_path):
+    """Test that streaming a file gives the documents of a full parse"""
+    path = tmp_path / "code.json"
+    write_code(generate_code(300, depth=4, fanout=3, seed=5), str(path))
+    loader = LegalDataLoader("code")
+    loader.file_path = str(path)
+
+    assert list(loader.stream()) == loader.parse()
+
+
+def test_stream_skips_empty_articles_and_other_fields():
+    data = {
+        "title": "Code",
+        "content": [
+            {
+                "section_data": {"title": "TITRE I", "cid": "X"},
+                "articles": [
+                    {"num": "1", "content": "", "etat": "VIGUEUR"},
+                    {
+                        "num": "2",
+                        "content": "Contenu",
+                        "etat": "VIGUEUR",
+                        "history": [{"num": "old", "content": "Ancien"}],
+                    },
+                ],
+                "subsections": [],
+            }
+        ],
+    }
+
+    documents = stream(data)
+
+    assert len(documents) == 1
+    assert documents[0].page_content == "Contenu"
+    assert documents[0].metadata == {
+        "pathTitle": "TITRE I",
+        "num": "2",
+        "etat": "VIGUEUR",
+    }
+
+
+def test_stream_holds_articles_until_title_is_known():
+    """Test sections whose title comes after their articles"""
+    data = {
+        "content": [
+            {
+                "articles": [{"num": "1", "content": "A1"}],
+                "subsections": [
+                    {
+                        "articles": [{"num": "2", "content": "A2"}],
+                        "section_data": {"title": "CHAPITRE I"},
+                    },
+                    {"articles": [{"num": "3", "content": "A3"}]},
+                ],
+                "section_data": {"title": "TITRE I"},
+            }
+        ]
+    }
+
+    paths = {doc.metadata["num"]: doc.metadata["pathTitle"] for doc in stream(data)}
+
+    assert paths == {
+        "1": "TITRE I",
+        "2": "TITRE I > CHAPITRE I",
+        "3": "TITRE I",
+    }
+
+
+def test_stream_is_incremental():
+    """Test that articles are produced before the end of the file"""
+    consumed = []
+
+    def events():
+        for event in ijson.parse(io.BytesIO(json.dumps(generate_code(50)).encode())):
+            consumed.append(event)
+            yield event
+
+    first = next(iter_articles_from_events(events()))
+    assert first.metadata["num"]
+    assert len(consumed) < 100
+
+
+def test_deep_tree_does_not_recurse(tmp_path):
+    """Test that codes deeper than the recursion limit can be extracted"""
+    node = {"section_data": {"title": "S"}, "articles": [], "subsections": []}
+    root = node
+    for _ in range(2000):
+        child = {"section_data": {"title": "S"}, "articles": [], "subsections": []}
+        node["subsections"].append(child)
+        node = child
+    node["articles"].append({"num": "1", "content": "Feuille", "etat": "VIGUEUR"})
+
+    documents = LegalDataLoader("deep").extract_articles_from_node(root)
+
+    assert len(documents) == 1
+    assert documents[0].metadata["pathTitle"].count(" > ") == 2000
@@ -0,0 +1,65 @@
+# tests/data/test_synthetic.py
+import json
+import pytest
+from data.loader import LegalDataLoader
+from data.synthetic import SyntheticCodeGenerator, generate_code, write_code
+
+
+def iter_sections(nodes, level=0):
+    for node in nodes:
+        yield level, node
+        yield from iter_sections(node["subsections"], level + 1)
+
+
+def test_generate_code_shape():
+    """Test that the code has the requested articles and depth"""
+    data = generate_code(500, depth=3, fanout=4, seed=1)
+
+    sections = list(iter_sections(data["content"]))
+    articles = [a for _, node in sections for a in node["articles"]]
+
+    assert len(articles) == 500
+    assert max(level for level, _ in sections) == 2
+    assert all(len(node["subsections"]) <= 4 for _, node in sections)
+    # Articles are only in the deepest sections
+    assert all(level == 2 for level, node in sections if node["articles"])
+    assert all(set(a) == {"num", "etat", "content"} for a in articles)
+    assert len({a["num"] for a in articles}) == 500
+
+
+def test_generate_code_is_reproducible():
+    """Test that a seed reproduces the same code"""
+    assert generate_code(100, seed=3) == generate_code(100, seed=3)
+    assert generate_code(100, seed=3) != generate_code(100, seed=4)
+
+
+def test_article_lengths():
+    """Test the article length distribution options"""
+    fixed = SyntheticCodeGenerator(mean_words=50, length_sigma=0)
+    assert {fixed.article_length() for _ in range(20)} == {50}
+
+    spread = SyntheticCodeGenerator(mean_words=100, length_sigma=1.0, max_words=300)
+    lengths = [spread.article_length() for _ in range(2000)]
+    assert max(lengths) <= 300
+    assert 70 < sum(lengths) / len(lengths) < 110
+
+
+def test_invalid_shape():
+    """Test that impossible shapes are rejected"""
+    with pytest.raises(ValueError):
+        SyntheticCodeGenerator(depth=0)
+
+
+@pytest.mark.asyncio
+async def test_loader_reads_generated_code(tmp_path):
+    """Test that LegalDataLoader extracts every generated article"""
+    path = tmp_path / "code_synthetique.json"
+    write_code(generate_code(200, depth=4, fanout=3, seed=2), str(path))
+
+    loader = LegalDataLoader("code_synthetique")
+    loader.file_path = str(path)
+    documents = await loader.load()
+
+    assert len(documents) == 200
+    assert documents[0].metadata["pathTitle"].count(" > ") == 3
+    assert json.loads(path.read_text(encoding="utf-8"))["content"]
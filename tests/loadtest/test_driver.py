@@ -0,0 +1,74 @@
+# tests/loadtest/test_driver.py
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI
+from loadtest.driver import percentile, run_load, summarize
+from loadtest.questions import POPULAR_QUESTIONS, QuestionMix
+
+
+def test_percentile():
+    """Test nearest-rank percentiles"""
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+    assert percentile([], 50) == 0.0
+
+
+def test_summarize():
+    """Test error and cache hit rates of a summary"""
+    results = [
+        {"status": 200, "latency": 0.1, "cached": True, "degraded": False},
+        {"status": 200, "latency": 0.3, "cached": False, "degraded": False},
+        {"status": 503, "latency": 0.01, "cached": False, "degraded": False},
+        {"status": "ReadTimeout", "latency": 5.0, "cached": False, "degraded": False},
+    ]
+
+    summary = summarize(results, duration=2.0)
+
+    assert summary["requests"] == 4
+    assert summary["throughput_rps"] == 1.0
+    assert summary["error_rate"] == 0.5
+    assert summary["cache_hit_rate"] == 0.5
+    assert summary["latency_ms"]["p50"] == 100.0
+    assert summary["status_codes"] == {"200": 2, "503": 1, "ReadTimeout": 1}
+
+
+def test_question_mix_is_reproducible():
+    """Test that a seed reproduces the questions and unique ones do not repeat"""
+    mix, replay = QuestionMix(0.5, seed=7), QuestionMix(0.5, seed=7)
+    questions = [mix.next() for _ in range(200)]
+
+    assert questions == [replay.next() for _ in range(200)]
+    unique = [q for q in questions if q not in POPULAR_QUESTIONS]
+    assert 0 < len(unique) < 200
+    assert len(set(unique)) == len(unique)
+
+
+@pytest.mark.asyncio
+async def test_run_load():
+    """Test that queries are sent at the target rate and summarized"""
+    app = FastAPI()
+    received = []
+
+    @app.post("/api/query")
+    async def query(body: dict):
+        received.append(body)
+        await asyncio.sleep(0.01)
+        return {"query": body["query"], "cached": len(received) % 2 == 0}
+
+    summary = await run_load(
+        "http://test",
+        qps=50,
+        duration=0.2,
+        questions=QuestionMix(seed=3),
+        law_codes=["civil"],
+        transport=httpx.ASGITransport(app=app),
+    )
+
+    assert summary["requests"] == len(received) == 10
+    assert summary["error_rate"] == 0.0
+    assert summary["cache_hit_rate"] == 0.5
+    assert received[0]["use_rag"] is True
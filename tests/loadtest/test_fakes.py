@@ -0,0 +1,75 @@
+# tests/loadtest/test_fakes.py
+import httpx
+import pytest
+from groq import AsyncGroq, RateLimitError
+from loadtest.fake_groq import create_fake_groq_app
+from loadtest.fake_serpapi import create_fake_serpapi_app
+
+
+def groq_client(app) -> AsyncGroq:
+    """Return a Groq SDK client calling the fake API in-process."""
+    return AsyncGroq(
+        api_key="test",
+        base_url="http://fake-groq",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=app)),
+    )
+
+
+@pytest.mark.asyncio
+async def test_fake_groq_completion():
+    """Test that the Groq SDK parses the fake completions and usage"""
+    app = create_fake_groq_app(latency=0, tokens_per_second=1e6, completion_tokens=10)
+
+    completion = await groq_client(app).chat.completions.create(
+        messages=[{"role": "user", "content": "Question de droit"}],
+        model="test-model",
+    )
+
+    assert len(completion.choices[0].message.content.split()) == 10
+    assert completion.usage.completion_tokens == 10
+    assert completion.usage.total_tokens > 10
+
+
+@pytest.mark.asyncio
+async def test_fake_groq_stream():
+    """Test that the fake API streams one chunk per token"""
+    app = create_fake_groq_app(latency=0, tokens_per_second=1e6, completion_tokens=5)
+
+    stream = await groq_client(app).chat.completions.create(
+        messages=[{"role": "user", "content": "Question"}],
+        model="test-model",
+        stream=True,
+    )
+    tokens = [chunk.choices[0].delta.content async for chunk in stream]
+
+    assert len(tokens) == 5
+
+
+@pytest.mark.asyncio
+async def test_fake_groq_rate_limit():
+    """Test that requests over the limit get a 429 with retry-after"""
+    app = create_fake_groq_app(latency=0, tokens_per_second=1e6, requests_per_minute=1)
+    client = groq_client(app)
+    messages = [{"role": "user", "content": "Question"}]
+
+    await client.chat.completions.create(messages=messages, model="test-model")
+    with pytest.raises(RateLimitError) as error:
+        await client.chat.completions.create(messages=messages, model="test-model")
+
+    assert int(error.value.response.headers["retry-after"]) > 0
+
+
+@pytest.mark.asyncio
+async def test_fake_serpapi_search():
+    """Test that the fake search returns organic results for the query"""
+    app = create_fake_serpapi_app(latency=0, results=3)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://fake-serpapi"
+    ) as client:
+        response = await client.get("/search", params={"q": "bail commercial"})
+
+    results = response.json()["organic_results"]
+    assert len(results) == 3
+    assert "bail commercial" in results[0]["snippet"]
@@ -1,9 +1,14 @@
 # tests/test_embeddings.py
+import threading
 import pytest
 from unittest.mock import patch, MagicMock
 
 import torch
-from models.embeddings import get_embedding_model
+from models.embeddings import (
+    EmbeddingEngine,
+    create_embedding_model,
+    get_embedding_model,
+)
 
 
 @pytest.fixture
@@ -18,42 +23,102 @@ def mock_huggingface_embeddings():
 @pytest.fixture
 def mock_config():
     """Mock config values"""
-    with patch("models.embeddings.EMBEDDING_MODEL", "test-embedding-model"):
+    with patch("models.embeddings.EMBEDDING_MODEL", "test-embedding-model"), patch(
+        "models.embeddings.EMBEDDING_BATCH_SIZE", 16
+    ), patch("models.embeddings.EMBEDDING_NORMALIZE", True), patch(
+        "models.embeddings.EMBEDDING_NUM_THREADS", 0
+    ):
         yield
 
 
-def test_get_embedding_model_cuda_available(mock_huggingface_embeddings, mock_config):
-    """Test get_embedding_model when CUDA is available"""
+@pytest.fixture(autouse=True)
+def reset_embedding_engine():
+    """Reset the process-wide embedding engine between tests"""
+    with patch("models.embeddings._embedding_engine", None):
+        yield
+
+
+def test_create_embedding_model_cuda_available(
+    mock_huggingface_embeddings, mock_config
+):
+    """Test create_embedding_model when CUDA is available"""
     # Mock torch.cuda.is_available to return True
     with patch("torch.cuda.is_available", return_value=True):
-        embedding_model = get_embedding_model()
+        embedding_model = create_embedding_model()
 
         # Check that HuggingFaceEmbeddings was called with the right arguments
         mock_huggingface_embeddings.assert_called_once_with(
-            model_name="test-embedding-model", model_kwargs={"device": "cuda"}
+            model_name="test-embedding-model",
+            model_kwargs={"device": "cuda"},
+            encode_kwargs={"batch_size": 16, "normalize_embeddings": True},
         )
 
 
-def test_get_embedding_model_cuda_not_available(
+def test_create_embedding_model_cuda_not_available(
     mock_huggingface_embeddings, mock_config
 ):
-    """Test get_embedding_model when CUDA is not available"""
+    """Test create_embedding_model when CUDA is not available"""
     # Mock torch.cuda.is_available to return False
     with patch("torch.cuda.is_available", return_value=False):
-        embedding_model = get_embedding_model()
+        embedding_model = create_embedding_model()
 
         # Check that HuggingFaceEmbeddings was called with the right arguments
         mock_huggingface_embeddings.assert_called_once_with(
-            model_name="test-embedding-model", model_kwargs={"device": "cpu"}
+            model_name="test-embedding-model",
+            model_kwargs={"device": "cpu"},
+            encode_kwargs={"batch_size": 16, "normalize_embeddings": True},
         )
 
 
+def test_create_embedding_model_sets_num_threads(
+    mock_huggingface_embeddings, mock_config
+):
+    """Test that the torch thread count is applied when configured"""
+    with patch("models.embeddings.EMBEDDING_NUM_THREADS", 2), patch(
+        "models.embeddings.torch.set_num_threads"
+    ) as mock_set_num_threads:
+        create_embedding_model()
+
+    mock_set_num_threads.assert_called_once_with(2)
+
+
 def test_embedding_model_return_value(mock_huggingface_embeddings, mock_config):
-    """Test that get_embedding_model returns the expected embedding model"""
+    """Test that get_embedding_model wraps the expected embedding model"""
     mock_model = MagicMock()
     mock_huggingface_embeddings.return_value = mock_model
 
     result = get_embedding_model()
 
-    assert result == mock_model
+    assert isinstance(result, EmbeddingEngine)
+    assert result.model == mock_model
     mock_huggingface_embeddings.assert_called_once()
+
+
+def test_get_embedding_model_is_shared(mock_huggingface_embeddings, mock_config):
+    """Test that concurrent callers share a single embedding model"""
+    results = []
+
+    def worker():
+        results.append(get_embedding_model())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(result is results[0] for result in results)
+    mock_huggingface_embeddings.assert_called_once()
+
+
+def test_embedding_engine_delegates():
+    """Test that EmbeddingEngine forwards calls to the wrapped model"""
+    mock_model = MagicMock()
+    mock_model.embed_documents.return_value = [[0.1, 0.2]]
+    mock_model.embed_query.return_value = [0.3, 0.4]
+    engine = EmbeddingEngine(mock_model)
+
+    assert engine.embed_documents(["text"]) == [[0.1, 0.2]]
+    assert engine.embed_query("query") == [0.3, 0.4]
+    mock_model.embed_documents.assert_called_once_with(["text"])
+    mock_model.embed_query.assert_called_once_with("query")
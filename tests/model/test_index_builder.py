@@ -0,0 +1,164 @@
+# tests/model/test_index_builder.py
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+from data.synthetic import generate_code, write_code
+from models.index_builder import IndexBuilder, IndexCheckpoint, read_chunks
+
+
+@pytest.fixture
+def law_codes(tmp_path):
+    """Two synthetic law codes in a temporary legifrance folder"""
+    data_dir = tmp_path / "legifrance"
+    data_dir.mkdir()
+    for i, law_code in enumerate(["code_a", "code_b"]):
+        write_code(generate_code(30, seed=i), str(data_dir / f"{law_code}.json"))
+
+    with patch("data.loader.FOLDER_NAME", str(data_dir)):
+        yield ["code_a", "code_b"]
+
+
+@pytest.fixture
+def embeddings():
+    return MagicMock(wraps=DeterministicFakeEmbedding(size=8))
+
+
+def make_builder(tmp_path, embeddings, **kwargs):
+    builder = IndexBuilder(
+        embedding_model=embeddings,
+        checkpoint_dir=str(tmp_path / "checkpoints"),
+        progress=MagicMock(),
+        **kwargs,
+    )
+    builder.index_path = lambda law_code: str(tmp_path / "indices" / law_code)
+    return builder
+
+
+def test_build(tmp_path, law_codes, embeddings):
+    """Test that every law code is indexed and progress is reported"""
+    builder = make_builder(tmp_path, embeddings, workers=1, batch_size=8)
+
+    results = builder.build(law_codes + ["missing"])
+
+    assert set(results) == {"code_a", "code_b"}
+    for law_code, stats in results.items():
+        vectorstore = FAISS.load_local(
+            builder.index_path(law_code),
+            embeddings,
+            allow_dangerous_deserialization=True,
+        )
+        assert vectorstore.index.ntotal == stats["chunks"] >= 30
+        assert stats["resumed_chunks"] == 0
+
+    # Progress is reported after every batch, ending with all chunks
+    law_code, done, total, _ = builder.progress.call_args.args
+    assert done == total == results[law_code]["chunks"]
+    # Checkpoints are removed once the index is saved
+    assert os.listdir(tmp_path / "checkpoints") == []
+
+
+def test_resume_after_interruption(tmp_path, law_codes, embeddings):
+    """Test that a build resumes from the batches embedded before a failure"""
+    calls = []
+
+    def flaky(texts):
+        calls.append(len(texts))
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return DeterministicFakeEmbedding(size=8).embed_documents(texts)
+
+    embeddings.embed_documents.side_effect = flaky
+    builder = make_builder(tmp_path, embeddings, workers=1, batch_size=8)
+    with pytest.raises(KeyboardInterrupt):
+        builder.build(["code_a"])
+
+    embeddings.embed_documents.side_effect = None
+    embeddings.embed_documents.reset_mock()
+    results = make_builder(tmp_path, embeddings, workers=1, batch_size=8).build(
+        ["code_a"]
+    )
+
+    assert results["code_a"]["resumed_chunks"] == 16
+    embedded = sum(len(c.args[0]) for c in embeddings.embed_documents.call_args_list)
+    assert embedded == results["code_a"]["chunks"] - 16
+
+
+def test_resume_skips_finished_law_codes(tmp_path, law_codes, embeddings):
+    """Test that codes indexed before an interruption are not embedded again"""
+    builder = make_builder(tmp_path, embeddings, workers=1, batch_size=8)
+
+    def interrupt_code_b(law_code, done, total, seconds):
+        if law_code == "code_b":
+            raise KeyboardInterrupt
+
+    builder.progress.side_effect = interrupt_code_b
+    with pytest.raises(KeyboardInterrupt):
+        builder.build(law_codes)
+
+    embeddings.embed_documents.reset_mock()
+    results = make_builder(tmp_path, embeddings, workers=1, batch_size=8).build(
+        law_codes
+    )
+
+    assert results["code_a"]["resumed_chunks"] == results["code_a"]["chunks"]
+    assert results["code_b"]["resumed_chunks"] == 8
+    embedded = sum(len(c.args[0]) for c in embeddings.embed_documents.call_args_list)
+    assert embedded == results["code_b"]["chunks"] - 8
+
+
+def test_checkpoint_discarded_when_chunks_change(tmp_path):
+    directory = str(tmp_path / "code")
+    checkpoint = IndexCheckpoint(directory, "a", chunks=1, batch_size=1)
+    checkpoint.save(0, [[1.0, 2.0]])
+
+    assert IndexCheckpoint(directory, "a", 1, 1).load(0) is not None
+    assert IndexCheckpoint(directory, "b", 1, 1).load(0) is None
+
+
+def test_split_in_worker_processes(tmp_path, law_codes, embeddings):
+    """Test that law codes are split to chunks files by a process pool"""
+    builder = make_builder(tmp_path, embeddings, workers=2)
+
+    split = dict(builder.split_all(law_codes))
+
+    assert set(split) == {"code_a", "code_b"}
+    chunks = list(read_chunks(split["code_a"]["path"]))
+    assert len(chunks) == split["code_a"]["chunks"] >= 30
+    text, metadata, chunk_id = chunks[0]
+    assert text and {"pathTitle", "num", "etat"} <= set(metadata)
+    assert chunk_id.endswith(":0")
+
+
+def test_split_streams_law_codes(tmp_path, law_codes, embeddings):
+    """Test that law codes are streamed and embedded in bounded batches"""
+    from data.loader import LegalDataLoader
+
+    builder = make_builder(tmp_path, embeddings, workers=1, batch_size=8)
+    with patch.object(LegalDataLoader, "parse", side_effect=AssertionError):
+        results = builder.build(["code_a"])
+
+    batches = [len(c.args[0]) for c in embeddings.embed_documents.call_args_list]
+    assert sum(batches) == results["code_a"]["chunks"]
+    assert max(batches) == 8
+    # Chunks files are removed once embedded
+    assert os.listdir(tmp_path / "checkpoints") == []
+
+
+def test_built_index_is_updated_incrementally(tmp_path, law_codes, embeddings):
+    """Test that indices built by the builder can be updated incrementally"""
+    from data.loader import LegalDataLoader
+    from models.vectorstore import VectorstoreManager
+
+    builder = make_builder(tmp_path, embeddings, workers=1)
+    builder.build(["code_a"])
+
+    manager = VectorstoreManager("code_a", embedding_model=embeddings)
+    manager.index_path = builder.index_path("code_a")
+    embeddings.embed_documents.reset_mock()
+
+    stats = manager.update_vectorstore(LegalDataLoader("code_a").stream())
+
+    assert stats["added_articles"] == stats["removed_articles"] == 0
+    embeddings.embed_documents.assert_not_called()
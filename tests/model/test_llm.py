@@ -1,6 +1,7 @@
 # tests/test_llm.py
+import weakref
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 from models.llm import GroqLLM
 
@@ -26,6 +27,30 @@ def mock_groq():
         yield mock_groq_class
 
 
+@pytest.fixture
+def mock_async_groq():
+    """Mock AsyncGroq client"""
+    with patch("models.llm.AsyncGroq") as mock_async_groq_class:
+        mock_client = MagicMock()
+        mock_async_groq_class.return_value = mock_client
+
+        mock_completion = MagicMock()
+        mock_completion.choices = [MagicMock()]
+        mock_completion.choices[0].message.content = "This is an async test response"
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_completion)
+
+        yield mock_async_groq_class
+
+
+@pytest.fixture(autouse=True)
+def reset_clients():
+    """Reset the shared Groq clients between tests"""
+    with patch("models.llm._clients", {}), patch(
+        "models.llm._async_clients", weakref.WeakKeyDictionary()
+    ):
+        yield
+
+
 @pytest.fixture
 def mock_config():
     """Mock config values"""
@@ -37,6 +62,23 @@ def mock_config():
         yield
 
 
+def test_groq_llm_reports_token_usage(mock_groq, mock_config):
+    """Test that generations report the token usage of the completions"""
+    completion = mock_groq.return_value.chat.completions.create.return_value
+    completion.usage = MagicMock(
+        prompt_tokens=12, completion_tokens=30, total_tokens=42
+    )
+
+    result = GroqLLM().generate(["First prompt", "Second prompt"])
+
+    assert [g[0].text for g in result.generations] == ["This is a test response"] * 2
+    assert result.llm_output["token_usage"] == {
+        "prompt_tokens": 24,
+        "completion_tokens": 60,
+        "total_tokens": 84,
+    }
+
+
 def test_groq_llm_initialization_with_params(mock_config):
     """Test that GroqLLM can be initialized with custom values"""
     llm = GroqLLM(
@@ -55,7 +97,9 @@ def test_groq_llm_call(mock_groq, mock_config):
     result = llm._call("Test prompt")
 
     # Check that Groq client was initialized correctly
-    mock_groq.assert_called_once_with(api_key="test-api-key")
+    mock_groq.assert_called_once()
+    assert mock_groq.call_args.kwargs["api_key"] == "test-api-key"
+    assert mock_groq.call_args.kwargs["http_client"] is not None
 
     # Check that chat.completions.create was called with the right arguments
     mock_groq.return_value.chat.completions.create.assert_called_once_with(
@@ -75,7 +119,99 @@ def test_groq_llm_call_with_custom_api_key(mock_groq, mock_config):
     llm._call("Test prompt")
 
     # Check that Groq client was initialized with the instance API key
-    mock_groq.assert_called_once_with(api_key="instance-api-key")
+    mock_groq.assert_called_once()
+    assert mock_groq.call_args.kwargs["api_key"] == "instance-api-key"
+
+
+def test_groq_llm_reuses_pooled_client(mock_groq, mock_config):
+    """Test that calls and instances share one pooled Groq client"""
+    GroqLLM()._call("First prompt")
+    GroqLLM()._call("Second prompt")
+
+    mock_groq.assert_called_once()
+    assert mock_groq.return_value.chat.completions.create.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_groq_llm_acall(mock_async_groq, mock_config):
+    """Test the _acall method of GroqLLM"""
+    llm = GroqLLM(model="test-model", temperature=0.5, max_tokens=1000)
+    result = await llm._acall("Test prompt")
+    await llm._acall("Second prompt")
+
+    assert result == "This is an async test response"
+    mock_async_groq.assert_called_once()
+    assert mock_async_groq.call_args.kwargs["api_key"] == "test-api-key"
+    mock_async_groq.return_value.chat.completions.create.assert_any_call(
+        messages=[{"role": "user", "content": "Test prompt"}],
+        model="test-model",
+        temperature=0.5,
+        max_tokens=1000,
+    )
+
+
+def make_stream_chunk(content):
+    """Build a mock streamed completion chunk"""
+    chunk = MagicMock()
+    chunk.choices = [MagicMock()]
+    chunk.choices[0].delta.content = content
+    return chunk
+
+
+def test_groq_llm_stream(mock_groq, mock_config):
+    """Test that _stream yields tokens and notifies the run manager"""
+    mock_groq.return_value.chat.completions.create.return_value = iter(
+        [make_stream_chunk("Bon"), make_stream_chunk(None), make_stream_chunk("jour")]
+    )
+    run_manager = MagicMock()
+
+    llm = GroqLLM(model="test-model", temperature=0.5, max_tokens=1000)
+    chunks = list(llm._stream("Test prompt", run_manager=run_manager))
+
+    assert [chunk.text for chunk in chunks] == ["Bon", "jour"]
+    assert run_manager.on_llm_new_token.call_count == 2
+    mock_groq.return_value.chat.completions.create.assert_called_once_with(
+        messages=[{"role": "user", "content": "Test prompt"}],
+        model="test-model",
+        temperature=0.5,
+        max_tokens=1000,
+        stream=True,
+    )
+
+
+def test_groq_llm_call_streaming(mock_groq, mock_config):
+    """Test that _call joins the streamed tokens when streaming is enabled"""
+    mock_groq.return_value.chat.completions.create.return_value = iter(
+        [make_stream_chunk("Bon"), make_stream_chunk("jour")]
+    )
+
+    llm = GroqLLM(streaming=True)
+    result = llm._call("Test prompt")
+
+    assert result == "Bonjour"
+
+
+@pytest.mark.asyncio
+async def test_groq_llm_astream(mock_async_groq, mock_config):
+    """Test that _astream yields tokens and notifies the run manager"""
+
+    async def stream():
+        for content in ["Bon", None, "jour"]:
+            yield make_stream_chunk(content)
+
+    mock_async_groq.return_value.chat.completions.create = AsyncMock(
+        return_value=stream()
+    )
+    run_manager = MagicMock()
+    run_manager.on_llm_new_token = AsyncMock()
+
+    llm = GroqLLM()
+    chunks = [
+        chunk async for chunk in llm._astream("Test prompt", run_manager=run_manager)
+    ]
+
+    assert [chunk.text for chunk in chunks] == ["Bon", "jour"]
+    assert run_manager.on_llm_new_token.await_count == 2
 
 
 def test_groq_llm_type():
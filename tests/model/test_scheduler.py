@@ -0,0 +1,182 @@
+# tests/model/test_scheduler.py
+import pytest
+import httpx
+from unittest.mock import AsyncMock, MagicMock, patch
+from groq import BadRequestError, RateLimitError
+
+from models.scheduler import (
+    GroqRequestScheduler,
+    TokenBucket,
+    estimate_tokens,
+    get_retry_after,
+)
+
+
+def make_error(error_class, status_code, headers=None):
+    """Build a Groq API error with the given response headers"""
+    request = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+    response = httpx.Response(status_code, headers=headers or {}, request=request)
+    return error_class("error", response=response, body=None)
+
+
+def make_completion(total_tokens):
+    completion = MagicMock()
+    completion.usage.total_tokens = total_tokens
+    return completion
+
+
+@pytest.fixture
+def mock_sleep():
+    with patch("models.scheduler.time.sleep") as mock:
+        yield mock
+
+
+def test_token_bucket_reserve_and_refund():
+    """Test that reservations past the capacity are delayed"""
+    bucket = TokenBucket(per_minute=60)  # one unit per second
+    now = bucket.updated
+
+    assert bucket.reserve(60, now) == 0.0
+    assert bucket.reserve(2, now) == pytest.approx(2.0)
+
+    bucket.refund(2, now)
+    assert bucket.reserve(1, now) == pytest.approx(1.0)
+
+
+def test_token_bucket_block():
+    """Test that blocking empties the bucket for the given duration"""
+    bucket = TokenBucket(per_minute=60)
+    now = bucket.updated
+
+    bucket.block(5, now)
+    assert bucket.reserve(1, now) == pytest.approx(6.0)
+
+
+def test_reserve_is_fifo_across_budgets():
+    """Test that successive reservations get increasing delays"""
+    scheduler = GroqRequestScheduler(requests_per_minute=2, tokens_per_minute=0)
+
+    delays = [scheduler.reserve(100) for _ in range(4)]
+
+    assert delays[0] == 0.0 and delays[1] == 0.0
+    assert delays[1] < delays[2] < delays[3]
+    assert scheduler.stats()["delayed_requests"] == 2
+
+
+def test_reserve_token_budget():
+    """Test that the token budget delays calls once exhausted"""
+    scheduler = GroqRequestScheduler(requests_per_minute=0, tokens_per_minute=600)
+
+    assert scheduler.reserve(600) == 0.0
+    assert scheduler.reserve(100) == pytest.approx(10.0, rel=0.01)
+
+
+def test_release_reconciles_token_usage():
+    """Test that unused estimated tokens are given back"""
+    scheduler = GroqRequestScheduler(requests_per_minute=0, tokens_per_minute=600)
+
+    scheduler.reserve(600)
+    scheduler.release(600, 100)
+
+    assert scheduler.reserve(500) == 0.0
+
+
+def test_get_retry_after():
+    assert get_retry_after(make_error(RateLimitError, 429, {"retry-after": "3"})) == 3.0
+    assert get_retry_after(make_error(RateLimitError, 429)) is None
+    assert get_retry_after(ValueError("boom")) is None
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("a" * 400, 512) == 612
+
+
+def test_call_retries_rate_limit_with_retry_after(mock_sleep):
+    """Test that a 429 is retried after the retry-after delay"""
+    scheduler = GroqRequestScheduler(requests_per_minute=0, tokens_per_minute=0)
+    func = MagicMock(
+        side_effect=[
+            make_error(RateLimitError, 429, {"retry-after": "2"}),
+            make_completion(50),
+        ]
+    )
+
+    result = scheduler.call(func, tokens=100)
+
+    assert result.usage.total_tokens == 50
+    assert func.call_count == 2
+    waited = mock_sleep.call_args[0][0]
+    assert 2.0 <= waited <= 2.2
+
+    stats = scheduler.stats()
+    assert stats["rate_limited"] == 1
+    assert stats["retries"] == 1
+    assert stats["errors"] == 0
+
+
+def test_call_gives_up_after_max_retries(mock_sleep):
+    """Test that the last retryable error is raised"""
+    scheduler = GroqRequestScheduler(
+        requests_per_minute=0, tokens_per_minute=0, max_retries=2
+    )
+    func = MagicMock(side_effect=make_error(RateLimitError, 429))
+
+    with pytest.raises(RateLimitError):
+        scheduler.call(func, tokens=100)
+
+    assert func.call_count == 3
+    assert scheduler.stats()["errors"] == 1
+
+
+def test_call_does_not_retry_client_errors(mock_sleep):
+    """Test that non retryable errors are raised immediately"""
+    scheduler = GroqRequestScheduler(requests_per_minute=0, tokens_per_minute=0)
+    func = MagicMock(side_effect=make_error(BadRequestError, 400))
+
+    with pytest.raises(BadRequestError):
+        scheduler.call(func, tokens=100)
+
+    func.assert_called_once()
+    mock_sleep.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_acall_retries_rate_limit():
+    """Test that async calls are retried too"""
+    scheduler = GroqRequestScheduler(
+        requests_per_minute=0, tokens_per_minute=0, base_delay=0.01, max_delay=0.01
+    )
+    func = AsyncMock(side_effect=[make_error(RateLimitError, 429), make_completion(50)])
+
+    result = await scheduler.acall(func, tokens=100)
+
+    assert result.usage.total_tokens == 50
+    assert func.await_count == 2
+    assert scheduler.stats()["queue_depth"] == 0
+
+
+def test_call_tracks_streams_until_exhausted(mock_sleep):
+    """Test that a streamed call is timed until its stream ends"""
+    scheduler = GroqRequestScheduler(requests_per_minute=0, tokens_per_minute=0)
+    func = MagicMock(return_value=iter(["Bon", "jour"]))
+
+    with patch("models.scheduler.track_stream") as mock_track_stream:
+        result = scheduler.call(func, tokens=100, stream=True)
+
+    assert result is mock_track_stream.return_value
+    stream, service, _ = mock_track_stream.call_args[0]
+    assert list(stream) == ["Bon", "jour"]
+    assert service == "groq"
+
+
+@pytest.mark.asyncio
+async def test_acall_tracks_streams_until_exhausted():
+    """Test that an async streamed call is timed until its stream ends"""
+    scheduler = GroqRequestScheduler(requests_per_minute=0, tokens_per_minute=0)
+    stream = MagicMock()
+
+    with patch("models.scheduler.atrack_stream") as mock_track_stream:
+        result = await scheduler.acall(AsyncMock(return_value=stream), 100, True)
+
+    assert result is mock_track_stream.return_value
+    assert mock_track_stream.call_args[0][:2] == (stream, "groq")
@@ -226,3 +226,104 @@ def test_get_vectorstore_not_existing_without_documents(
 
         # Check the error message
         assert "Documents must be provided" in str(excinfo.value)
+
+
+def article(num, content, etat="VIGUEUR"):
+    return Document(
+        page_content=content,
+        metadata={"pathTitle": "TITRE I", "num": num, "etat": etat},
+    )
+
+
+@pytest.fixture
+def fake_manager(tmp_path):
+    """Manager indexing into a temporary folder with fake embeddings"""
+    from langchain_community.embeddings import DeterministicFakeEmbedding
+
+    embeddings = MagicMock(wraps=DeterministicFakeEmbedding(size=8))
+    manager = VectorstoreManager("test_code", embedding_model=embeddings)
+    manager.index_path = str(tmp_path / "test_code")
+    return manager
+
+
+def embedded_texts(manager):
+    texts = [
+        text
+        for call in manager.embedding_model.embed_documents.call_args_list
+        for text in call.args[0]
+    ]
+    manager.embedding_model.embed_documents.reset_mock()
+    return texts
+
+
+def test_update_vectorstore_embeds_only_changes(fake_manager):
+    """Test that updates embed new and changed articles and delete removed ones"""
+    stats = fake_manager.update_vectorstore(
+        [article("1", "Premier"), article("2", "Deuxième"), article("3", "Troisième")]
+    )
+    assert stats["added_articles"] == 3
+    assert sorted(embedded_texts(fake_manager)) == ["Deuxième", "Premier", "Troisième"]
+
+    stats = fake_manager.update_vectorstore(
+        [
+            article("1", "Premier"),
+            article("2", "Deuxième modifié"),
+            article("4", "Quatrième"),
+        ]
+    )
+
+    assert stats == {
+        "added_articles": 2,
+        "removed_articles": 2,
+        "unchanged_articles": 1,
+        "embedded_chunks": 2,
+        "deleted_chunks": 2,
+    }
+    assert sorted(embedded_texts(fake_manager)) == ["Deuxième modifié", "Quatrième"]
+
+    vectorstore = fake_manager.load_vectorstore()
+    contents = sorted(doc.page_content for doc in vectorstore.docstore._dict.values())
+    assert contents == ["Deuxième modifié", "Premier", "Quatrième"]
+    assert vectorstore.index.ntotal == 3
+
+    # Nothing is embedded when the law code did not change
+    stats = fake_manager.update_vectorstore(
+        [
+            article("1", "Premier"),
+            article("2", "Deuxième modifié"),
+            article("4", "Quatrième"),
+        ]
+    )
+    assert stats["unchanged_articles"] == 3
+    assert embedded_texts(fake_manager) == []
+
+
+def test_update_vectorstore_hashes_the_article_state(fake_manager):
+    """Test that an article whose state changed is re-indexed"""
+    fake_manager.update_vectorstore([article("1", "Texte")])
+    embedded_texts(fake_manager)
+
+    fake_manager.update_vectorstore([article("1", "Texte", etat="ABROGE")])
+
+    assert embedded_texts(fake_manager) == ["Texte"]
+    vectorstore = fake_manager.load_vectorstore()
+    [doc] = vectorstore.docstore._dict.values()
+    assert doc.metadata["etat"] == "ABROGE"
+
+
+def test_update_vectorstore_rebuilds_without_manifest(fake_manager):
+    """Test that indices built without a manifest are rebuilt once"""
+    from langchain_community.vectorstores import FAISS
+
+    FAISS.from_documents(
+        [article("1", "Ancien")], fake_manager.embedding_model
+    ).save_local(fake_manager.index_path)
+
+    stats = fake_manager.update_vectorstore([article("1", "Nouveau")])
+
+    assert stats["added_articles"] == 1
+    assert stats["deleted_chunks"] == 0
+    vectorstore = fake_manager.load_vectorstore()
+    assert [doc.page_content for doc in vectorstore.docstore._dict.values()] == [
+        "Nouveau"
+    ]
@@ -0,0 +1,110 @@
+# tests/utils/test_admission.py
+import asyncio
+import pytest
+from utils.admission import AdmissionController, AdmissionRejected
+
+
+async def hold(controller, release):
+    async with controller.admit():
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_admits_up_to_the_limit():
+    """Test that requests under the limit are admitted immediately"""
+    controller = AdmissionController(max_concurrent=2, max_queue=0)
+    release = asyncio.Event()
+
+    holders = [asyncio.ensure_future(hold(controller, release)) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert controller.stats()["active"] == 2
+
+    release.set()
+    await asyncio.gather(*holders)
+    assert controller.stats()["active"] == 0
+    assert controller.stats()["admitted"] == 2
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full():
+    """Test that requests past the queue bound fail fast"""
+    controller = AdmissionController(
+        max_concurrent=1, max_queue=1, reject_status=429, retry_after=7
+    )
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(hold(controller, release))
+    waiter = asyncio.ensure_future(hold(controller, release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await controller.acquire()
+
+    assert rejected.value.status_code == 429
+    assert rejected.value.retry_after == 7
+    assert controller.stats()["rejected"] == 1
+
+    release.set()
+    await asyncio.gather(holder, waiter)
+    assert controller.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_waiting_request_gets_released_slot():
+    """Test that a released slot is handed over to the oldest waiter"""
+    controller = AdmissionController(max_concurrent=1, max_queue=5)
+    await controller.acquire()
+
+    waiter = asyncio.ensure_future(controller.acquire())
+    await asyncio.sleep(0)
+    assert controller.stats()["queue_depth"] == 1
+
+    controller.release()
+    await waiter
+
+    assert controller.stats()["active"] == 1
+    assert controller.stats()["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout():
+    """Test that a request waiting too long is rejected"""
+    controller = AdmissionController(max_concurrent=1, max_queue=5, queue_timeout=0.01)
+    await controller.acquire()
+
+    with pytest.raises(AdmissionRejected):
+        await controller.acquire()
+
+    assert controller.stats()["timed_out"] == 1
+    assert controller.stats()["queue_depth"] == 0
+
+    # The slot is not lost
+    controller.release()
+    await controller.acquire()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    """Test that a cancelled waiter does not take a slot"""
+    controller = AdmissionController(max_concurrent=1, max_queue=5)
+    await controller.acquire()
+
+    waiter = asyncio.ensure_future(controller.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    controller.release()
+    assert controller.stats()["active"] == 0
+    assert controller.stats()["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_disabled():
+    """Test that a zero limit admits every request"""
+    controller = AdmissionController(max_concurrent=0)
+
+    for _ in range(100):
+        await controller.acquire()
+
+    assert controller.stats()["active"] == 0
@@ -1,9 +1,11 @@
 # tests/test_utils.py
+import asyncio
 import pytest
 import json
 import hashlib
-from unittest.mock import patch, MagicMock
-from utils.cache import RedisCache
+import redis
+from unittest.mock import patch, MagicMock, AsyncMock
+from utils.cache import RedisCache, AsyncRedisCache, LocalCache, TieredCache
 
 
 class TestRedisCache:
@@ -13,6 +15,7 @@ class TestRedisCache:
     def redis_mock(self):
         """Create a mock for Redis."""
         with patch("utils.cache.redis.Redis") as mock:
+            mock.return_value.hget.return_value = None
             yield mock.return_value
 
     def test_generate_key(self):
@@ -74,16 +77,407 @@ class TestRedisCache:
         redis_mock.delete.assert_called_once()
 
     def test_flush(self, redis_mock):
-        """Test that flush calls Redis with the right parameters."""
+        """Test that flush scans the keys and unlinks them in batches."""
         # Set up mock
-        redis_mock.keys.return_value = ["key1", "key2"]
-        redis_mock.delete.return_value = 2
+        redis_mock.scan_iter.return_value = iter(["key1", "test:meta", "key2", "key3"])
+        redis_mock.unlink.side_effect = lambda *keys: len(keys)
 
         # Create cache and call flush
         cache = RedisCache(prefix="test")
+        cache.flush_batch_size = 2
         result = cache.flush()
 
         # Assertions
+        assert result == 3
+        redis_mock.scan_iter.assert_called_once_with(match="test:*", count=2)
+        redis_mock.unlink.assert_any_call("key1", "key2")
+        redis_mock.unlink.assert_any_call("key3")
+        redis_mock.keys.assert_not_called()
+
+    def test_generation_in_key(self, redis_mock):
+        """Test that keys include the generation once it was incremented."""
+        redis_mock.hget.return_value = "3"
+
+        cache = RedisCache(prefix="test")
+        cache.get({"key": "value"})
+
+        key = redis_mock.get.call_args[0][0]
+        assert key.startswith("test:v3:")
+        redis_mock.hget.assert_called_once_with("test:meta", "generation")
+
+    def test_generation_is_cached(self, redis_mock):
+        """Test that the generation counter is not read on every lookup."""
+        cache = RedisCache(prefix="test")
+        cache.generation_refresh = 60
+
+        cache.get({"key": "value"})
+        cache.get({"key": "value"})
+
+        redis_mock.hget.assert_called_once()
+
+    def test_invalidate(self, redis_mock):
+        """Test that invalidate increments the generation counter."""
+        redis_mock.hincrby.return_value = 1
+
+        cache = RedisCache(prefix="test")
+        old_key = cache._generate_key({"key": "value"})
+
+        assert cache.invalidate() == 1
+        redis_mock.hincrby.assert_called_once_with("test:meta", "generation", 1)
+        assert cache._generate_key({"key": "value"}) != old_key
+
+    def test_acquire_lock(self, redis_mock):
+        """Test that acquire_lock sets the lock key only if absent"""
+        redis_mock.set.return_value = True
+
+        cache = RedisCache(prefix="test")
+        token = cache.acquire_lock({"key": "value"}, ttl=30)
+
+        assert token is not None
+        args, kwargs = redis_mock.set.call_args
+        assert args[0] == f"{cache._generate_key({'key': 'value'})}:lock"
+        assert args[1] == token
+        assert kwargs == {"nx": True, "ex": 30}
+
+    def test_acquire_lock_already_held(self, redis_mock):
+        """Test that acquire_lock returns None when the lock is held"""
+        redis_mock.set.return_value = None
+
+        cache = RedisCache(prefix="test")
+
+        assert cache.acquire_lock({"key": "value"}, ttl=30) is None
+
+    def test_release_lock(self, redis_mock):
+        """Test that release_lock deletes the lock only for its owner"""
+        redis_mock.eval.return_value = 1
+
+        cache = RedisCache(prefix="test")
+        result = cache.release_lock({"key": "value"}, "token")
+
+        assert result is True
+        args = redis_mock.eval.call_args[0]
+        assert args[1:] == (1, f"{cache._generate_key({'key': 'value'})}:lock", "token")
+
+
+class TestAsyncRedisCache:
+    """Tests for the AsyncRedisCache class."""
+
+    @pytest.fixture
+    def redis_mock(self):
+        """Create a mock for the asyncio Redis client."""
+        with patch("utils.cache.aioredis.Redis") as mock:
+            mock.return_value.hget = AsyncMock(return_value=None)
+            yield mock.return_value
+
+    def test_keys_match_sync_cache(self):
+        """Test that both caches share the same keys."""
+        key_params = {"query": "question", "law_codes": ["civil"]}
+
+        assert AsyncRedisCache(prefix="test")._generate_key(key_params) == RedisCache(
+            prefix="test"
+        )._generate_key(key_params)
+
+    def test_connection_pool(self):
+        """Test that the pool is configured with limits and timeouts."""
+        cache = AsyncRedisCache(
+            max_connections=5, socket_timeout=0.5, socket_connect_timeout=0.2
+        )
+
+        assert cache.pool.max_connections == 5
+        assert cache.pool.connection_kwargs["socket_timeout"] == 0.5
+        assert cache.pool.connection_kwargs["socket_connect_timeout"] == 0.2
+
+    @pytest.mark.asyncio
+    async def test_get(self, redis_mock):
+        """Test that get returns the expected value."""
+        redis_mock.get = AsyncMock(return_value="cached_value")
+
+        cache = AsyncRedisCache(prefix="test")
+        result = await cache.get({"key": "value"})
+
+        assert result == "cached_value"
+        redis_mock.get.assert_awaited_once_with(cache._generate_key({"key": "value"}))
+
+    @pytest.mark.asyncio
+    async def test_get_redis_error(self, redis_mock):
+        """Test that Redis errors are treated as cache misses."""
+        redis_mock.get = AsyncMock(side_effect=redis.ConnectionError("down"))
+
+        cache = AsyncRedisCache()
+
+        assert await cache.get({"key": "value"}) is None
+
+    @pytest.mark.asyncio
+    async def test_set(self, redis_mock):
+        """Test that set calls Redis with the right parameters."""
+        redis_mock.set = AsyncMock(return_value=True)
+
+        cache = AsyncRedisCache()
+        cache.ttl = 3600
+        result = await cache.set({"key": "value"}, "value_to_cache")
+
+        assert result is True
+        call_args = redis_mock.set.call_args
+        assert call_args[0][1] == "value_to_cache"
+        assert call_args[1]["ex"] == 3600
+
+    @pytest.mark.asyncio
+    async def test_mget(self, redis_mock):
+        """Test that mget fetches every key in one command."""
+        redis_mock.mget = AsyncMock(return_value=["first", None])
+
+        cache = AsyncRedisCache(prefix="test")
+        result = await cache.mget([{"key": 1}, {"key": 2}])
+
+        assert result == ["first", None]
+        redis_mock.mget.assert_awaited_once_with(
+            [cache._generate_key({"key": 1}), cache._generate_key({"key": 2})]
+        )
+
+    @pytest.mark.asyncio
+    async def test_mget_redis_error(self, redis_mock):
+        """Test that mget returns misses when Redis fails."""
+        redis_mock.mget = AsyncMock(side_effect=redis.TimeoutError("slow"))
+
+        cache = AsyncRedisCache()
+
+        assert await cache.mget([{"key": 1}, {"key": 2}]) == [None, None]
+
+    @pytest.mark.asyncio
+    async def test_mset(self, redis_mock):
+        """Test that mset pipelines the writes."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[True, True])
+        redis_mock.pipeline.return_value.__aenter__.return_value = pipe
+
+        cache = AsyncRedisCache(prefix="test")
+        cache.ttl = 60
+        result = await cache.mset([({"key": 1}, "first"), ({"key": 2}, "second")])
+
+        assert result is True
+        redis_mock.pipeline.assert_called_once_with(transaction=False)
+        assert pipe.set.call_count == 2
+        pipe.set.assert_any_call(cache._generate_key({"key": 2}), "second", ex=60)
+        pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_flush(self, redis_mock):
+        """Test that flush scans the keys with the prefix and unlinks them."""
+
+        async def scan_iter(match, count):
+            for key in ["key1", "test:meta", "key2"]:
+                yield key
+
+        redis_mock.scan_iter = MagicMock(side_effect=scan_iter)
+        redis_mock.unlink = AsyncMock(return_value=2)
+
+        cache = AsyncRedisCache(prefix="test")
+        result = await cache.flush()
+
         assert result == 2
-        redis_mock.keys.assert_called_once_with("test:*")
-        redis_mock.delete.assert_called_once_with("key1", "key2")
+        redis_mock.scan_iter.assert_called_once_with(
+            match="test:*", count=cache.flush_batch_size
+        )
+        redis_mock.unlink.assert_awaited_once_with("key1", "key2")
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self, redis_mock):
+        """Test that invalidate increments the generation counter."""
+        redis_mock.hincrby = AsyncMock(return_value=2)
+        redis_mock.get = AsyncMock(return_value=None)
+
+        cache = AsyncRedisCache(prefix="test")
+
+        assert await cache.invalidate() == 2
+        await cache.get({"key": "value"})
+        assert redis_mock.get.call_args[0][0].startswith("test:v2:")
+
+    @pytest.mark.asyncio
+    async def test_acquire_lock(self, redis_mock):
+        """Test that acquire_lock sets the lock key only if absent."""
+        redis_mock.set = AsyncMock(return_value=True)
+
+        cache = AsyncRedisCache(prefix="test")
+        token = await cache.acquire_lock({"key": "value"}, ttl=30)
+
+        assert token is not None
+        args, kwargs = redis_mock.set.call_args
+        assert args == (f"{cache._generate_key({'key': 'value'})}:lock", token)
+        assert kwargs == {"nx": True, "ex": 30}
+
+
+class TestLocalCache:
+    """Tests for the LocalCache class."""
+
+    def test_get_set(self):
+        """Test that stored values are returned."""
+        cache = LocalCache(max_entries=2, ttl=60)
+        cache.set("a", "value")
+
+        assert cache.get("a") == "value"
+        assert cache.get("b") is None
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        cache = LocalCache(max_entries=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+
+    def test_expiry(self):
+        """Test that expired entries are not returned."""
+        cache = LocalCache(max_entries=2, ttl=10)
+        with patch("utils.cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch("utils.cache.time.monotonic", return_value=111.0):
+            assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_disabled(self):
+        """Test that a cache without entries stores nothing."""
+        cache = LocalCache(max_entries=0)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+
+
+class TestTieredCache:
+    """Tests for the TieredCache class."""
+
+    @pytest.fixture
+    def redis_mock(self):
+        """Create a mock for the asyncio Redis client."""
+        with patch("utils.cache.aioredis.Redis") as mock:
+            mock.return_value.hget = AsyncMock(return_value=None)
+            mock.return_value.get = AsyncMock(return_value="cached_value")
+            mock.return_value.set = AsyncMock(return_value=True)
+            mock.return_value.publish = AsyncMock(return_value=1)
+            yield mock.return_value
+
+    @pytest.mark.asyncio
+    async def test_local_tier_serves_repeated_lookups(self, redis_mock):
+        """Test that a Redis hit is then served from memory."""
+        cache = TieredCache(prefix="test")
+
+        assert await cache.get({"key": "value"}) == "cached_value"
+        assert await cache.get({"key": "value"}) == "cached_value"
+
+        redis_mock.get.assert_awaited_once()
+        stats = cache.stats()
+        assert stats["local"]["hits"] == 1
+        assert stats["local"]["misses"] == 1
+        assert stats["redis"]["hits"] == 1
+        assert stats["local"]["hit_rate"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_redis_miss(self, redis_mock):
+        """Test that misses in both tiers are counted."""
+        redis_mock.get.return_value = None
+        cache = TieredCache(prefix="test")
+
+        assert await cache.get({"key": "value"}) is None
+        assert cache.stats()["redis"]["misses"] == 1
+        assert len(cache.local) == 0
+
+    @pytest.mark.asyncio
+    async def test_set_writes_both_tiers(self, redis_mock):
+        """Test that set fills the local tier too."""
+        cache = TieredCache(prefix="test")
+        await cache.set({"key": "value"}, "new_value")
+
+        assert await cache.get({"key": "value"}) == "new_value"
+        redis_mock.set.assert_awaited_once()
+        redis_mock.get.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_flush_clears_local_tier_and_publishes(self, redis_mock):
+        """Test that flush invalidates every worker's local tier."""
+
+        async def scan_iter(match, count):
+            for key in []:
+                yield key
+
+        redis_mock.scan_iter = MagicMock(side_effect=scan_iter)
+        cache = TieredCache(prefix="test")
+        # Pretend the invalidation listener is running
+        cache._listener = MagicMock()
+        await cache.set({"key": "value"}, "new_value")
+
+        await cache.flush()
+
+        assert len(cache.local) == 0
+        redis_mock.publish.assert_awaited_once_with("test:invalidate", "*")
+
+    @pytest.mark.asyncio
+    async def test_invalidate_switches_every_worker(self, redis_mock):
+        """Test that invalidate announces the new generation."""
+        redis_mock.hincrby = AsyncMock(return_value=4)
+        cache = TieredCache(prefix="test")
+        cache._listener = MagicMock()
+        await cache.set({"key": "value"}, "new_value")
+
+        assert await cache.invalidate() == 4
+
+        assert len(cache.local) == 0
+        redis_mock.publish.assert_awaited_once_with("test:invalidate", "generation:4")
+
+    def test_invalidate_local_generation(self):
+        """Test that a generation message switches the local generation."""
+        cache = TieredCache(prefix="test")
+        cache.local.set("test:a", 1)
+
+        cache.invalidate_local("generation:5")
+
+        assert cache.generation == 5
+        assert len(cache.local) == 0
+
+    @pytest.mark.asyncio
+    async def test_published_flush_clears_semantic_cache(self, redis_mock):
+        """Test that a flush published by another worker drops similar answers."""
+        from utils.semantic_cache import SemanticCache
+
+        embedding_model = MagicMock()
+        embedding_model.embed_query.return_value = [1.0, 0.0]
+        semantic_cache = SemanticCache(embedding_model, threshold=0.9)
+        semantic_cache.store("query", {}, "answer")
+        cache = TieredCache(prefix="test")
+        cache.add_invalidation_listener(semantic_cache.clear)
+
+        class PubSub:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def subscribe(self, channel):
+                pass
+
+            async def listen(self):
+                yield {"type": "message", "data": "test:other_key"}
+                assert semantic_cache.lookup("query", {}) == "answer"
+                yield {"type": "message", "data": "*"}
+                raise asyncio.CancelledError
+
+        redis_mock.pubsub = MagicMock(return_value=PubSub())
+        with pytest.raises(asyncio.CancelledError):
+            await cache._listen()
+
+        assert semantic_cache.lookup("query", {}) is None
+
+    def test_invalidate_local(self):
+        """Test that invalidation messages drop local entries."""
+        cache = TieredCache(prefix="test")
+        cache.local.set("test:a", 1)
+        cache.local.set("test:b", 2)
+
+        cache.invalidate_local("test:a")
+        assert "test:a" not in cache.local
+        assert "test:b" in cache.local
+
+        cache.invalidate_local("*")
+        assert len(cache.local) == 0
@@ -0,0 +1,22 @@
+# tests/utils/test_deadline.py
+from unittest.mock import patch
+from utils.deadline import Deadline
+
+
+def test_remaining_budget():
+    """Test that the remaining budget decreases with time"""
+    with patch("utils.deadline.time.monotonic", side_effect=[100.0, 101.5, 103.0]):
+        deadline = Deadline(2000)
+
+        assert deadline.remaining() == 0.5
+        assert deadline.expired
+
+
+def test_no_deadline():
+    """Test that a missing budget never expires"""
+    for budget in (None, 0):
+        deadline = Deadline(budget)
+
+        assert deadline.remaining() is None
+        assert deadline.remaining_ms() == float("inf")
+        assert not deadline.expired
@@ -1,6 +1,15 @@
 # tests/test_utils.py
-from unittest.mock import patch, MagicMock
-from utils.logging import setup_logging
+import json
+import logging
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+from utils.logging import (
+    _listeners,
+    CustomFormatter,
+    DeferredQueueHandler,
+    RequestLogMiddleware,
+    setup_logging,
+)
 
 
 @patch("utils.logging.logging")
@@ -13,7 +22,7 @@ def test_setup_logging(mock_logging):
     mock_logging.StreamHandler.return_value = mock_stream_handler
 
     # Call the function
-    logger = setup_logging("test_logger")
+    logger = setup_logging("test_logger", use_queue=False)
 
     # Assertions
     assert logger == mock_logger
@@ -22,3 +31,53 @@ def test_setup_logging(mock_logging):
     mock_logging.StreamHandler.assert_called_once()
     mock_stream_handler.setFormatter.assert_called_once()
     mock_logger.addHandler.assert_called_once_with(mock_stream_handler)
+
+
+def test_setup_logging_with_queue(tmp_path):
+    """Test that records are written by the listener thread."""
+    log_file = tmp_path / "logs" / "queued.log"
+    logger = setup_logging("test_queued_logger", str(log_file), use_queue=True)
+
+    assert len(logger.handlers) == 1
+    assert isinstance(logger.handlers[0], DeferredQueueHandler)
+
+    logger.warning("Queued %s", "message")
+    # Stopping the listener writes the queued records
+    _listeners.pop().stop()
+
+    assert "Queued message" in log_file.read_text()
+
+
+def test_custom_formatter_extra_fields():
+    """Test that only the extra fields are added to the JSON record."""
+    record = logging.LogRecord("test", logging.INFO, "", 0, "Hello %s", ("you",), None)
+    record.path = "/api/query"
+    record.timings = {"stages": {"cache_lookup": 0.001}}
+
+    log_record = json.loads(CustomFormatter().format(record))
+
+    assert log_record["message"] == "Hello you"
+    assert log_record["path"] == "/api/query"
+    assert log_record["timings"] == {"stages": {"cache_lookup": 0.001}}
+    assert "args" not in log_record
+    assert "lineno" not in log_record
+
+
+def respond(status):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status})
+        await send({"type": "http.response.body", "body": b""})
+
+    return app
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status, logged", [(200, False), (503, True)])
+async def test_request_log_sampling(status, logged):
+    """Test that sampled out requests are not logged, unless they fail."""
+    middleware = RequestLogMiddleware(respond(status), sample_rate=0.0)
+
+    with patch("utils.logging.request_logger") as mock_logger:
+        await middleware({"type": "http", "path": "/"}, AsyncMock(), AsyncMock())
+
+    assert mock_logger.info.called == logged
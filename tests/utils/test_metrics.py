@@ -0,0 +1,145 @@
+# tests/utils/test_metrics.py
+import contextvars
+import pytest
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_community.vectorstores import FAISS
+from prometheus_client import REGISTRY
+from utils.metrics import (
+    TimedRetriever,
+    record_cache_lookup,
+    set_index_memory,
+    timed,
+    track_external_call,
+    track_stage,
+    track_stream,
+)
+from utils.timing import start_request_timings
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_track_stage():
+    """Test that a stage duration is observed"""
+    before = sample("legal_assistant_stage_duration_seconds_count", stage="agent_run")
+
+    with track_stage("agent_run"):
+        pass
+
+    after = sample("legal_assistant_stage_duration_seconds_count", stage="agent_run")
+    assert after == before + 1
+
+
+@pytest.mark.asyncio
+async def test_timed():
+    """Test that an awaited stage is observed and its result returned"""
+    before = sample("legal_assistant_stage_duration_seconds_count", stage="direct_llm")
+
+    async def answer():
+        return "answer"
+
+    assert await timed("direct_llm", answer()) == "answer"
+    after = sample("legal_assistant_stage_duration_seconds_count", stage="direct_llm")
+    assert after == before + 1
+
+
+def test_track_external_call_outcomes():
+    """Test that successes and errors are counted separately"""
+    name = "legal_assistant_external_calls_total"
+    success = sample(name, service="serpapi", outcome="success")
+    error = sample(name, service="serpapi", outcome="error")
+
+    with track_external_call("serpapi"):
+        pass
+    with pytest.raises(ValueError):
+        with track_external_call("serpapi"):
+            raise ValueError("boom")
+
+    assert sample(name, service="serpapi", outcome="success") == success + 1
+    assert sample(name, service="serpapi", outcome="error") == error + 1
+
+
+def test_track_stream_records_call_when_stream_ends():
+    """Test that a streamed call is recorded once, when its stream ends"""
+    name = "legal_assistant_external_calls_total"
+    latency = "legal_assistant_external_call_duration_seconds_count"
+    success = sample(name, service="groq", outcome="success")
+    error = sample(name, service="groq", outcome="error")
+    observed = sample(latency, service="groq")
+
+    def failing_stream():
+        yield "Bon"
+        raise ValueError("connection lost")
+
+    # Opening the stream is not the end of the call
+    with track_external_call("groq", opens_stream=True):
+        pass
+    stream = track_stream(iter(["Bon", "jour"]), "groq", 0.0)
+    assert sample(latency, service="groq") == observed
+
+    assert list(stream) == ["Bon", "jour"]
+    with pytest.raises(ValueError):
+        list(track_stream(failing_stream(), "groq", 0.0))
+
+    assert sample(name, service="groq", outcome="success") == success + 1
+    assert sample(name, service="groq", outcome="error") == error + 1
+    assert sample(latency, service="groq") == observed + 2
+
+
+def test_record_cache_lookup():
+    name = "legal_assistant_cache_lookups_total"
+    hits = sample(name, tier="local", result="hit")
+
+    record_cache_lookup("local", True)
+
+    assert sample(name, tier="local", result="hit") == hits + 1
+
+
+def test_set_index_memory():
+    """Test that evicted law codes are removed from the gauge"""
+    name = "legal_assistant_index_memory_bytes"
+
+    set_index_memory("civil", 1024)
+    assert sample(name, law_code="civil") == 1024
+
+    set_index_memory("civil", 0)
+    assert REGISTRY.get_sample_value(name, {"law_code": "civil"}) is None
+    # Removing an unknown law code is harmless
+    set_index_memory("unknown", 0)
+
+
+@pytest.mark.asyncio
+async def test_timed_retriever():
+    """Test that retrievals are timed and return the wrapped documents"""
+    vectorstore = FAISS.from_texts(["article 1", "article 2"], FakeEmbeddings(size=8))
+    retriever = TimedRetriever(
+        retriever=vectorstore.as_retriever(search_kwargs={"k": 1})
+    )
+    name = "legal_assistant_stage_duration_seconds_count"
+    before = sample(name, stage="retrieval")
+
+    assert len(retriever.invoke("article")) == 1
+    assert len(await retriever.ainvoke("article")) == 1
+
+    assert sample(name, stage="retrieval") == before + 2
+
+
+def test_timed_retriever_records_law_code():
+    """Test that retrievals are added to the request timings per law code"""
+    vectorstore = FAISS.from_texts(["article 1", "article 2"], FakeEmbeddings(size=8))
+    retriever = TimedRetriever(
+        retriever=vectorstore.as_retriever(search_kwargs={"k": 2}), law_code="civil"
+    )
+
+    def run():
+        timings = start_request_timings()
+        retriever.invoke("article")
+        return timings
+
+    timings = contextvars.copy_context().run(run)
+
+    assert len(timings.retrievals) == 1
+    assert timings.retrievals[0]["law_code"] == "civil"
+    assert timings.retrievals[0]["documents"] == 2
+    assert "retrieval" in timings.stages
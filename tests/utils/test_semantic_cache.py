@@ -0,0 +1,89 @@
+# tests/utils/test_semantic_cache.py
+import pytest
+from unittest.mock import MagicMock, patch
+from utils.semantic_cache import SemanticCache
+
+SCOPE = {"law_codes": ["civil"], "use_search": False, "use_rag": True}
+
+# Fake embeddings: the two "licenciement" queries are close, the third is not
+VECTORS = {
+    "Quels sont mes droits en cas de licenciement ?": [1.0, 0.0, 0.0],
+    "droits du salarié licencié": [0.98, 0.2, 0.0],
+    "Comment divorcer ?": [0.0, 0.0, 1.0],
+}
+
+
+@pytest.fixture
+def embedding_model():
+    model = MagicMock()
+    model.embed_query.side_effect = lambda text: VECTORS[text]
+    return model
+
+
+def test_similar_query_hits(embedding_model):
+    """Test that a similar query returns the stored value"""
+    cache = SemanticCache(embedding_model, threshold=0.9)
+    cache.store("Quels sont mes droits en cas de licenciement ?", SCOPE, "answer")
+
+    assert cache.lookup("droits du salarié licencié", SCOPE) == "answer"
+    assert cache.lookup("Comment divorcer ?", SCOPE) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_scope_must_match(embedding_model):
+    """Test that entries are not shared across scopes"""
+    cache = SemanticCache(embedding_model, threshold=0.9)
+    cache.store("Quels sont mes droits en cas de licenciement ?", SCOPE, "answer")
+
+    other_scope = {**SCOPE, "law_codes": ["penal"]}
+    assert cache.lookup("droits du salarié licencié", other_scope) is None
+
+
+def test_expired_entries_are_removed(embedding_model):
+    """Test that expired entries are not returned"""
+    cache = SemanticCache(embedding_model, threshold=0.9, ttl=10)
+
+    with patch("utils.semantic_cache.time.time", return_value=1000.0):
+        cache.store("Quels sont mes droits en cas de licenciement ?", SCOPE, "answer")
+
+    with patch("utils.semantic_cache.time.time", return_value=1011.0):
+        assert cache.lookup("droits du salarié licencié", SCOPE) is None
+
+    assert len(cache) == 0
+
+
+def test_size_bound_evicts_least_recently_used(embedding_model):
+    """Test that the least recently used entry is evicted"""
+    cache = SemanticCache(embedding_model, threshold=0.9, max_entries=2)
+    cache.store("Quels sont mes droits en cas de licenciement ?", SCOPE, "first")
+    cache.store("Comment divorcer ?", SCOPE, "second")
+
+    # Touch the first entry so that the second one is evicted
+    assert cache.lookup("droits du salarié licencié", SCOPE) == "first"
+    cache.store("droits du salarié licencié", {**SCOPE, "use_search": True}, "third")
+
+    assert len(cache) == 2
+    assert cache.lookup("Comment divorcer ?", SCOPE) is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_query_embeddings_are_reused(embedding_model):
+    """Test that looking up then storing a query embeds it once"""
+    cache = SemanticCache(embedding_model)
+
+    cache.lookup("Comment divorcer ?", SCOPE)
+    cache.store("Comment divorcer ?", SCOPE, "answer")
+
+    embedding_model.embed_query.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_async_lookup_and_store(embedding_model):
+    cache = SemanticCache(embedding_model, threshold=0.9)
+
+    await cache.astore("Comment divorcer ?", SCOPE, "answer")
+
+    assert await cache.alookup("Comment divorcer ?", SCOPE) == "answer"
+    assert cache.clear() == 1
+    assert await cache.alookup("Comment divorcer ?", SCOPE) is None
@@ -0,0 +1,143 @@
+# tests/utils/test_singleflight.py
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from utils.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_computation():
+    """Test that concurrent identical calls run the function once"""
+    flights = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "answer"
+
+    key = {"query": "question", "law_codes": ["civil"]}
+    waiters = [asyncio.ensure_future(flights.do(key, compute)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert len(flights) == 1
+
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert results == ["answer"] * 5
+    assert calls == 1
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_different_keys_are_not_coalesced():
+    """Test that different keys compute separately"""
+    flights = SingleFlight()
+    compute = AsyncMock(side_effect=["first", "second"])
+
+    results = await asyncio.gather(
+        flights.do({"query": "a"}, compute), flights.do({"query": "b"}, compute)
+    )
+
+    assert sorted(results) == ["first", "second"]
+    assert compute.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_sequential_calls_compute_again():
+    """Test that a finished computation is not reused"""
+    flights = SingleFlight()
+    compute = AsyncMock(side_effect=["first", "second"])
+
+    assert await flights.do({"query": "a"}, compute) == "first"
+    assert await flights.do({"query": "a"}, compute) == "second"
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared():
+    """Test that every waiter receives the error of the computation"""
+    flights = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flights.do({"query": "a"}, compute),
+        flights.do({"query": "a"}, compute),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_computation():
+    """Test that the computation survives the caller that started it"""
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()
+        return "answer"
+
+    leader = asyncio.ensure_future(flights.do({"query": "a"}, compute))
+    follower = asyncio.ensure_future(flights.do({"query": "a"}, compute))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    release.set()
+
+    assert await follower == "answer"
+
+
+@pytest.mark.asyncio
+async def test_distributed_lock_acquired():
+    """Test that the lock holder computes and releases the lock"""
+    cache = AsyncMock()
+    cache.acquire_lock.return_value = "token"
+    flights = SingleFlight(cache, lock_ttl=10, poll_interval=0.01)
+    poll = AsyncMock(return_value=None)
+
+    result = await flights.do({"query": "a"}, AsyncMock(return_value="answer"), poll)
+
+    assert result == "answer"
+    cache.acquire_lock.assert_awaited_once_with({"query": "a"}, 10)
+    cache.release_lock.assert_awaited_once_with({"query": "a"}, "token")
+    poll.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_distributed_waits_for_other_worker():
+    """Test that a worker without the lock waits for the other worker's result"""
+    cache = AsyncMock()
+    cache.acquire_lock.return_value = None
+    cache.is_locked.return_value = True
+    flights = SingleFlight(cache, lock_ttl=10, poll_interval=0.01)
+    compute = AsyncMock(return_value="computed")
+    poll = AsyncMock(side_effect=[None, None, "cached"])
+
+    result = await flights.do({"query": "a"}, compute, poll)
+
+    assert result == "cached"
+    assert poll.await_count == 3
+    compute.assert_not_awaited()
+    cache.release_lock.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_distributed_computes_when_other_worker_fails():
+    """Test that a worker computes itself when the lock is released without a result"""
+    cache = AsyncMock()
+    cache.acquire_lock.return_value = None
+    cache.is_locked.return_value = False
+    flights = SingleFlight(cache, lock_ttl=10, poll_interval=0.01)
+    compute = AsyncMock(return_value="computed")
+
+    result = await flights.do({"query": "a"}, compute, AsyncMock(return_value=None))
+
+    assert result == "computed"
+    compute.assert_awaited_once()
@@ -0,0 +1,117 @@
+# tests/utils/test_timing.py
+import asyncio
+import contextvars
+import pytest
+from langchain_core.language_models import FakeListLLM
+from langchain.tools import Tool
+from utils.metrics import track_stage
+from utils.timing import (
+    RequestTimings,
+    current_timings,
+    start_request_timings,
+    timing_handler,
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_context():
+    """Run every test in its own context so collectors do not leak"""
+    context = contextvars.copy_context()
+    yield context
+
+
+def test_no_collector_outside_requests():
+    """Test that nothing is collected when no request is being timed"""
+    assert contextvars.Context().run(current_timings) is None
+
+    llm = FakeListLLM(responses=["answer"], callbacks=[timing_handler])
+    assert contextvars.Context().run(llm.invoke, "question") == "answer"
+
+
+def test_stages_are_summed():
+    """Test that repeated stages add up"""
+    timings = RequestTimings()
+
+    timings.add_stage("retrieval", 0.5)
+    timings.add_stage("retrieval", 0.25)
+
+    assert timings.to_dict()["stages"] == {"retrieval": 0.75}
+
+
+def test_track_stage_records_current_request(isolated_context):
+    """Test that timed stages are added to the current request timings"""
+
+    def run():
+        timings = start_request_timings()
+        with track_stage("cache_lookup"):
+            pass
+        return timings
+
+    timings = isolated_context.run(run)
+
+    assert set(timings.stages) == {"cache_lookup"}
+
+
+def test_llm_calls_are_recorded(isolated_context):
+    """Test that LLM calls are recorded with their tags"""
+
+    def run():
+        timings = start_request_timings()
+        llm = FakeListLLM(
+            responses=["answer"], callbacks=[timing_handler], tags=["rag:civil"]
+        )
+        llm.invoke("question")
+        return timings
+
+    calls = isolated_context.run(run).llm_calls
+
+    assert len(calls) == 1
+    assert calls[0]["name"] == "rag:civil"
+    assert calls[0]["seconds"] >= 0
+    # The fake LLM does not report its token usage
+    assert calls[0]["prompt_tokens"] is None
+
+
+def test_tool_calls_are_recorded(isolated_context):
+    """Test that tool invocations and failures are recorded"""
+
+    def fail(query):
+        raise ValueError("boom")
+
+    def run():
+        timings = start_request_timings()
+        Tool(
+            name="civil_rag", func=str.upper, description="", callbacks=[timing_handler]
+        ).invoke("question")
+        with pytest.raises(ValueError):
+            Tool(
+                name="broken", func=fail, description="", callbacks=[timing_handler]
+            ).invoke("question")
+        return timings
+
+    calls = isolated_context.run(run).tool_calls
+
+    assert [call["tool"] for call in calls] == ["civil_rag", "broken"]
+    assert calls[1]["error"] is True
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_isolated():
+    """Test that concurrent requests collect their own timings"""
+
+    async def request(tag):
+        timings = start_request_timings()
+        llm = FakeListLLM(responses=["answer"], callbacks=[timing_handler], tags=[tag])
+        await asyncio.sleep(0)
+        await llm.ainvoke("question")
+        timing_handler.on_agent_action(None, run_id=None)
+        return timings
+
+    first, second = await asyncio.gather(
+        asyncio.ensure_future(request("first")),
+        asyncio.ensure_future(request("second")),
+    )
+
+    assert [call["name"] for call in first.llm_calls] == ["first"]
+    assert [call["name"] for call in second.llm_calls] == ["second"]
+    assert first.agent_iterations == second.agent_iterations == 1
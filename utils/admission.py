@@ -0,0 +1,135 @@
+# utils/admission.py
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict
+from utils.logging import app_logger
+from config import (
+    ADMISSION_MAX_CONCURRENT,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT,
+    ADMISSION_REJECT_STATUS,
+    ADMISSION_RETRY_AFTER,
+)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed because the server is overloaded."""
+
+    def __init__(self, reason: str, status_code: int, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limiter with a bounded wait queue that sheds excess load."""
+
+    def __init__(
+        self,
+        max_concurrent: int = ADMISSION_MAX_CONCURRENT,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+        reject_status: int = ADMISSION_REJECT_STATUS,
+        retry_after: int = ADMISSION_RETRY_AFTER,
+    ):
+        """
+        Initialize the admission controller.
+
+        Args:
+            max_concurrent: Requests admitted at the same time (0 for no limit)
+            max_queue: Requests waiting for a slot before new ones are rejected
+            queue_timeout: Maximum time in seconds a request waits for a slot
+            reject_status: HTTP status code of rejected requests
+            retry_after: Delay in seconds suggested to rejected clients
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.reject_status = reject_status
+        self.retry_after = retry_after
+
+        self._active = 0
+        # Futures of the waiting requests, resolved when a slot is handed over
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._stats = {"admitted": 0, "queued": 0, "rejected": 0, "timed_out": 0}
+
+    def _reject(self, reason: str, stat: str) -> AdmissionRejected:
+        self._stats[stat] += 1
+        app_logger.warning(f"Request rejected by admission control: {reason}")
+        return AdmissionRejected(reason, self.reject_status, self.retry_after)
+
+    async def acquire(self):
+        """
+        Wait for a slot.
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait times out
+        """
+        if self.max_concurrent <= 0:
+            return
+
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            self._stats["admitted"] += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("queue full", "rejected")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._stats["queued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done():
+                # The slot was handed over while giving up
+                if isinstance(e, asyncio.CancelledError):
+                    self.release()
+                    raise
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+                if isinstance(e, asyncio.TimeoutError):
+                    raise self._reject("queue timeout", "timed_out") from None
+                raise
+
+        self._stats["admitted"] += 1
+
+    def release(self):
+        """Release a slot, handing it over to the oldest waiting request."""
+        if self.max_concurrent <= 0:
+            return
+
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        self._active -= 1
+
+    @asynccontextmanager
+    async def admit(self):
+        """Hold a slot for the duration of the block."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the admission statistics.
+
+        Returns:
+            Active and queued requests, and admission counters
+        """
+        return {
+            "active": self._active,
+            "queue_depth": len(self._waiters),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            **self._stats,
+        }
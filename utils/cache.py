@@ -1,17 +1,42 @@
 # utils/cache.py
+import asyncio
 import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
 import redis
+import redis.asyncio as aioredis
 import hashlib
-from typing import Any, Optional, Dict
+from typing import Any, Callable, Optional, Dict, List, Tuple
 import os
+from utils.logging import app_logger
+from utils.metrics import record_cache_lookup
+from config import (
+    REDIS_MAX_CONNECTIONS,
+    REDIS_SOCKET_TIMEOUT,
+    REDIS_SOCKET_CONNECT_TIMEOUT,
+    CACHE_LOCAL_MAX_ENTRIES,
+    CACHE_LOCAL_TTL,
+    CACHE_FLUSH_BATCH_SIZE,
+    CACHE_GENERATION_REFRESH,
+)
 
+# Delete a lock only if it still holds the caller's token
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
 
-class RedisCache:
-    """Cache implementation using Redis."""
+
+class BaseRedisCache:
+    """Configuration and key generation shared by the Redis caches."""
 
     def __init__(self, prefix: str = "legal_assistant"):
         """
-        Initialize the Redis cache.
+        Initialize the cache configuration.
 
         Args:
             prefix: Prefix for cache keys
@@ -20,12 +45,26 @@ class RedisCache:
         self.redis_port = int(os.getenv("REDIS_PORT", 6379))
         self.prefix = prefix
         self.ttl = int(os.getenv("CACHE_TTL", 86400))  # Default: 1 day
+        self.flush_batch_size = CACHE_FLUSH_BATCH_SIZE
 
-        # Connect to Redis
-        self.redis = redis.Redis(
-            host=self.redis_host, port=self.redis_port, decode_responses=True
+        # Generation counter: incrementing it logically flushes the cache
+        self.meta_key = f"{self.prefix}:meta"
+        self.generation = 0
+        self.generation_refresh = CACHE_GENERATION_REFRESH
+        self._generation_checked: Optional[float] = None
+
+    def _generation_stale(self) -> bool:
+        """Check whether the generation counter should be read again."""
+        return (
+            self._generation_checked is None
+            or time.monotonic() - self._generation_checked >= self.generation_refresh
         )
 
+    def _set_generation(self, value: Any):
+        """Record the generation counter read from Redis."""
+        self.generation = int(value) if value is not None else 0
+        self._generation_checked = time.monotonic()
+
     def _generate_key(self, key_params: Dict[str, Any]) -> str:
         """
         Generate a cache key from parameters.
@@ -40,8 +79,59 @@ class RedisCache:
         param_str = json.dumps(key_params, sort_keys=True)
         key_hash = hashlib.md5(param_str.encode()).hexdigest()
 
+        # Generation 0 keeps the original key format
+        if self.generation:
+            return f"{self.prefix}:v{self.generation}:{key_hash}"
         return f"{self.prefix}:{key_hash}"
 
+    def _lock_key(self, key_params: Dict[str, Any]) -> str:
+        """Return the key of the lock guarding a cache entry."""
+        return f"{self._generate_key(key_params)}:lock"
+
+
+class RedisCache(BaseRedisCache):
+    """Cache implementation using Redis."""
+
+    def __init__(self, prefix: str = "legal_assistant"):
+        """
+        Initialize the Redis cache.
+
+        Args:
+            prefix: Prefix for cache keys
+        """
+        super().__init__(prefix)
+
+        # Connect to Redis
+        self.redis = redis.Redis(
+            host=self.redis_host, port=self.redis_port, decode_responses=True
+        )
+
+    def _refresh_generation(self):
+        """Read the generation counter if the local copy is stale."""
+        if not self._generation_stale():
+            return
+        try:
+            self._set_generation(self.redis.hget(self.meta_key, "generation"))
+        except redis.RedisError:
+            # Keep the current generation until the next refresh
+            self._generation_checked = time.monotonic()
+
+    def invalidate(self) -> Optional[int]:
+        """
+        Logically flush the cache by incrementing the generation counter.
+
+        Entries of older generations are no longer read and expire with their TTL.
+
+        Returns:
+            New generation, or None if Redis is unavailable
+        """
+        try:
+            generation = self.redis.hincrby(self.meta_key, "generation", 1)
+        except redis.RedisError:
+            return None
+        self._set_generation(generation)
+        return generation
+
     def get(self, key_params: Dict[str, Any]) -> Optional[str]:
         """
         Get a value from the cache.
@@ -52,6 +142,7 @@ class RedisCache:
         Returns:
             Cached value or None if not found
         """
+        self._refresh_generation()
         key = self._generate_key(key_params)
         try:
             return self.redis.get(key)
@@ -71,6 +162,7 @@ class RedisCache:
         Returns:
             True if successful
         """
+        self._refresh_generation()
         key = self._generate_key(key_params)
         try:
             return self.redis.set(key, value, ex=(ttl or self.ttl))
@@ -88,6 +180,7 @@ class RedisCache:
         Returns:
             True if successful
         """
+        self._refresh_generation()
         key = self._generate_key(key_params)
         try:
             return bool(self.redis.delete(key))
@@ -106,11 +199,650 @@ class RedisCache:
             Number of keys deleted
         """
         pattern = pattern or f"{self.prefix}:*"
+        deleted = 0
+        try:
+            # Iterate incrementally and free memory in the background, so that
+            # neither Redis nor the worker blocks on large caches
+            batch = []
+            for key in self.redis.scan_iter(match=pattern, count=self.flush_batch_size):
+                if key == self.meta_key:
+                    continue
+                batch.append(key)
+                if len(batch) >= self.flush_batch_size:
+                    deleted += self.redis.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += self.redis.unlink(*batch)
+            return deleted
+        except redis.RedisError:
+            # Log error but continue without cache
+            return deleted
+
+    def acquire_lock(self, key_params: Dict[str, Any], ttl: int) -> Optional[str]:
+        """
+        Acquire a lock on a cache entry, e.g. while computing its value.
+
+        Args:
+            key_params: Parameters to generate the key
+            ttl: Lock lifetime in seconds
+
+        Returns:
+            Lock token if acquired, None if another holder owns the lock
+        """
+        self._refresh_generation()
+        key = self._lock_key(key_params)
+        token = uuid.uuid4().hex
+        try:
+            if self.redis.set(key, token, nx=True, ex=ttl):
+                return token
+            return None
+        except redis.RedisError:
+            # Without Redis, behave as if the lock was acquired
+            return token
+
+    def release_lock(self, key_params: Dict[str, Any], token: str) -> bool:
+        """
+        Release a lock if it is still owned by the given token.
+
+        Args:
+            key_params: Parameters to generate the key
+            token: Token returned by acquire_lock
+
+        Returns:
+            True if the lock was released
+        """
+        self._refresh_generation()
+        key = self._lock_key(key_params)
+        try:
+            return bool(self.redis.eval(RELEASE_LOCK_SCRIPT, 1, key, token))
+        except redis.RedisError:
+            return False
+
+    def is_locked(self, key_params: Dict[str, Any]) -> bool:
+        """
+        Check whether a cache entry is locked.
+
+        Args:
+            key_params: Parameters to generate the key
+
+        Returns:
+            True if a lock is held
+        """
+        self._refresh_generation()
+        key = self._lock_key(key_params)
+        try:
+            return bool(self.redis.exists(key))
+        except redis.RedisError:
+            return False
+
+
+class AsyncRedisCache(BaseRedisCache):
+    """Asyncio cache implementation using a pooled Redis connection."""
+
+    def __init__(
+        self,
+        prefix: str = "legal_assistant",
+        max_connections: int = REDIS_MAX_CONNECTIONS,
+        socket_timeout: float = REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout: float = REDIS_SOCKET_CONNECT_TIMEOUT,
+    ):
+        """
+        Initialize the async Redis cache.
+
+        Connections are opened lazily, so the cache can be created at import time.
+
+        Args:
+            prefix: Prefix for cache keys
+            max_connections: Maximum number of pooled connections
+            socket_timeout: Timeout in seconds of Redis commands
+            socket_connect_timeout: Timeout in seconds of connection attempts
+        """
+        super().__init__(prefix)
+
+        self.pool = aioredis.ConnectionPool(
+            host=self.redis_host,
+            port=self.redis_port,
+            max_connections=max_connections,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_connect_timeout,
+            decode_responses=True,
+        )
+        self.redis = aioredis.Redis(connection_pool=self.pool)
+
+    async def _refresh_generation(self):
+        """Read the generation counter if the local copy is stale."""
+        if not self._generation_stale():
+            return
+        try:
+            self._set_generation(await self.redis.hget(self.meta_key, "generation"))
+        except redis.RedisError:
+            # Keep the current generation until the next refresh
+            self._generation_checked = time.monotonic()
+
+    async def invalidate(self) -> Optional[int]:
+        """
+        Logically flush the cache by incrementing the generation counter.
+
+        Entries of older generations are no longer read and expire with their TTL.
+
+        Returns:
+            New generation, or None if Redis is unavailable
+        """
+        try:
+            generation = await self.redis.hincrby(self.meta_key, "generation", 1)
+        except redis.RedisError:
+            return None
+        self._set_generation(generation)
+        return generation
+
+    async def close(self):
+        """Close the pooled connections."""
+        await self.redis.aclose()
+        await self.pool.disconnect()
+
+    async def get(self, key_params: Dict[str, Any]) -> Optional[str]:
+        """
+        Get a value from the cache.
+
+        Args:
+            key_params: Parameters to generate the key
+
+        Returns:
+            Cached value or None if not found
+        """
+        await self._refresh_generation()
+        key = self._generate_key(key_params)
+        try:
+            return await self.redis.get(key)
+        except redis.RedisError:
+            # Log error but continue without cache
+            return None
+
+    async def set(
+        self, key_params: Dict[str, Any], value: str, ttl: int = None
+    ) -> bool:
+        """
+        Set a value in the cache.
+
+        Args:
+            key_params: Parameters to generate the key
+            value: Value to cache
+            ttl: Time to live in seconds (None for default)
+
+        Returns:
+            True if successful
+        """
+        await self._refresh_generation()
+        key = self._generate_key(key_params)
+        try:
+            return await self.redis.set(key, value, ex=(ttl or self.ttl))
+        except redis.RedisError:
+            # Log error but continue without cache
+            return False
+
+    async def mget(self, key_params_list: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Get several values from the cache in a single round trip.
+
+        Args:
+            key_params_list: Parameters to generate each key
+
+        Returns:
+            Cached values, None for the keys not found
+        """
+        if not key_params_list:
+            return []
+
+        await self._refresh_generation()
+        keys = [self._generate_key(key_params) for key_params in key_params_list]
+        try:
+            return await self.redis.mget(keys)
+        except redis.RedisError:
+            # Log error but continue without cache
+            return [None] * len(keys)
+
+    async def mset(
+        self, items: List[Tuple[Dict[str, Any], str]], ttl: int = None
+    ) -> bool:
+        """
+        Set several values in the cache in a single pipelined round trip.
+
+        Args:
+            items: Pairs of key parameters and value to cache
+            ttl: Time to live in seconds (None for default)
+
+        Returns:
+            True if successful
+        """
+        if not items:
+            return True
+
+        await self._refresh_generation()
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key_params, value in items:
+                    pipe.set(
+                        self._generate_key(key_params), value, ex=(ttl or self.ttl)
+                    )
+                return all(await pipe.execute())
+        except redis.RedisError:
+            # Log error but continue without cache
+            return False
+
+    async def delete(self, key_params: Dict[str, Any]) -> bool:
+        """
+        Delete a value from the cache.
+
+        Args:
+            key_params: Parameters to generate the key
+
+        Returns:
+            True if successful
+        """
+        await self._refresh_generation()
+        key = self._generate_key(key_params)
         try:
-            keys = self.redis.keys(pattern)
-            if keys:
-                return self.redis.delete(*keys)
-            return 0
+            return bool(await self.redis.delete(key))
         except redis.RedisError:
             # Log error but continue without cache
-            return 0
+            return False
+
+    async def flush(self, pattern: str = None) -> int:
+        """
+        Flush all keys matching the pattern.
+
+        Args:
+            pattern: Pattern to match (None for all keys with prefix)
+
+        Returns:
+            Number of keys deleted
+        """
+        pattern = pattern or f"{self.prefix}:*"
+        deleted = 0
+        try:
+            # Iterate incrementally and free memory in the background, so that
+            # neither Redis nor the worker blocks on large caches
+            batch = []
+            async for key in self.redis.scan_iter(
+                match=pattern, count=self.flush_batch_size
+            ):
+                if key == self.meta_key:
+                    continue
+                batch.append(key)
+                if len(batch) >= self.flush_batch_size:
+                    deleted += await self.redis.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.redis.unlink(*batch)
+            return deleted
+        except redis.RedisError:
+            # Log error but continue without cache
+            return deleted
+
+    async def acquire_lock(self, key_params: Dict[str, Any], ttl: int) -> Optional[str]:
+        """
+        Acquire a lock on a cache entry, e.g. while computing its value.
+
+        Args:
+            key_params: Parameters to generate the key
+            ttl: Lock lifetime in seconds
+
+        Returns:
+            Lock token if acquired, None if another holder owns the lock
+        """
+        await self._refresh_generation()
+        key = self._lock_key(key_params)
+        token = uuid.uuid4().hex
+        try:
+            if await self.redis.set(key, token, nx=True, ex=ttl):
+                return token
+            return None
+        except redis.RedisError:
+            # Without Redis, behave as if the lock was acquired
+            return token
+
+    async def release_lock(self, key_params: Dict[str, Any], token: str) -> bool:
+        """
+        Release a lock if it is still owned by the given token.
+
+        Args:
+            key_params: Parameters to generate the key
+            token: Token returned by acquire_lock
+
+        Returns:
+            True if the lock was released
+        """
+        await self._refresh_generation()
+        key = self._lock_key(key_params)
+        try:
+            return bool(await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, key, token))
+        except redis.RedisError:
+            return False
+
+    async def is_locked(self, key_params: Dict[str, Any]) -> bool:
+        """
+        Check whether a cache entry is locked.
+
+        Args:
+            key_params: Parameters to generate the key
+
+        Returns:
+            True if a lock is held
+        """
+        await self._refresh_generation()
+        key = self._lock_key(key_params)
+        try:
+            return bool(await self.redis.exists(key))
+        except redis.RedisError:
+            return False
+
+
+class LocalCache:
+    """In-process, size-bounded LRU cache with per-entry expiry."""
+
+    def __init__(
+        self, max_entries: int = CACHE_LOCAL_MAX_ENTRIES, ttl: int = CACHE_LOCAL_TTL
+    ):
+        """
+        Initialize the local cache.
+
+        Args:
+            max_entries: Maximum number of entries (0 to disable the cache)
+            ttl: Time to live in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value, marking it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if not found or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: int = None):
+        """
+        Set a value, evicting the least recently used entries past the size bound.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live in seconds (None for default)
+        """
+        if self.max_entries <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + (ttl or self.ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> bool:
+        """
+        Delete a value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            True if the key was present
+        """
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self) -> int:
+        """
+        Remove every entry.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+
+class TieredCache(AsyncRedisCache):
+    """Async Redis cache fronted by an in-process LRU tier in each worker."""
+
+    def __init__(
+        self,
+        prefix: str = "legal_assistant",
+        local_max_entries: int = CACHE_LOCAL_MAX_ENTRIES,
+        local_ttl: int = CACHE_LOCAL_TTL,
+        **kwargs,
+    ):
+        """
+        Initialize the tiered cache.
+
+        Args:
+            prefix: Prefix for cache keys
+            local_max_entries: Maximum number of entries of the local tier
+            local_ttl: Time to live in seconds of the local entries
+            **kwargs: Connection pool options of AsyncRedisCache
+        """
+        super().__init__(prefix, **kwargs)
+
+        # Local entries never outlive their Redis counterpart
+        self.local = LocalCache(local_max_entries, min(local_ttl, self.ttl))
+        self.channel = f"{self.prefix}:invalidate"
+        self._listener: Optional[asyncio.Task] = None
+        self._invalidation_listeners: List[Callable[[], Any]] = []
+        self._stats = {
+            "local": {"hits": 0, "misses": 0},
+            "redis": {"hits": 0, "misses": 0},
+        }
+
+    async def get(self, key_params: Dict[str, Any]) -> Optional[str]:
+        """
+        Get a value from the local tier, then from Redis.
+
+        Args:
+            key_params: Parameters to generate the key
+
+        Returns:
+            Cached value or None if not found
+        """
+        await self._refresh_generation()
+        key = self._generate_key(key_params)
+        value = self.local.get(key)
+        if value is not None:
+            self._stats["local"]["hits"] += 1
+            record_cache_lookup("local", True)
+            return value
+        self._stats["local"]["misses"] += 1
+        record_cache_lookup("local", False)
+
+        value = await super().get(key_params)
+        if value is None:
+            self._stats["redis"]["misses"] += 1
+            record_cache_lookup("redis", False)
+            return None
+
+        self._stats["redis"]["hits"] += 1
+        record_cache_lookup("redis", True)
+        self.local.set(key, value)
+        return value
+
+    async def set(
+        self, key_params: Dict[str, Any], value: str, ttl: int = None
+    ) -> bool:
+        """
+        Set a value in both tiers.
+
+        Args:
+            key_params: Parameters to generate the key
+            value: Value to cache
+            ttl: Time to live in seconds (None for default)
+
+        Returns:
+            True if successful
+        """
+        await self._refresh_generation()
+        self.local.set(
+            self._generate_key(key_params), value, min(ttl or self.ttl, self.local.ttl)
+        )
+        return await super().set(key_params, value, ttl)
+
+    async def delete(self, key_params: Dict[str, Any]) -> bool:
+        """
+        Delete a value from both tiers and from the other workers' local tier.
+
+        Args:
+            key_params: Parameters to generate the key
+
+        Returns:
+            True if successful
+        """
+        await self._refresh_generation()
+        key = self._generate_key(key_params)
+        self.local.delete(key)
+        deleted = await super().delete(key_params)
+        await self._publish(key)
+        return deleted
+
+    async def flush(self, pattern: str = None) -> int:
+        """
+        Flush Redis keys matching the pattern and every worker's local tier.
+
+        Args:
+            pattern: Pattern to match (None for all keys with prefix)
+
+        Returns:
+            Number of Redis keys deleted
+        """
+        self.local.clear()
+        count = await super().flush(pattern)
+        await self._publish("*")
+        return count
+
+    async def invalidate(self) -> Optional[int]:
+        """
+        Logically flush the cache and have every worker switch generation.
+
+        Returns:
+            New generation, or None if Redis is unavailable
+        """
+        generation = await super().invalidate()
+        if generation is not None:
+            self.local.clear()
+            await self._publish(f"generation:{generation}")
+        return generation
+
+    async def _publish(self, message: str):
+        """Publish an invalidation message to the other workers."""
+        if self._listener is None:
+            return
+        try:
+            await self.redis.publish(self.channel, message)
+        except redis.RedisError as e:
+            app_logger.warning(f"Could not publish cache invalidation: {str(e)}")
+
+    def add_invalidation_listener(self, listener: Callable[[], Any]):
+        """
+        Register a callback notified when another worker flushes or invalidates
+        the whole cache, e.g. to clear other in-process caches of answers.
+
+        Args:
+            listener: Function called without arguments
+        """
+        self._invalidation_listeners.append(listener)
+
+    def _clear_local(self):
+        """Drop the whole local tier and notify the invalidation listeners."""
+        self.local.clear()
+        for listener in self._invalidation_listeners:
+            try:
+                listener()
+            except Exception as e:
+                app_logger.error(f"Cache invalidation listener failed: {str(e)}")
+
+    def start_invalidation_listener(self):
+        """Start listening to invalidations published by the other workers."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.invalidate_local(message["data"])
+            except redis.RedisError as e:
+                app_logger.warning(f"Cache invalidation listener failed: {str(e)}")
+                # Entries may have been missed while disconnected
+                self._clear_local()
+                await asyncio.sleep(1)
+
+    def invalidate_local(self, message: str):
+        """
+        Apply an invalidation message to the local tier, notifying the
+        invalidation listeners of whole-cache invalidations.
+
+        Args:
+            message: Cache key to drop, "*" to drop every entry, or
+                "generation:<n>" to switch to a new generation
+        """
+        if message.startswith("generation:"):
+            self._set_generation(message.split(":", 1)[1])
+            self._clear_local()
+        elif message == "*":
+            self._clear_local()
+        else:
+            self.local.delete(message)
+
+    async def close(self):
+        """Stop the invalidation listener and close the pooled connections."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await super().close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the hit counters of each tier.
+
+        Returns:
+            Hits, misses and hit rate per tier
+        """
+        stats = {}
+        for tier, counters in self._stats.items():
+            lookups = counters["hits"] + counters["misses"]
+            stats[tier] = {
+                **counters,
+                "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+            }
+        stats["local"]["entries"] = len(self.local)
+        return stats
@@ -0,0 +1,45 @@
+# utils/deadline.py
+import time
+from typing import Optional
+
+
+class Deadline:
+    """Latency budget of a request, measured on the monotonic clock."""
+
+    def __init__(self, budget_ms: Optional[int]):
+        """
+        Start the budget.
+
+        Args:
+            budget_ms: Budget in milliseconds (None or 0 for no deadline)
+        """
+        self.budget_ms = budget_ms or None
+        self.expires_at = (
+            time.monotonic() + self.budget_ms / 1000 if self.budget_ms else None
+        )
+
+    def remaining(self) -> Optional[float]:
+        """
+        Return the remaining budget.
+
+        Returns:
+            Remaining time in seconds, or None without a deadline
+        """
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def remaining_ms(self) -> float:
+        """
+        Return the remaining budget in milliseconds.
+
+        Returns:
+            Remaining time in milliseconds (infinite without a deadline)
+        """
+        remaining = self.remaining()
+        return float("inf") if remaining is None else remaining * 1000
+
+    @property
+    def expired(self) -> bool:
+        """Whether the budget is spent."""
+        return self.remaining_ms() <= 0
@@ -1,10 +1,35 @@
 # utils/logging.py
+import atexit
 import logging
 import os
+import queue
+import random
 import sys
 import time
 import json
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List, Optional
+from config import LOG_QUEUE_ENABLED, REQUEST_LOG_SAMPLE_RATE
+
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, default=str).decode()
+
+except ImportError:  # orjson is optional
+
+    def _dumps(obj) -> str:
+        return json.dumps(obj, default=str)
+
+
+# Attributes of every LogRecord, the others come from the extra argument
+RESERVED_ATTRS = frozenset(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", (), None))
+) | {"asctime", "message"}
+
+# Listeners writing the queued records, stopped at exit
+_listeners: List[QueueListener] = []
 
 
 class CustomFormatter(logging.Formatter):
@@ -23,48 +48,47 @@ class CustomFormatter(logging.Formatter):
             log_record["exception"] = self.formatException(record.exc_info)
 
         # Add extra fields from the record
-        for key, value in record.__dict__.items():
-            if key not in [
-                "args",
-                "asctime",
-                "created",
-                "exc_info",
-                "exc_text",
-                "filename",
-                "funcName",
-                "id",
-                "levelname",
-                "levelno",
-                "lineno",
-                "module",
-                "msecs",
-                "message",
-                "msg",
-                "name",
-                "pathname",
-                "process",
-                "processName",
-                "relativeCreated",
-                "stack_info",
-                "thread",
-                "threadName",
-            ]:
-                log_record[key] = value
-
-        return json.dumps(log_record)
-
-
-def setup_logging(name=None, log_file=None):
+        for key in record.__dict__.keys() - RESERVED_ATTRS:
+            log_record[key] = record.__dict__[key]
+
+        return _dumps(log_record)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queue handler leaving the formatting to the listener thread."""
+
+    def prepare(self, record):
+        # Merge the arguments now, as they may change once the call returns
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def stop_logging():
+    """Write the queued log records and stop the listener threads."""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+atexit.register(stop_logging)
+
+
+def setup_logging(name=None, log_file=None, use_queue: Optional[bool] = None):
     """
     Set up logging configuration.
 
     Args:
         name: Logger name (None for root logger)
         log_file: Log file path (None for no file logging)
+        use_queue: Whether handlers run on a background thread
+            (None for LOG_QUEUE_ENABLED)
 
     Returns:
         Configured logger
     """
+    if use_queue is None:
+        use_queue = LOG_QUEUE_ENABLED
+
     # Get log level from environment
     log_level_name = os.getenv("LOG_LEVEL", "INFO").upper()
     log_level = getattr(logging, log_level_name, logging.INFO)
@@ -91,7 +115,7 @@ def setup_logging(name=None, log_file=None):
         )
 
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
 
     # Add file handler if log file specified
     if log_file:
@@ -101,7 +125,20 @@ def setup_logging(name=None, log_file=None):
         )
         file_handler.setLevel(log_level)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    if not use_queue:
+        for handler in handlers:
+            logger.addHandler(handler)
+        return logger
+
+    # Format and write the records on a background thread, so that slow
+    # output or file rotation does not block the caller
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    logger.addHandler(DeferredQueueHandler(log_queue))
 
     return logger
 
@@ -120,28 +157,45 @@ request_logger = setup_logging(
 class RequestLogMiddleware:
     """Middleware to log API requests and responses."""
 
-    def __init__(self, app):
+    def __init__(self, app, sample_rate: float = REQUEST_LOG_SAMPLE_RATE):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: ASGI application
+            sample_rate: Fraction of successful requests to log (errors are
+                always logged)
+        """
         self.app = app
+        self.sample_rate = sample_rate
 
     async def __call__(self, scope, receive, send):
         if scope["type"] != "http":
             return await self.app(scope, receive, send)
 
-        start_time = time.time()
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
         # Process the request with the actual app
-        await self.app(scope, receive, send)
-
-        # Log request details
-        process_time = time.time() - start_time
-        path = scope.get("path", "")
-        method = scope.get("method", "")
-
-        request_logger.info(
-            f"Request processed",
-            extra={
-                "path": path,
-                "method": method,
-                "process_time_ms": round(process_time * 1000, 2),
-            },
-        )
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if status_code >= 500 or random.random() < self.sample_rate:
+                # Log request details
+                process_time = time.perf_counter() - start_time
+                request_logger.info(
+                    f"Request processed",
+                    extra={
+                        "path": scope.get("path", ""),
+                        "method": scope.get("method", ""),
+                        "status_code": status_code,
+                        "process_time_ms": round(process_time * 1000, 2),
+                        "sample_rate": self.sample_rate,
+                    },
+                )
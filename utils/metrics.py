@@ -0,0 +1,247 @@
+# utils/metrics.py
+import time
+from contextlib import contextmanager
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
+from langchain.callbacks.manager import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain.schema import BaseRetriever, Document
+from prometheus_client import Counter, Gauge, Histogram
+from utils.timing import current_timings
+
+# Pipeline stages timed by STAGE_LATENCY
+STAGES = (
+    "cache_lookup",
+    "document_load",
+    "vectorstore_load",
+    "retrieval",
+    "direct_llm",
+    "agent_run",
+    "serialization",
+)
+
+STAGE_LATENCY = Histogram(
+    "legal_assistant_stage_duration_seconds",
+    "Duration of each query processing stage",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+
+CACHE_LOOKUPS = Counter(
+    "legal_assistant_cache_lookups_total",
+    "Cache lookups per tier and result",
+    ["tier", "result"],
+)
+
+EXTERNAL_CALLS = Counter(
+    "legal_assistant_external_calls_total",
+    "Calls to external services per outcome",
+    ["service", "outcome"],
+)
+
+EXTERNAL_LATENCY = Histogram(
+    "legal_assistant_external_call_duration_seconds",
+    "Duration of calls to external services",
+    ["service"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+IN_FLIGHT_REQUESTS = Gauge(
+    "legal_assistant_in_flight_requests",
+    "HTTP requests currently being processed",
+)
+
+INDEX_MEMORY = Gauge(
+    "legal_assistant_index_memory_bytes",
+    "Estimated resident FAISS index memory per law code",
+    ["law_code"],
+)
+
+
+@contextmanager
+def track_stage(stage: str):
+    """
+    Time a query processing stage, also adding it to the current request timings.
+
+    Args:
+        stage: Name of the stage (one of STAGES)
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start_time
+        STAGE_LATENCY.labels(stage).observe(duration)
+
+        timings = current_timings()
+        if timings is not None:
+            timings.add_stage(stage, duration)
+
+
+async def timed(stage: str, awaitable: Awaitable) -> Any:
+    """
+    Await a coroutine, timing it as a query processing stage.
+
+    Args:
+        stage: Name of the stage (one of STAGES)
+        awaitable: Coroutine to await
+
+    Returns:
+        The result of the coroutine
+    """
+    with track_stage(stage):
+        return await awaitable
+
+
+def record_cache_lookup(tier: str, hit: bool):
+    """
+    Count a cache lookup.
+
+    Args:
+        tier: Cache tier (e.g. local, redis, semantic)
+        hit: Whether the lookup found a value
+    """
+    CACHE_LOOKUPS.labels(tier, "hit" if hit else "miss").inc()
+
+
+@contextmanager
+def track_external_call(
+    service: str, start_time: Optional[float] = None, opens_stream: bool = False
+):
+    """
+    Count and time a call to an external service, recording failures.
+
+    Args:
+        service: Name of the service (e.g. groq, serpapi)
+        start_time: perf_counter time the call started at (None for now)
+        opens_stream: Whether the block only opens a streamed response. Only
+            failures are then recorded, track_stream recording the call once
+            the stream ends.
+    """
+    start_time = time.perf_counter() if start_time is None else start_time
+    # An opened stream is recorded by track_stream once it ends
+    opened = False
+    try:
+        yield
+        opened = opens_stream
+    except Exception:
+        EXTERNAL_CALLS.labels(service, "error").inc()
+        raise
+    else:
+        if not opened:
+            EXTERNAL_CALLS.labels(service, "success").inc()
+    finally:
+        if not opened:
+            EXTERNAL_LATENCY.labels(service).observe(time.perf_counter() - start_time)
+
+
+def track_stream(stream: Iterable, service: str, start_time: float) -> Iterator:
+    """
+    Forward a streamed response, counting and timing its call once the stream
+    is exhausted or fails.
+
+    Args:
+        stream: Streamed response of the service
+        service: Name of the service
+        start_time: perf_counter time the call started at
+
+    Yields:
+        The items of the stream
+    """
+    with track_external_call(service, start_time):
+        yield from stream
+
+
+async def atrack_stream(
+    stream: AsyncIterable, service: str, start_time: float
+) -> AsyncIterator:
+    """
+    Asynchronously forward a streamed response, counting and timing its call
+    once the stream is exhausted or fails.
+
+    Args:
+        stream: Streamed response of the service
+        service: Name of the service
+        start_time: perf_counter time the call started at
+
+    Yields:
+        The items of the stream
+    """
+    with track_external_call(service, start_time):
+        async for item in stream:
+            yield item
+
+
+def set_index_memory(law_code: str, nbytes: int):
+    """
+    Report the resident index memory of a law code.
+
+    Args:
+        law_code: Name of the law code
+        nbytes: Estimated index size in bytes (0 once evicted)
+    """
+    if nbytes:
+        INDEX_MEMORY.labels(law_code).set(nbytes)
+    else:
+        try:
+            INDEX_MEMORY.remove(law_code)
+        except KeyError:
+            pass
+
+
+class TimedRetriever(BaseRetriever):
+    """Retriever timing the retrieval stage of the retriever it wraps."""
+
+    # Any runnable returning documents, typically a vectorstore retriever
+    retriever: Any
+    # Law code of the searched index, reported in the request timings
+    law_code: str = ""
+
+    def _record(self, start_time: float, documents: List[Document]):
+        timings = current_timings()
+        if timings is not None:
+            timings.add_retrieval(
+                self.law_code, time.perf_counter() - start_time, len(documents)
+            )
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        start_time = time.perf_counter()
+        with track_stage("retrieval"):
+            documents = self.retriever.invoke(query)
+        self._record(start_time, documents)
+        return documents
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        start_time = time.perf_counter()
+        with track_stage("retrieval"):
+            documents = await self.retriever.ainvoke(query)
+        self._record(start_time, documents)
+        return documents
+
+
+class InFlightMiddleware:
+    """Middleware counting the HTTP requests being processed."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with IN_FLIGHT_REQUESTS.track_inprogress():
+            await self.app(scope, receive, send)
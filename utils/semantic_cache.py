@@ -0,0 +1,221 @@
+# utils/semantic_cache.py
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import faiss
+import numpy as np
+from langchain.embeddings.base import Embeddings
+from models.embeddings import get_embedding_model
+from utils.logging import app_logger
+from utils.metrics import record_cache_lookup
+from config import (
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+)
+
+# Number of neighbours examined, so that expired entries do not hide valid ones
+SEARCH_K = 4
+# Recent query embeddings kept to avoid embedding a query twice (lookup + store)
+EMBEDDING_MEMO_SIZE = 256
+
+
+class SemanticCache:
+    """In-memory cache returning the answer of a previously seen similar query."""
+
+    def __init__(
+        self,
+        embedding_model: Optional[Embeddings] = None,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl: int = SEMANTIC_CACHE_TTL,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            embedding_model: Model embedding the queries (None for the shared model)
+            threshold: Minimum cosine similarity for a query to match
+            ttl: Time to live of an entry in seconds
+            max_entries: Maximum number of entries over all scopes
+        """
+        self._embedding_model = embedding_model
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        # Scope -> FAISS index of the normalized query embeddings of that scope
+        self._indexes: Dict[str, faiss.IndexIDMap] = {}
+        # Entry id -> (scope, query, value, expiry), least recently used first
+        self._entries: "OrderedDict[int, Tuple[str, str, str, float]]" = OrderedDict()
+        self._next_id = 0
+        self._embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def embedding_model(self) -> Embeddings:
+        """Return the embedding model, loading the shared one on first use."""
+        if self._embedding_model is None:
+            self._embedding_model = get_embedding_model()
+        return self._embedding_model
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _scope_key(scope: Dict[str, Any]) -> str:
+        return json.dumps(scope, sort_keys=True)
+
+    def _embed(self, query: str) -> np.ndarray:
+        """Embed and normalize a query, reusing recent embeddings."""
+        with self._lock:
+            vector = self._embeddings.get(query)
+            if vector is not None:
+                self._embeddings.move_to_end(query)
+                return vector
+
+        vector = np.array([self.embedding_model.embed_query(query)], dtype="float32")
+        faiss.normalize_L2(vector)
+
+        with self._lock:
+            self._embeddings[query] = vector
+            if len(self._embeddings) > EMBEDDING_MEMO_SIZE:
+                self._embeddings.popitem(last=False)
+
+        return vector
+
+    def _remove(self, entry_id: int):
+        """Remove an entry from its index. Must be called with the lock held."""
+        scope_key = self._entries.pop(entry_id)[0]
+        index = self._indexes[scope_key]
+        index.remove_ids(np.array([entry_id], dtype="int64"))
+        if index.ntotal == 0:
+            del self._indexes[scope_key]
+
+    def _search(self, vector: np.ndarray, scope_key: str) -> Optional[str]:
+        with self._lock:
+            index = self._indexes.get(scope_key)
+            if index is None:
+                self._stats["misses"] += 1
+                record_cache_lookup("semantic", False)
+                return None
+
+            scores, ids = index.search(vector, min(SEARCH_K, index.ntotal))
+            now = time.time()
+            for score, entry_id in zip(scores[0], ids[0]):
+                if entry_id < 0 or score < self.threshold:
+                    break
+
+                entry_id = int(entry_id)
+                _, query, value, expires_at = self._entries[entry_id]
+                if expires_at <= now:
+                    self._remove(entry_id)
+                    continue
+
+                self._entries.move_to_end(entry_id)
+                self._stats["hits"] += 1
+                record_cache_lookup("semantic", True)
+                app_logger.info(
+                    f"Semantic cache hit ({score:.3f}) with query: {query[:50]}..."
+                )
+                return value
+
+            self._stats["misses"] += 1
+            record_cache_lookup("semantic", False)
+            return None
+
+    def _add(self, vector: np.ndarray, query: str, scope_key: str, value: str):
+        with self._lock:
+            index = self._indexes.get(scope_key)
+            if index is None:
+                index = faiss.IndexIDMap(faiss.IndexFlatIP(vector.shape[1]))
+                self._indexes[scope_key] = index
+
+            entry_id = self._next_id
+            self._next_id += 1
+            index.add_with_ids(vector, np.array([entry_id], dtype="int64"))
+            self._entries[entry_id] = (scope_key, query, value, time.time() + self.ttl)
+
+            # Evict the least recently used entries past the size bound
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def lookup(self, query: str, scope: Dict[str, Any]) -> Optional[str]:
+        """
+        Find the value stored for a query similar to the given one.
+
+        Args:
+            query: User query
+            scope: Parameters that must match exactly (e.g. law codes)
+
+        Returns:
+            Cached value or None if no similar query is found
+        """
+        return self._search(self._embed(query), self._scope_key(scope))
+
+    def store(self, query: str, scope: Dict[str, Any], value: str):
+        """
+        Store the value answering a query.
+
+        Args:
+            query: User query
+            scope: Parameters that must match exactly (e.g. law codes)
+            value: Value to cache
+        """
+        self._add(self._embed(query), query, self._scope_key(scope), value)
+
+    async def alookup(self, query: str, scope: Dict[str, Any]) -> Optional[str]:
+        """
+        Asynchronously find the value stored for a similar query.
+
+        Args:
+            query: User query
+            scope: Parameters that must match exactly (e.g. law codes)
+
+        Returns:
+            Cached value or None if no similar query is found
+        """
+        return await asyncio.to_thread(self.lookup, query, scope)
+
+    async def astore(self, query: str, scope: Dict[str, Any], value: str):
+        """
+        Asynchronously store the value answering a query.
+
+        Args:
+            query: User query
+            scope: Parameters that must match exactly (e.g. law codes)
+            value: Value to cache
+        """
+        await asyncio.to_thread(self.store, query, scope, value)
+
+    def clear(self) -> int:
+        """
+        Remove every entry.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            count = len(self._entries)
+            self._indexes.clear()
+            self._entries.clear()
+            return count
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the cache statistics.
+
+        Returns:
+            Entry count, hits, misses and evictions
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "scopes": len(self._indexes),
+                **self._stats,
+            }
@@ -0,0 +1,116 @@
+# utils/singleflight.py
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional
+from utils.logging import app_logger
+from config import SINGLEFLIGHT_LOCK_TTL, SINGLEFLIGHT_POLL_INTERVAL
+
+
+class SingleFlight:
+    """Coalesce concurrent computations of the same key into a single one."""
+
+    def __init__(
+        self,
+        cache=None,
+        lock_ttl: int = SINGLEFLIGHT_LOCK_TTL,
+        poll_interval: float = SINGLEFLIGHT_POLL_INTERVAL,
+    ):
+        """
+        Initialize the single-flight group.
+
+        Args:
+            cache: Optional async cache providing Redis locks to coalesce across workers
+            lock_ttl: Lifetime in seconds of a cross-worker lock
+            poll_interval: Delay in seconds between two polls of another worker's result
+        """
+        self.cache = cache
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+
+        # Serialized key -> task computing the value
+        self._flights: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(
+        self,
+        key_params: Dict[str, Any],
+        func: Callable[[], Awaitable[Any]],
+        poll: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        Compute a value, sharing the computation with concurrent identical calls.
+
+        Args:
+            key_params: Parameters identifying the computation
+            func: Coroutine function computing the value
+            poll: Optional coroutine function returning the value computed by
+                another worker, or None if it is not available yet
+
+        Returns:
+            The computed value
+        """
+        key = json.dumps(key_params, sort_keys=True)
+
+        task = self._flights.get(key)
+        if task is None:
+            # The computation runs in its own task so that a disconnecting
+            # caller does not cancel it for the others
+            task = asyncio.ensure_future(self._run(key_params, func, poll))
+            self._flights[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            app_logger.info(f"Joining in-flight computation for key {key[:80]}")
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+
+        # Mark the exception as retrieved when every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    async def _run(
+        self,
+        key_params: Dict[str, Any],
+        func: Callable[[], Awaitable[Any]],
+        poll: Optional[Callable[[], Awaitable[Any]]],
+    ) -> Any:
+        if self.cache is None or poll is None:
+            return await func()
+
+        token = await self.cache.acquire_lock(key_params, self.lock_ttl)
+        if token is None:
+            # Another worker holds the lock: wait for its result
+            value = await self._wait_for_other_worker(key_params, poll)
+            if value is not None:
+                return value
+            return await func()
+
+        try:
+            return await func()
+        finally:
+            await self.cache.release_lock(key_params, token)
+
+    async def _wait_for_other_worker(
+        self, key_params: Dict[str, Any], poll: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Poll for the value computed by the worker holding the lock."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_ttl
+
+        while loop.time() < deadline:
+            value = await poll()
+            if value is not None:
+                return value
+
+            # The other worker finished without storing a value
+            if not await self.cache.is_locked(key_params):
+                return await poll()
+
+            await asyncio.sleep(self.poll_interval)
+
+        return None
@@ -0,0 +1,213 @@
+# utils/timing.py
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from langchain.callbacks.base import BaseCallbackHandler
+
+
+class RequestTimings:
+    """Stage timing breakdown of a single request."""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.retrievals: List[Dict[str, Any]] = []
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.tool_calls: List[Dict[str, Any]] = []
+        self.agent_iterations = 0
+
+        # Start time and label of the LLM and tool runs in progress
+        self._runs: Dict[UUID, tuple] = {}
+        self._lock = threading.Lock()
+
+    def add_stage(self, stage: str, seconds: float):
+        """
+        Add time spent in a stage, summing repeated stages.
+
+        Args:
+            stage: Name of the stage
+            seconds: Duration in seconds
+        """
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_retrieval(self, law_code: str, seconds: float, documents: int):
+        """
+        Record an index retrieval.
+
+        Args:
+            law_code: Law code whose index was searched
+            seconds: Duration in seconds
+            documents: Number of documents retrieved
+        """
+        with self._lock:
+            self.retrievals.append(
+                {"law_code": law_code, "seconds": seconds, "documents": documents}
+            )
+
+    def add_llm_call(self, call: Dict[str, Any]):
+        """
+        Record an LLM call.
+
+        Args:
+            call: Name, duration and token counts of the call
+        """
+        with self._lock:
+            self.llm_calls.append(call)
+
+    def add_tool_call(self, call: Dict[str, Any]):
+        """
+        Record a tool invocation.
+
+        Args:
+            call: Name and duration of the invocation
+        """
+        with self._lock:
+            self.tool_calls.append(call)
+
+    def add_agent_iteration(self):
+        """Count an agent iteration."""
+        with self._lock:
+            self.agent_iterations += 1
+
+    def start_run(self, run_id: UUID, name: str):
+        """Remember the start of an LLM or tool run."""
+        with self._lock:
+            self._runs[run_id] = (time.perf_counter(), name)
+
+    def end_run(self, run_id: UUID) -> Optional[tuple]:
+        """Return the name and duration of a run in progress, or None."""
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return None
+        start_time, name = run
+        return name, time.perf_counter() - start_time
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return the breakdown as a JSON serializable dict.
+
+        Returns:
+            Stage durations, retrievals, LLM calls, tool calls and agent iterations
+        """
+        with self._lock:
+            return {
+                "stages": {k: round(v, 6) for k, v in self.stages.items()},
+                "retrievals": list(self.retrievals),
+                "llm_calls": list(self.llm_calls),
+                "tool_calls": list(self.tool_calls),
+                "agent_iterations": self.agent_iterations,
+            }
+
+
+# Timings of the request being processed, inherited by the tasks it spawns
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def start_request_timings() -> RequestTimings:
+    """
+    Start collecting the timings of the current request.
+
+    Returns:
+        Collector receiving the timings of this request
+    """
+    timings = RequestTimings()
+    _current_timings.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Return the timings collector of the current request, if any."""
+    return _current_timings.get()
+
+
+class TimingCallbackHandler(BaseCallbackHandler):
+    """
+    Callback handler adding LLM calls, tool invocations and agent iterations
+    to the timings of the current request.
+
+    The handler is stateless, so one instance can be attached to shared
+    LLMs, tools and agents serving concurrent requests.
+    """
+
+    run_inline = True
+
+    @staticmethod
+    def _label(serialized: Optional[Dict[str, Any]], tags: Optional[List[str]]) -> str:
+        if tags:
+            return ",".join(tags)
+        return (serialized or {}).get("name") or "llm"
+
+    def on_llm_start(
+        self,
+        serialized: Dict[str, Any],
+        prompts: List[str],
+        *,
+        run_id: UUID,
+        tags: Optional[List[str]] = None,
+        **kwargs,
+    ):
+        timings = current_timings()
+        if timings is not None:
+            timings.start_run(run_id, self._label(serialized, tags))
+
+    def _end_llm(self, run_id: UUID, usage: Dict[str, Any], error: bool = False):
+        timings = current_timings()
+        run = timings.end_run(run_id) if timings is not None else None
+        if run is None:
+            return
+
+        name, seconds = run
+        call = {
+            "name": name,
+            "seconds": seconds,
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "completion_tokens": usage.get("completion_tokens"),
+        }
+        if error:
+            call["error"] = True
+        timings.add_llm_call(call)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        self._end_llm(run_id, (response.llm_output or {}).get("token_usage") or {})
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._end_llm(run_id, {}, error=True)
+
+    def on_tool_start(
+        self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs
+    ):
+        timings = current_timings()
+        if timings is not None:
+            timings.start_run(run_id, (serialized or {}).get("name") or "tool")
+
+    def _end_tool(self, run_id: UUID, error: bool = False):
+        timings = current_timings()
+        run = timings.end_run(run_id) if timings is not None else None
+        if run is None:
+            return
+
+        name, seconds = run
+        call = {"tool": name, "seconds": seconds}
+        if error:
+            call["error"] = True
+        timings.add_tool_call(call)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs):
+        self._end_tool(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._end_tool(run_id, error=True)
+
+    def on_agent_action(self, action: Any, *, run_id: UUID, **kwargs):
+        timings = current_timings()
+        if timings is not None:
+            timings.add_agent_iteration()
+
+
+# Shared handler attached to the LLMs, tools and agents
+timing_handler = TimingCallbackHandler()